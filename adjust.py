@@ -0,0 +1,224 @@
+# Prezzi aggiustati ricalcolati in locale da prezzi grezzi + tabella delle operazioni societarie
+# Il PriceStore conserva le barre non aggiustate per dividendi (auto_adjust=False); split e
+# dividendi stanno in una piccola tabella per simbolo. I fattori cumulativi si calcolano con
+# prodotti cumulativi vettorizzati e si applicano solo in lettura: un nuovo dividendo o split
+# aggiunge una riga alla tabella, senza riscaricare la storia.
+#
+# Struttura su disco:
+#   <root>/<SIMBOLO>.json  {"checked": s, "actions": [[ns, "dividend"|"split", valore]],
+#                           "fetched": {intervallo: [[prima barra ns, scaricato ns], ...]}}
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_store import PRICE_COLUMNS, PriceStore, initial_period, to_utc_ns
+from providers import get_provider
+
+ACTIONS_TTL = 12 * 3600  # come dividends/splits nella DataCache
+DIVIDEND = "dividend"
+SPLIT = "split"
+
+
+def raw_history(symbol, interval, start=None, period=None):
+    """Fetch per il PriceStore: prezzi non aggiustati per i dividendi e senza colonne azioni"""
+    provider = get_provider()
+    params = {"interval": interval, "auto_adjust": False, "actions": False}
+    if start is not None:
+        return provider.history(symbol, start=start, **params)
+    return provider.history(symbol, period=period or initial_period(interval), **params)
+
+
+def _series_ns(series):
+    """(timestamp ns UTC, valori) ordinati di una serie dividends/splits"""
+    if series is None or len(series) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    series = series.sort_index()
+    index = pd.DatetimeIndex(series.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    return index.as_unit("ns").asi8, series.to_numpy(dtype=np.float64)
+
+
+def _suffix_product(values):
+    """out[i] = prodotto di values[i:], con out[len] = 1"""
+    out = np.ones(len(values) + 1)
+    out[:-1] = np.cumprod(values[::-1])[::-1]
+    return out
+
+
+def adjustment_factors(ts, close, actions, basis=None):
+    """Fattori per barra da applicare ai prezzi salvati.
+
+    ts/close: timestamp ns UTC ordinati e chiusure salvate. actions: lista di
+    (ns, tipo, valore) con importi dei dividendi nei termini dell'epoca.
+    basis: istante (scalare o uno per barra) in cui le barre sono state scaricate; gli split
+    fino a quel momento sono già inclusi nei prezzi salvati (Yahoo li applica sempre).
+
+    Restituisce (split, dividendi, volumi): prezzi aggiustati per gli split = close * split,
+    prezzi totalmente aggiustati = close * split * dividendi, volumi = volume * volumi.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    close = np.asarray(close, dtype=np.float64)
+    actions = sorted(actions, key=lambda a: a[0])
+    split_ts = np.array([a[0] for a in actions if a[1] == SPLIT], dtype=np.int64)
+    ratios = np.array([a[2] for a in actions if a[1] == SPLIT], dtype=np.float64)
+    div_ts = np.array([a[0] for a in actions if a[1] == DIVIDEND], dtype=np.int64)
+    amounts = np.array([a[2] for a in actions if a[1] == DIVIDEND], dtype=np.float64)
+
+    # Split: prodotto dei rapporti con data successiva alla barra
+    suffix = _suffix_product(ratios)
+    after_bar = np.searchsorted(split_ts, ts, "right")
+    after_basis = 0 if basis is None else np.searchsorted(split_ts, basis, "right")
+    pending = np.maximum(after_bar, after_basis)
+    split = 1.0 / suffix[pending]            # split successivi a barra e basis
+    to_raw = suffix[after_bar] / suffix[pending]  # split già inclusi -> prezzo dell'epoca
+
+    # Dividendi: 1 - D / chiusura grezza del giorno precedente la data ex
+    dividends = np.ones(len(ts))
+    if len(div_ts) and len(ts):
+        prev = np.searchsorted(ts, div_ts, "left") - 1
+        valid = prev >= 0
+        raw_close = close[prev[valid]] * to_raw[prev[valid]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = 1.0 - amounts[valid] / raw_close
+        factor = np.where(np.isfinite(factor) & (factor > 0), factor, 1.0)
+        suffix_div = _suffix_product(factor)
+        dividends = suffix_div[np.searchsorted(div_ts[valid], ts, "right")]
+    return split, dividends, 1.0 / split
+
+
+class AdjustedPrices:
+    """Storia aggiustata calcolata in lettura da PriceStore grezzo + operazioni societarie"""
+
+    def __init__(self, store=None, root=None, provider=None, actions_ttl=ACTIONS_TTL):
+        self.store = store or PriceStore("dati_prezzi_grezzi", fetch=raw_history)
+        self.root = root or os.path.join(self.store.root, "_actions")
+        self.provider = provider
+        self.actions_ttl = actions_ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.root, f"{symbol.strip().upper()}.json")
+
+    def table(self, symbol):
+        """Tabella delle operazioni: {"checked", "actions", "fetched"} (vuota se mai sincronizzata)"""
+        try:
+            with open(self._path(symbol), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"checked": 0, "actions": [], "fetched": {}}
+
+    def _write(self, symbol, table):
+        path = self._path(symbol)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(table, f)
+        os.replace(tmp, path)
+
+    def actions(self, symbol):
+        """Operazioni come DataFrame (data, tipo, valore) con importi nei termini dell'epoca"""
+        rows = self.table(symbol)["actions"]
+        frame = pd.DataFrame(rows, columns=["date", "type", "value"])
+        frame["date"] = pd.to_datetime(frame["date"].astype(np.int64), utc=True)
+        return frame
+
+    def add_action(self, symbol, when, kind, value):
+        """Registra a mano un dividendo (importo pagato) o uno split (rapporto, es. 4.0)"""
+        if kind not in (DIVIDEND, SPLIT):
+            raise ValueError(f"Tipo di operazione sconosciuto: {kind}")
+        when = to_utc_ns(when, self.store.timezone(symbol, "1d"))
+        return self._merge(symbol, [[when, kind, float(value)]])
+
+    def _merge(self, symbol, rows, checked=None):
+        with self._lock:
+            table = self.table(symbol)
+            known = {(a[0], a[1]) for a in table["actions"]}
+            new = [r for r in rows if (r[0], r[1]) not in known]
+            table["actions"] = sorted(table["actions"] + new, key=lambda a: (a[0], a[1]))
+            if checked is not None:
+                table["checked"] = checked
+            self._write(symbol, table)
+            return len(new)
+
+    def sync(self, symbol, force=False):
+        """Aggiunge i nuovi dividendi e split del provider; restituisce quante righe sono nuove.
+
+        Yahoo riporta i dividendi già riscalati per tutti gli split noti: vengono riportati
+        all'importo effettivo dell'epoca, così le righe salvate non cambiano con split futuri.
+        """
+        table = self.table(symbol)
+        if not force and time.time() - table["checked"] < self.actions_ttl:
+            return 0
+        provider = self.provider or get_provider()
+        symbol = symbol.strip().upper()
+        split_ts, ratios = _series_ns(provider.splits(symbol))
+        div_ts, amounts = _series_ns(provider.dividends(symbol))
+        later = _suffix_product(ratios)[np.searchsorted(split_ts, div_ts, "right")]
+        rows = [[int(t), SPLIT, float(r)] for t, r in zip(split_ts, ratios)]
+        rows += [[int(t), DIVIDEND, float(a)] for t, a in zip(div_ts, amounts * later)]
+        return self._merge(symbol, rows, checked=time.time())
+
+    def refresh(self, symbol, interval="1d"):
+        """Aggiorna le barre grezze e registra quando è stato scaricato il nuovo tratto.
+
+        Le barre arrivano già aggiustate per gli split noti al momento del download: l'istante
+        di ogni tratto dice quali split sono inclusi, anche se la coda scaricata scavalca uno split.
+        Quando compare la barra di una nuova seduta si rileggono subito anche le operazioni:
+        uno split annunciato tra due sync lascerebbe barre prima e dopo lo split senza fattore
+        di raccordo. L'aggiornamento della sola barra parziale non rilegge le operazioni.
+        """
+        last = self.store.last_timestamp(symbol, interval)
+        fetched_at = time.time_ns()
+        count = self.store.refresh(symbol, interval)
+        if not count:
+            return 0
+        first = last.value if last is not None else int(self.store.columns(symbol, interval)["ts"][0])
+        with self._lock:
+            table = self.table(symbol)
+            chunks = [c for c in table.setdefault("fetched", {}).get(interval, []) if c[0] < first]
+            table["fetched"][interval] = chunks + [[first, fetched_at]]
+            self._write(symbol, table)
+        if last is None or self.store.last_timestamp(symbol, interval) > last:
+            self.sync(symbol, force=True)
+        return count
+
+    def _basis(self, table, interval, ts):
+        """Istante di download di ogni barra (dai tratti registrati da refresh)"""
+        chunks = table.get("fetched", {}).get(interval)
+        if not chunks:
+            # Barre salvate senza refresh(): si assume che includano tutti gli split noti
+            return time.time_ns()
+        starts = np.array([c[0] for c in chunks], dtype=np.int64)
+        fetched = np.array([c[1] for c in chunks], dtype=np.int64)
+        return fetched[np.maximum(np.searchsorted(starts, ts, "right") - 1, 0)]
+
+    def history(self, symbol, interval="1d", start=None, end=None, auto_adjust=True, refresh=True):
+        """Storia come ticker.history(): OHLC aggiustati (auto_adjust=True) oppure prezzi
+        aggiustati per gli split con la colonna 'Adj Close' (auto_adjust=False)"""
+        if refresh:
+            # Rete solo se la coda non è recente (vedi PriceStore.stale) o le operazioni sono scadute
+            if self.store.stale(symbol, interval):
+                self.refresh(symbol, interval)
+            self.sync(symbol)
+        table = self.table(symbol)
+        cols = self.store.columns(symbol, interval)
+        split, dividends, volume = adjustment_factors(cols["ts"], cols["Close"], table["actions"],
+                                                      self._basis(table, interval, cols["ts"]))
+        tz = self.store.timezone(symbol, interval)
+        lo = 0 if start is None else int(np.searchsorted(cols["ts"], to_utc_ns(start, tz), "left"))
+        hi = len(cols["ts"]) if end is None else int(
+            np.searchsorted(cols["ts"], to_utc_ns(end, tz, end=True), "right"))
+        prices = split[lo:hi] * (dividends[lo:hi] if auto_adjust else 1.0)
+
+        frame = {name: np.asarray(cols[name][lo:hi]) * prices for name in PRICE_COLUMNS[:4]}
+        if not auto_adjust:
+            frame["Adj Close"] = frame["Close"] * dividends[lo:hi]
+        frame["Volume"] = np.asarray(cols["Volume"][lo:hi]) * volume[lo:hi]
+        index = pd.DatetimeIndex(np.asarray(cols["ts"][lo:hi]).view("datetime64[ns]"), name="Date")
+        index = index.tz_localize("UTC")
+        return pd.DataFrame(frame, index=index.tz_convert(tz) if tz else index)
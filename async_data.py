@@ -0,0 +1,145 @@
+# Accesso asincrono ai dati: coroutine per endpoint su un event loop condiviso
+# Il loop gira in un thread in background per tutto il processo; lo script Streamlit
+# invia coroutine con submit() e attende (run) o controlla (Future.done) il risultato.
+# yfinance è bloccante: le chiamate di rete girano su un pool limitato; anche le letture
+# della cache (disco, SQLite, snapshot parquet) possono bloccare e girano sul pool di default
+# del loop, separato, così un hit non attende in coda dietro ai download.
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from providers import STATEMENTS, get_provider
+
+ASYNC_CONCURRENCY = 16
+
+ENDPOINTS = ("info", "history", "options", "option_chain", "dividends", "splits") + STATEMENTS
+
+
+class BackgroundLoop:
+    """Event loop asyncio in un thread daemon, con il pool per le chiamate bloccanti"""
+
+    def __init__(self, name="guida-async", concurrency=ASYNC_CONCURRENCY):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="async-fetch")
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Pianifica la coroutine e restituisce un concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Esegue la coroutine e ne attende il risultato dal thread chiamante"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.executor.shutdown(wait=False)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    """Loop in background condiviso dal processo"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = BackgroundLoop()
+        return _loop
+
+
+class AsyncData:
+    """Coroutine per endpoint con la stessa cache di CachedTicker.
+
+    Le chiavi di cache coincidono con quelle di CachedTicker: un valore scaricato
+    in modo asincrono è visto anche dal codice sincrono e viceversa. L'oggetto è
+    leggero (loop e pool sono condivisi) e si può creare a ogni rerun.
+    """
+
+    def __init__(self, cache=None, provider=None, loop=None):
+        self.cache = cache
+        self.provider = provider
+        self.background = loop or get_loop()
+
+    def _call(self, symbol, endpoint, params):
+        provider = self.provider or get_provider()
+        if endpoint == "history":
+            return provider.history(symbol, **params)
+        if endpoint == "option_chain":
+            return provider.option_chain(symbol, params.get("date"))
+        if endpoint in STATEMENTS:
+            return provider.statement(symbol, endpoint)
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Endpoint sconosciuto: {endpoint}")
+        return getattr(provider, endpoint)(symbol)
+
+    async def fetch(self, symbol, endpoint, **params):
+        """Valore di un endpoint: dalla cache se presente, altrimenti dal provider"""
+        symbol = symbol.strip().upper()
+        if endpoint == "option_chain":
+            params = {"date": params.get("date")}
+        loop = asyncio.get_running_loop()
+        if self.cache is None:
+            return await loop.run_in_executor(self.background.executor, self._call,
+                                              symbol, endpoint, params)
+        found, value = await loop.run_in_executor(None, self.cache.get, symbol, endpoint, params)
+        if found:
+            return value
+        # Il fetch passa da get_or_fetch: single-flight con CachedTicker e le altre sessioni
+        return await loop.run_in_executor(
+            self.background.executor, self.cache.get_or_fetch, symbol, endpoint,
+            lambda: self._call(symbol, endpoint, params), params,
+        )
+
+    async def info(self, symbol):
+        return await self.fetch(symbol, "info")
+
+    async def history(self, symbol, **params):
+        return await self.fetch(symbol, "history", **params)
+
+    async def options(self, symbol):
+        return await self.fetch(symbol, "options")
+
+    async def option_chain(self, symbol, date=None):
+        return await self.fetch(symbol, "option_chain", date=date)
+
+    async def statement(self, symbol, name):
+        return await self.fetch(symbol, name)
+
+    async def dividends(self, symbol):
+        return await self.fetch(symbol, "dividends")
+
+    async def splits(self, symbol):
+        return await self.fetch(symbol, "splits")
+
+    async def gather(self, requests):
+        """Esegue insieme richieste (simbolo, endpoint[, parametri]).
+
+        Restituisce i risultati nello stesso ordine; gli errori sono restituiti
+        come eccezioni al posto del valore, senza interrompere le altre richieste.
+        """
+        coros = [self.fetch(req[0], req[1], **(req[2] if len(req) > 2 else {})) for req in requests]
+        return await asyncio.gather(*coros, return_exceptions=True)
+
+    def submit(self, coro):
+        """Invia una coroutine al loop condiviso (Future pollabile da Streamlit)"""
+        return self.background.submit(coro)
+
+    def run(self, coro, timeout=None):
+        """Invia una coroutine e ne attende il risultato"""
+        return self.background.run(coro, timeout)
+
+    def fetch_many(self, requests, timeout=None):
+        """Versione bloccante di gather() per il codice sincrono"""
+        return self.run(self.gather(requests), timeout)
@@ -0,0 +1,151 @@
+# Verifica disponibilità dati - probe concorrenti, un endpoint alla volta per simbolo
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+PROBE_TIMEOUT = 10.0  # misurato dall'avvio di ogni probe, non dall'ingresso in coda
+PROBE_POLL = 0.1
+MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Pool di thread limitato condiviso da tutti i probe"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS,
+                                           thread_name_prefix="probe")
+        return _executor
+
+
+def _not_empty(value):
+    if value is None:
+        return False
+    if hasattr(value, "empty"):
+        return not value.empty
+    return len(value) > 0
+
+
+# Ogni probe legge il proprio endpoint una sola volta
+PROBES = [
+    ("Dati Storici", lambda t: _not_empty(t.history(period="5d"))),
+    ("Opzioni", lambda t: _not_empty(t.options)),
+    ("Dividendi", lambda t: _not_empty(t.dividends)),
+    ("Bilanci", lambda t: _not_empty(t.balance_sheet)),
+    ("Flussi Cassa", lambda t: _not_empty(t.cashflow)),
+]
+
+# Probe calcolati da ticker.info, senza richieste aggiuntive
+INFO_PROBES = [
+    ("Dati ESG", lambda info: info.get("totalEsg") is not None),
+]
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Esito di un singolo probe"""
+    category: str
+    available: bool
+    elapsed: float = 0.0
+    error: str = None
+
+    @property
+    def status(self):
+        if self.error:
+            return "⚠️"
+        return "✅" if self.available else "❌"
+
+
+@dataclass(frozen=True)
+class AvailabilityReport:
+    """Disponibilità dati per un simbolo, nell'ordine dei probe"""
+    symbol: str
+    results: list = field(default_factory=list)
+
+    def __getitem__(self, category):
+        for result in self.results:
+            if result.category == category:
+                return result
+        raise KeyError(category)
+
+    def items(self):
+        return [(r.category, r.available) for r in self.results]
+
+    def as_dict(self):
+        return dict(self.items())
+
+
+class ProbeBatch(dict):
+    """{future: categoria} dei probe avviati, con l'istante di partenza di ciascuno"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = {}
+
+
+def _run_probe(category, probe, ticker, started=None):
+    start = time.perf_counter()
+    if started is not None:
+        started[category] = start
+    try:
+        available = bool(probe(ticker))
+        return ProbeResult(category, available, time.perf_counter() - start)
+    except Exception as e:
+        return ProbeResult(category, False, time.perf_counter() - start, str(e))
+
+
+def submit_probes(ticker, executor=None):
+    """Avvia i probe di rete e restituisce un ProbeBatch {future: categoria}.
+
+    Ogni future dà un ProbeResult.
+    """
+    executor = executor or get_executor()
+    batch = ProbeBatch()
+    for category, probe in PROBES:
+        batch[executor.submit(_run_probe, category, probe, ticker, batch.started)] = category
+    return batch
+
+
+def iter_probe_results(batch, timeout=PROBE_TIMEOUT):
+    """Risultati man mano che arrivano; un probe in esecuzione da oltre `timeout` secondi
+    è riportato come timeout, mentre quelli ancora in coda nel pool continuano ad attendere"""
+    pending = dict(batch)
+    while pending:
+        now = time.perf_counter()
+        deadlines = [batch.started[c] + timeout for c in pending.values() if c in batch.started]
+        wait_for = max(min(deadlines) - now, 0.0) if deadlines else PROBE_POLL
+        done, _ = wait(pending, timeout=min(wait_for, PROBE_POLL), return_when=FIRST_COMPLETED)
+        for future in done:
+            del pending[future]
+            yield future.result()
+        now = time.perf_counter()
+        for future, category in list(pending.items()):
+            started = batch.started.get(category)
+            if started is not None and now - started > timeout and not future.done():
+                # Un thread già avviato non si può interrompere: si smette solo di attenderlo
+                del pending[future]
+                yield ProbeResult(category, False, now - started, "timeout")
+
+
+def info_probe_results(info):
+    """Risultati dei probe calcolati da ticker.info"""
+    return [_run_probe(category, lambda _, p=probe: p(info), None) for category, probe in INFO_PROBES]
+
+
+def iter_availability(ticker, info, timeout=PROBE_TIMEOUT, executor=None):
+    """Esegue i probe in parallelo e restituisce i risultati man mano che arrivano"""
+    yield from info_probe_results(info)
+
+    yield from iter_probe_results(submit_probes(ticker, executor), timeout)
+
+
+def check_availability(symbol, ticker, info, timeout=PROBE_TIMEOUT, executor=None):
+    """Report tipizzato di disponibilità dati per il simbolo"""
+    results = {r.category: r for r in iter_availability(ticker, info, timeout, executor)}
+    ordered = [results[c] for c, _ in PROBES + INFO_PROBES]
+    return AvailabilityReport(symbol, ordered)
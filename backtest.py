@@ -0,0 +1,208 @@
+# Backtest vettorizzato delle regole della sezione Analisi Tecnica
+# Segnali, posizioni, costi ed equity si calcolano su matrici (date x simboli) senza cicli
+# per barra: la posizione decisa alla chiusura di t si applica al rendimento di t+1.
+# Gli sweep di parametri girano su un pool di processi, con i prezzi inviati una sola
+# volta a ogni processo e gli indicatori riusati tra le combinazioni.
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import TRADING_DAYS, bollinger_bands, ema, returns, rolling_mean, rsi
+
+DEFAULT_COST_BPS = 5.0
+SWEEP_CHUNK = 32
+
+# Strategie documentate e parametri predefiniti (solo long/flat)
+STRATEGIES = {
+    "rsi": {"window": 14, "lower": 30.0, "upper": 70.0},
+    "ma_cross": {"fast": 50, "slow": 200},
+    "bollinger": {"window": 20, "k": 2.0},
+    "macd": {"fast": 12, "slow": 26, "signal": 9},
+}
+METRICS = ("total_return", "cagr", "volatility", "sharpe", "max_drawdown", "trades", "exposure")
+
+
+class SignalContext:
+    """Prezzi di chiusura con cache degli indicatori, condivisa tra le combinazioni di parametri"""
+
+    def __init__(self, close):
+        self.close = np.asarray(close, dtype=np.float64)
+        if self.close.ndim == 1:
+            self.close = self.close[:, None]
+        self.returns = returns(self.close)
+        self._cache = {}
+
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def ma(self, window):
+        return self._get(("ma", window), lambda: rolling_mean(self.close, window))
+
+    def rsi(self, window):
+        return self._get(("rsi", window), lambda: rsi(self.close, window))
+
+    def bands(self, window, k):
+        return self._get(("bb", window, k), lambda: bollinger_bands(self.close, window, k))
+
+    def ema(self, span):
+        return self._get(("ema", span), lambda: ema(self.close, span))
+
+
+def hold(entries, exits):
+    """Posizione 1/0 tenuta da un ingresso fino all'uscita successiva (l'uscita prevale)"""
+    state = np.where(exits, 0.0, np.where(entries, 1.0, np.nan))
+    rows = np.arange(state.shape[0])[:, None]
+    last = np.where(np.isnan(state), 0, rows)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = np.take_along_axis(state, last, axis=0)
+    return np.nan_to_num(filled)
+
+
+def positions(ctx, strategy, **params):
+    """Matrice delle posizioni (date x simboli) per una strategia"""
+    p = dict(STRATEGIES.get(strategy, {}))  # sconosciuta -> ValueError in fondo
+    p.update(params)
+    with np.errstate(invalid="ignore"):
+        if strategy == "rsi":
+            # Ipervenduto sotto `lower` -> ingresso, ipercomprato sopra `upper` -> uscita
+            value = ctx.rsi(int(p["window"]))
+            return hold(value < p["lower"], value > p["upper"])
+        if strategy == "ma_cross":
+            # Long mentre la media veloce è sopra la lenta (golden cross / death cross)
+            fast, slow = ctx.ma(int(p["fast"])), ctx.ma(int(p["slow"]))
+            return (fast > slow).astype(np.float64)
+        if strategy == "bollinger":
+            # Ritorno verso la media: ingresso sotto la banda inferiore, uscita sopra la media
+            middle, _, lower = ctx.bands(int(p["window"]), float(p["k"]))
+            return hold(ctx.close < lower, ctx.close > middle)
+        if strategy == "macd":
+            macd = ctx.ema(int(p["fast"])) - ctx.ema(int(p["slow"]))
+            signal = ema(macd, int(p["signal"]))
+            return (macd > signal).astype(np.float64)
+    raise ValueError(f"Strategia sconosciuta: {strategy}")
+
+
+def simulate(position, asset_returns, cost_bps=DEFAULT_COST_BPS):
+    """Rendimenti netti della strategia ed equity (date x simboli).
+
+    Il costo in punti base si applica al turnover |Δposizione| alla chiusura di t.
+    """
+    position = np.asarray(position, dtype=np.float64)
+    asset_returns = np.nan_to_num(np.asarray(asset_returns, dtype=np.float64))
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(position, axis=0, prepend=0.0))
+    costs = np.zeros_like(position)
+    costs[1:] = turnover[:-1] * cost_bps / 10_000.0
+    strategy_returns = held * asset_returns - costs
+    equity = np.cumprod(1.0 + strategy_returns, axis=0)
+    return strategy_returns, equity
+
+
+def metrics(strategy_returns, equity, position):
+    """Metriche per colonna: rendimento, CAGR, volatilità, Sharpe, drawdown, operazioni, esposizione"""
+    n = strategy_returns.shape[0]
+    years = max(n / TRADING_DAYS, 1e-9)
+    total = equity[-1] - 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cagr = np.where(equity[-1] > 0, equity[-1] ** (1.0 / years) - 1.0, -1.0)
+        vol = strategy_returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        sharpe = strategy_returns.mean(axis=0) * TRADING_DAYS / vol
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+    entries = (np.diff(position, axis=0, prepend=0.0) > 0).sum(axis=0)
+    return {
+        "total_return": total,
+        "cagr": cagr,
+        "volatility": vol,
+        "sharpe": np.where(vol > 0, sharpe, np.nan),
+        "max_drawdown": drawdown.min(axis=0),
+        "trades": entries.astype(np.float64),
+        "exposure": position.mean(axis=0),
+    }
+
+
+def backtest(close, strategy, cost_bps=DEFAULT_COST_BPS, ctx=None, **params):
+    """Esegue una strategia su tutti i simboli: (metriche per colonna, equity)"""
+    ctx = ctx or SignalContext(close)
+    position = positions(ctx, strategy, **params)
+    strategy_returns, equity = simulate(position, ctx.returns, cost_bps)
+    return metrics(strategy_returns, equity, position), equity
+
+
+def parameter_grid(grid):
+    """Prodotto cartesiano di {parametro: [valori]} come lista di dizionari"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+# --- Sweep su pool di processi ---
+
+_worker_ctx = None
+
+
+def _init_worker(close):
+    global _worker_ctx
+    _worker_ctx = SignalContext(close)
+
+
+def _run_chunk(strategy, combos, cost_bps):
+    rows = []
+    for combo in combos:
+        result, _ = backtest(None, strategy, cost_bps, ctx=_worker_ctx, **combo)
+        rows.append((combo, np.column_stack([result[m] for m in METRICS])))
+    return rows
+
+
+def sweep(close, strategy, grid, cost_bps=DEFAULT_COST_BPS, max_workers=None,
+          chunk_size=SWEEP_CHUNK, symbols=None):
+    """Valuta ogni combinazione di parametri su tutti i simboli.
+
+    close: DataFrame o array (date x simboli). grid: {parametro: [valori]}.
+    Restituisce un DataFrame con una riga per (combinazione, simbolo).
+    Con max_workers=1 lo sweep gira nel processo corrente.
+    """
+    if isinstance(close, pd.DataFrame):
+        symbols = list(close.columns) if symbols is None else symbols
+        close = close.to_numpy(np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    close = close[:, None] if close.ndim == 1 else close
+    symbols = symbols or [str(i) for i in range(close.shape[1])]
+
+    combos = parameter_grid(grid)
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(chunks) == 1:
+        _init_worker(close)
+        results = [_run_chunk(strategy, chunk, cost_bps) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(close,)) as pool:
+            results = list(pool.map(_run_chunk, itertools.repeat(strategy), chunks,
+                                    itertools.repeat(cost_bps)))
+
+    names = list(grid)
+    n_symbols = len(symbols)
+    params_rows, values = [], []
+    for chunk in results:
+        for combo, table in chunk:
+            params_rows.extend([combo] * n_symbols)
+            values.append(table)
+    frame = pd.DataFrame(params_rows, columns=names)
+    frame.insert(len(names), "symbol", symbols * (len(frame) // n_symbols if n_symbols else 0))
+    frame[list(METRICS)] = np.vstack(values) if values else np.empty((0, len(METRICS)))
+    return frame
+
+
+def best(results, metric="sharpe", by_symbol=True):
+    """Migliore combinazione per simbolo (o in media su tutti i simboli) secondo una metrica"""
+    if by_symbol:
+        order = results.sort_values(metric, ascending=False, na_position="last")
+        return order.drop_duplicates("symbol").set_index("symbol")
+    params = [c for c in results.columns if c not in METRICS and c != "symbol"]
+    return results.groupby(params)[list(METRICS)].mean().sort_values(metric, ascending=False)
@@ -0,0 +1,224 @@
+# Contenitore compatto per barre OHLCV (in particolare intraday 1m-90m)
+# Un solo buffer contiguo per simbolo, organizzato per colonne: timestamp int64 (ns UTC),
+# prezzi float32 oppure in virgola fissa (interi scalati) e volumi uint32/uint64.
+# 28 byte per barra contro i 48-64 di un DataFrame float64 con DatetimeIndex; le viste
+# NumPy e i DataFrame prodotti da to_frame() condividono la memoria del buffer.
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CachedTicker
+from providers import get_provider
+
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+DEFAULT_SCALE = 10_000  # 4 decimali in virgola fissa
+INTRADAY_WORKERS = 8
+
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def _layout(n, price_dtype, volume_dtype):
+    # Offset in byte di ogni colonna nel buffer: ts | prezzi (4 x n) | volume
+    price_size = np.dtype(price_dtype).itemsize
+    ts_end = 8 * n
+    prices_end = ts_end + 4 * n * price_size
+    return ts_end, prices_end, prices_end + n * np.dtype(volume_dtype).itemsize
+
+
+class Bars:
+    """Barre OHLCV di un simbolo in un buffer contiguo, con viste senza copia.
+
+    In modalità float i prezzi sono float32; con `scale` sono interi (int32, o int64 se
+    necessario) pari a prezzo * scale, e il valore minimo dell'intero indica un dato mancante.
+    """
+
+    def __init__(self, ts, prices, volume, scale=None, tz=None, symbol=None, buffer=None):
+        self.ts = ts
+        self.prices = prices  # (4, n): una riga contigua per Open, High, Low, Close
+        self.volume = volume
+        self.scale = scale
+        self.tz = tz
+        self.symbol = symbol
+        self.buffer = buffer
+
+    @classmethod
+    def allocate(cls, n, price_dtype=np.float32, volume_dtype=np.uint32, scale=None,
+                 tz=None, symbol=None, buffer=None):
+        """Riserva (o riusa) un buffer e ne ricava le viste per colonna"""
+        ts_end, prices_end, total = _layout(n, price_dtype, volume_dtype)
+        if buffer is None:
+            buffer = np.empty(total, dtype=np.uint8)
+        ts = buffer[:ts_end].view(np.int64)
+        prices = buffer[ts_end:prices_end].view(price_dtype).reshape(4, n)
+        volume = buffer[prices_end:total].view(volume_dtype)
+        return cls(ts, prices, volume, scale, tz, symbol, buffer)
+
+    @classmethod
+    def from_arrays(cls, ts, open_, high, low, close, volume, scale=None, tz=None, symbol=None):
+        """Costruisce le barre da array; scale attiva la virgola fissa"""
+        ts = np.asarray(ts, dtype=np.int64)
+        raw = np.vstack([np.asarray(a, dtype=np.float64) for a in (open_, high, low, close)])
+        volume = np.nan_to_num(np.asarray(volume, dtype=np.float64))
+        volume_dtype = np.uint64 if volume.size and volume.max() > _UINT32_MAX else np.uint32
+
+        if scale is None:
+            price_dtype = np.float32
+        else:
+            scaled = np.round(raw * scale)
+            limit = np.nanmax(np.abs(scaled)) if np.isfinite(scaled).any() else 0
+            price_dtype = np.int32 if limit < np.iinfo(np.int32).max else np.int64
+            missing = np.iinfo(price_dtype).min
+            raw = np.where(np.isfinite(scaled), scaled, missing)
+
+        bars = cls.allocate(len(ts), price_dtype, volume_dtype, scale, tz, symbol)
+        bars.ts[:] = ts
+        bars.prices[:] = raw
+        bars.volume[:] = np.clip(np.round(volume), 0, None)
+        return bars
+
+    @classmethod
+    def from_frame(cls, frame, scale=None, symbol=None):
+        """Da un DataFrame di ticker.history() (indice datetime, colonne OHLCV)"""
+        index = pd.DatetimeIndex(frame.index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc = index.tz_convert("UTC").tz_localize(None) if tz else index
+        ts = utc.as_unit("ns").asi8
+        volume = frame["Volume"] if "Volume" in frame else np.zeros(len(frame))
+        return cls.from_arrays(ts, frame["Open"], frame["High"], frame["Low"], frame["Close"],
+                               volume, scale, tz, symbol)
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.prices.nbytes + self.volume.nbytes
+
+    @property
+    def fixed(self):
+        return self.scale is not None
+
+    def field(self, name):
+        """Prezzi di un campo come float: vista senza copia (float32) o decodifica (virgola fissa)"""
+        raw = self.prices[PRICE_FIELDS.index(name)]
+        if not self.fixed:
+            return raw
+        missing = np.iinfo(raw.dtype).min
+        return np.where(raw == missing, np.nan, raw / self.scale)
+
+    @property
+    def open(self):
+        return self.field("Open")
+
+    @property
+    def high(self):
+        return self.field("High")
+
+    @property
+    def low(self):
+        return self.field("Low")
+
+    @property
+    def close(self):
+        return self.field("Close")
+
+    def index(self, tz=True):
+        """DatetimeIndex: senza copia in UTC naive (tz=False), nel fuso originale altrimenti"""
+        index = pd.DatetimeIndex(self.ts.view("datetime64[ns]"), copy=False, name="Datetime")
+        if tz and self.tz:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def to_frame(self, tz=False):
+        """DataFrame OHLCV. In modalità float le colonne condividono il buffer;
+        con tz=True solo l'indice viene copiato per applicare il fuso orario."""
+        columns = {name: self.field(name) for name in PRICE_FIELDS}
+        columns["Volume"] = self.volume
+        return pd.DataFrame(columns, index=self.index(tz), copy=False)
+
+    def searchsorted(self, when, side="left"):
+        """Posizione di un istante (Timestamp, stringa o int64 ns UTC)"""
+        if not isinstance(when, (int, np.integer)):
+            when = pd.Timestamp(when)
+            if when.tzinfo is None and self.tz:
+                when = when.tz_localize(self.tz)
+            when = (when.tz_convert("UTC").tz_localize(None) if when.tzinfo else when).as_unit("ns").value
+        return int(np.searchsorted(self.ts, when, side))
+
+    def between(self, start=None, end=None):
+        """Barre con start <= t <= end, come viste sullo stesso buffer"""
+        a = 0 if start is None else self.searchsorted(start, "left")
+        b = len(self) if end is None else self.searchsorted(end, "right")
+        return self[a:b]
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError("Bars supporta solo slice")
+        return Bars(self.ts[item], self.prices[:, item], self.volume[item],
+                    self.scale, self.tz, self.symbol, self.buffer)
+
+    @classmethod
+    def concat(cls, parts):
+        """Unisce più blocchi dello stesso simbolo in un nuovo buffer (stesse impostazioni)"""
+        parts = [p for p in parts if len(p)]
+        first = parts[0]
+        volume_dtype = np.result_type(*(p.volume.dtype for p in parts))
+        price_dtype = np.result_type(*(p.prices.dtype for p in parts))
+        n = sum(len(p) for p in parts)
+        out = cls.allocate(n, price_dtype, volume_dtype, first.scale, first.tz, first.symbol)
+        np.concatenate([p.ts for p in parts], out=out.ts)
+        np.concatenate([p.prices for p in parts], axis=1, out=out.prices)
+        np.concatenate([p.volume for p in parts], out=out.volume)
+        return out
+
+    def save(self, path):
+        """Scrive buffer (.npy) e metadati (.json); load() lo riapre in memory map"""
+        meta = {
+            "n": len(self),
+            "price_dtype": self.prices.dtype.str,
+            "volume_dtype": self.volume.dtype.str,
+            "scale": self.scale,
+            "tz": self.tz,
+            "symbol": self.symbol,
+        }
+        ts_end, prices_end, total = _layout(len(self), self.prices.dtype, self.volume.dtype)
+        buffer = np.empty(total, dtype=np.uint8)
+        buffer[:ts_end] = self.ts.view(np.uint8)
+        buffer[ts_end:prices_end] = np.ascontiguousarray(self.prices).reshape(-1).view(np.uint8)
+        buffer[prices_end:] = self.volume.view(np.uint8)
+        np.save(f"{path}.npy", buffer)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        buffer = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        return cls.allocate(meta["n"], np.dtype(meta["price_dtype"]), np.dtype(meta["volume_dtype"]),
+                            meta["scale"], meta["tz"], meta["symbol"], buffer)
+
+
+def load_intraday(symbols, cache, interval="1m", period="5d", scale=None, provider=None,
+                  max_workers=INTRADAY_WORKERS):
+    """Scarica la storia intraday di più simboli e la converte subito in Bars.
+
+    Restituisce {simbolo: Bars}; i simboli senza dati sono omessi. Con cache=None i
+    DataFrame scaricati non restano in memoria oltre la conversione.
+    """
+    def fetch(symbol):
+        ticker = CachedTicker(symbol, cache, provider) if cache is not None else None
+        if ticker is None:
+            symbol = symbol.strip().upper()
+            hist = (provider or get_provider()).history(symbol, interval=interval, period=period)
+            return symbol, None if hist is None or hist.empty else Bars.from_frame(hist, scale, symbol)
+        hist = ticker.history(interval=interval, period=period)
+        if hist is None or hist.empty:
+            return ticker.symbol, None
+        return ticker.symbol, Bars.from_frame(hist, scale, ticker.symbol)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="intraday") as pool:
+        return {symbol: bars for symbol, bars in pool.map(fetch, symbols) if bars is not None}
@@ -0,0 +1,131 @@
+# Modalità batch - watchlist di più simboli risolta in blocco
+
+import csv
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from availability import PROBES, check_availability
+from data_cache import CachedTicker
+from providers import get_provider
+
+BATCH_WORKERS = 8
+PRICE_PERIOD = "5d"
+DOWNLOAD_ENDPOINT = "download"
+SYMBOL_COLUMNS = ("symbol", "simbolo", "ticker")
+
+_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+def parse_symbols(text):
+    """Estrae i simboli da un testo separato da virgole, spazi o a capo"""
+    symbols = []
+    seen = set()
+    for token in _SEPARATORS.split(text or ""):
+        symbol = token.strip().strip('"\'').upper()
+        if symbol and symbol not in seen:
+            seen.add(symbol)
+            symbols.append(symbol)
+    return symbols
+
+
+def parse_watchlist_file(data):
+    """Legge una watchlist da file CSV (colonna symbol/ticker) o di testo"""
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    rows = list(csv.reader(io.StringIO(text)))
+    if rows:
+        header = [c.strip().lower() for c in rows[0]]
+        for name in SYMBOL_COLUMNS:
+            if name in header:
+                col = header.index(name)
+                return parse_symbols(",".join(r[col] for r in rows[1:] if len(r) > col))
+    return parse_symbols(text)
+
+
+def download_prices(symbols, cache, period=PRICE_PERIOD, provider=None):
+    """Prezzi per tutti i simboli con un solo download batch (solo quelli non in cache).
+
+    I frame di yf.download non hanno la forma di ticker.history() (indice giornaliero senza
+    fuso orario, niente colonne Dividends/Stock Splits): in cache stanno sotto l'endpoint
+    DOWNLOAD_ENDPOINT, separato da "history", così i due percorsi non si mescolano.
+    """
+    params = {"period": period}
+    prices = {}
+    missing = []
+    for symbol in symbols:
+        found, hist = cache.get(symbol, DOWNLOAD_ENDPOINT, params)
+        if found:
+            prices[symbol] = hist
+        else:
+            missing.append(symbol)
+
+    if missing:
+        provider = provider or get_provider()
+        frames = provider.download(missing, period=period)
+        for symbol in missing:
+            hist = frames.get(symbol, pd.DataFrame())
+            # Un download fallito (frame vuoto) non si salva, così la chiamata successiva riprova
+            if hist is not None and not hist.empty:
+                cache.put(symbol, DOWNLOAD_ENDPOINT, hist, params)
+            prices[symbol] = hist
+    return prices
+
+
+def _resolve_symbol(symbol, cache, provider=None, probe_pool=None):
+    ticker = CachedTicker(symbol, cache, provider)
+    try:
+        info = ticker.info or {}
+    except Exception as e:
+        return symbol, {}, None, str(e)
+    report = check_availability(symbol, ticker, info, executor=probe_pool)
+    return symbol, info, report, None
+
+
+def _price_summary(hist):
+    if hist is None or hist.empty or "Close" not in hist:
+        return None, None
+    closes = hist["Close"].dropna()
+    if closes.empty:
+        return None, None
+    last = float(closes.iloc[-1])
+    change = (last / float(closes.iloc[0]) - 1) * 100 if len(closes) > 1 else None
+    return last, change
+
+
+def resolve_watchlist(symbols, cache, max_workers=BATCH_WORKERS, provider=None):
+    """Tabella comparativa: prezzi da download batch, info e probe su pool limitato"""
+    prices = download_prices(symbols, cache, provider=provider)
+    # Pool dei probe dedicato, dimensionato perché i probe di ogni simbolo non attendano in coda
+    probes = ThreadPoolExecutor(max_workers=max_workers * len(PROBES), thread_name_prefix="batch-probe")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as pool:
+            resolved = list(pool.map(lambda s: _resolve_symbol(s, cache, provider, probes), symbols))
+    finally:
+        # I probe andati in timeout non bloccano la risposta
+        probes.shutdown(wait=False, cancel_futures=True)
+
+    rows = []
+    for symbol, info, report, error in resolved:
+        last, change = _price_summary(prices.get(symbol))
+        row = {
+            "Simbolo": symbol,
+            "Nome": info.get("longName") or info.get("shortName"),
+            "Settore": info.get("sector"),
+            "Prezzo": last if last is not None else info.get("currentPrice"),
+            f"Var. {PRICE_PERIOD} %": change,
+            "P/E": info.get("trailingPE"),
+            "Market Cap": info.get("marketCap"),
+            "Beta": info.get("beta"),
+        }
+        if report is not None:
+            for result in report.results:
+                row[result.category] = result.status
+        row["Errore"] = error
+        rows.append(row)
+
+    df = pd.DataFrame(rows)
+    if not df.empty and df["Errore"].isna().all():
+        df = df.drop(columns="Errore")
+    return df
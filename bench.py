@@ -0,0 +1,350 @@
+# Benchmark delle sezioni della guida e del flusso dati di esempio
+# Esegue ogni funzione show_* con uno "st" finto e un provider offline, misurando
+# tempo, allocazioni e numero di richieste upstream; confronta con una baseline salvata.
+#
+#   python bench.py                         # provider sintetico, confronto con baseline
+#   python bench.py --fixtures DIR          # replay di fixture registrate
+#   python bench.py --save-baseline         # aggiorna la baseline
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import guida
+from data_cache import DataCache
+from providers import DataProvider, FixtureProvider, set_provider
+
+BASELINE_PATH = "bench_baseline.json"
+DEFAULT_REPEAT = 5
+TIME_TOLERANCE = 0.25
+ALLOC_TOLERANCE = 0.25
+
+EXAMPLE_SYMBOL = "AAPL"
+WATCHLIST = ["AAPL", "MSFT", "GOOG", "AMZN", "META", "NVDA", "TSLA", "JPM"]
+CONCURRENT_SESSIONS = 8
+
+
+class _StubElement:
+    """Sostituto di Streamlit: ogni chiamata è una no-op, utilizzabile come context manager"""
+
+    errors = []  # messaggi di st.error, condivisi da tutti gli elementi
+
+    def error(self, message, *args, **kwargs):
+        _StubElement.errors.append(str(message))
+        return self
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def columns(self, spec, *args, **kwargs):
+        n = spec if isinstance(spec, int) else len(spec)
+        return [_StubElement() for _ in range(n)]
+
+    def tabs(self, labels, *args, **kwargs):
+        return [_StubElement() for _ in labels]
+
+
+class SyntheticProvider(DataProvider):
+    """Provider deterministico che genera dati plausibili senza rete"""
+
+    name = "synthetic"
+
+    def __init__(self, bars=260, latency=0.0):
+        self.bars = bars
+        self.latency = latency
+
+    def _rng(self, symbol, salt=0):
+        if self.latency:
+            time.sleep(self.latency)
+        return np.random.default_rng(sum(map(ord, symbol)) * 1000 + salt)
+
+    def info(self, symbol):
+        rng = self._rng(symbol)
+        price = float(rng.uniform(20, 500))
+        return {
+            "symbol": symbol,
+            "longName": f"{symbol} Corporation",
+            "sector": "Technology",
+            "currentPrice": price,
+            "trailingPE": float(rng.uniform(8, 40)),
+            "marketCap": int(price * 1e9),
+            "beta": float(rng.uniform(0.5, 2.0)),
+            "totalEsg": float(rng.uniform(10, 40)),
+        }
+
+    def history(self, symbol, **params):
+        rng = self._rng(symbol, 1)
+        index = pd.bdate_range(end="2024-06-28", periods=self.bars, tz="America/New_York")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, self.bars)))
+        return pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.003, self.bars)),
+            "High": close * (1 + rng.uniform(0, 0.02, self.bars)),
+            "Low": close * (1 - rng.uniform(0, 0.02, self.bars)),
+            "Close": close,
+            "Volume": rng.integers(1e6, 5e7, self.bars).astype(float),
+        }, index=index)
+
+    def options(self, symbol):
+        self._rng(symbol)
+        return tuple(d.strftime("%Y-%m-%d") for d in pd.date_range("2024-07-05", periods=8, freq="W-FRI"))
+
+    def option_chain(self, symbol, date=None):
+        rng = self._rng(symbol, 2)
+        strikes = np.arange(50.0, 150.0, 2.5)
+        frame = pd.DataFrame({
+            "contractSymbol": [f"{symbol}C{int(k * 1000):08d}" for k in strikes],
+            "strike": strikes,
+            "lastPrice": rng.uniform(0.1, 20, len(strikes)),
+            "bid": rng.uniform(0.1, 20, len(strikes)),
+            "ask": rng.uniform(0.1, 20, len(strikes)),
+            "volume": rng.integers(0, 5000, len(strikes)).astype(float),
+            "openInterest": rng.integers(0, 20000, len(strikes)).astype(float),
+            "impliedVolatility": rng.uniform(0.1, 0.8, len(strikes)),
+            "inTheMoney": strikes < 100,
+        })
+        return type("Options", (), {"calls": frame, "puts": frame.copy(), "underlying": {}})()
+
+    def statement(self, symbol, name):
+        rng = self._rng(symbol, 3)
+        columns = pd.to_datetime(["2023-12-31", "2022-12-31", "2021-12-31", "2020-12-31"])
+        rows = ["Total Revenue", "Net Income", "Operating Cash Flow", "Capital Expenditure",
+                "Total Assets", "Current Assets", "Current Liabilities"]
+        return pd.DataFrame(rng.uniform(1e8, 1e10, (len(rows), len(columns))), index=rows, columns=columns)
+
+    def dividends(self, symbol):
+        self._rng(symbol)
+        index = pd.date_range("2020-02-07", periods=16, freq="QS", tz="America/New_York")
+        return pd.Series(0.2, index=index, name="Dividends")
+
+    def splits(self, symbol):
+        self._rng(symbol)
+        return pd.Series([4.0], index=pd.DatetimeIndex(["2020-08-31"], tz="America/New_York"),
+                         name="Stock Splits")
+
+
+class CountingProvider(DataProvider):
+    """Conta le richieste upstream per endpoint prima di inoltrarle"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = f"counting({inner.name})"
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, endpoint, n=1):
+        with self._lock:
+            self.calls[endpoint] += n
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+
+    def info(self, symbol):
+        self._count("info")
+        return self.inner.info(symbol)
+
+    def history(self, symbol, **params):
+        self._count("history")
+        return self.inner.history(symbol, **params)
+
+    def options(self, symbol):
+        self._count("options")
+        return self.inner.options(symbol)
+
+    def option_chain(self, symbol, date=None):
+        self._count("option_chain")
+        return self.inner.option_chain(symbol, date)
+
+    def statement(self, symbol, name):
+        self._count(name)
+        return self.inner.statement(symbol, name)
+
+    def dividends(self, symbol):
+        self._count("dividends")
+        return self.inner.dividends(symbol)
+
+    def splits(self, symbol):
+        self._count("splits")
+        return self.inner.splits(symbol)
+
+    def download(self, symbols, **params):
+        self._count("download")
+        return self.inner.download(symbols, **params)
+
+
+def _sections():
+    """Casi di benchmark: nome -> (preparazione, esecuzione)"""
+    def fresh_cache():
+        cache = DataCache()
+        guida.get_data_cache = lambda: cache
+
+    def warm_cache():
+        cache = DataCache()
+        guida.get_data_cache = lambda: cache
+        guida.show_example_data(EXAMPLE_SYMBOL)
+
+    def concurrent_sessions():
+        # Più utenti aprono lo stesso simbolo insieme: le richieste non devono moltiplicarsi
+        threads = [threading.Thread(target=guida.show_example_data, args=(EXAMPLE_SYMBOL,))
+                   for _ in range(CONCURRENT_SESSIONS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    cases = {
+        name: (None, getattr(guida, name))
+        for name in (
+            "show_basic_info", "show_financial_ratios", "show_trading_data",
+            "show_company_info", "show_historical_data", "show_options_data",
+            "show_financial_statements", "show_cash_flow", "show_growth_dividends",
+            "show_technical_analysis", "show_esg_data", "show_usage_guide",
+        )
+    }
+    cases["show_search_results"] = (None, lambda: guida.show_search_results("dividendi"))
+    cases["example_data_cold"] = (fresh_cache, lambda: guida.show_example_data(EXAMPLE_SYMBOL))
+    cases["example_data_warm"] = (warm_cache, lambda: guida.show_example_data(EXAMPLE_SYMBOL))
+    cases["example_data_sessions"] = (fresh_cache, concurrent_sessions)
+    cases["batch_data_cold"] = (fresh_cache, lambda: guida.show_batch_data(WATCHLIST))
+    return cases
+
+
+def run_case(setup, func, counter, repeat):
+    """Misura un caso: tempi (senza tracemalloc), poi allocazioni e richieste in un'esecuzione separata"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    counter.reset()
+    _StubElement.errors.clear()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_ms": statistics.median(times) * 1000,
+        "min_ms": min(times) * 1000,
+        "peak_kib": peak / 1024,
+        "upstream_calls": sum(counter.calls.values()),
+        "calls_by_endpoint": dict(sorted(counter.calls.items())),
+        "errors": list(_StubElement.errors),
+    }
+
+
+def run(provider, repeat=DEFAULT_REPEAT, only=None):
+    """Esegue tutti i casi con "st" finto e provider contato"""
+    counter = CountingProvider(provider)
+    set_provider(counter)
+    original_st, original_cache = guida.st, guida.get_data_cache
+    guida.st = _StubElement()
+    try:
+        results = {}
+        for name, (setup, func) in _sections().items():
+            if only and name not in only:
+                continue
+            guida.get_data_cache = lambda: DataCache()
+            results[name] = run_case(setup, func, counter, repeat)
+        return results
+    finally:
+        guida.st, guida.get_data_cache = original_st, original_cache
+        set_provider(None)
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, alloc_tolerance=ALLOC_TOLERANCE):
+    """Regressioni rispetto alla baseline: lista di messaggi"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["median_ms"] > base["median_ms"] * (1 + time_tolerance):
+            regressions.append(f"{name}: tempo {base['median_ms']:.2f} -> {current['median_ms']:.2f} ms")
+        if current["peak_kib"] > base["peak_kib"] * (1 + alloc_tolerance):
+            regressions.append(f"{name}: memoria {base['peak_kib']:.0f} -> {current['peak_kib']:.0f} KiB")
+        if current["upstream_calls"] > base["upstream_calls"]:
+            regressions.append(f"{name}: richieste {base['upstream_calls']} -> {current['upstream_calls']}")
+    return regressions
+
+
+def format_report(results, baseline=None):
+    lines = [f"{'caso':<28}{'mediana ms':>12}{'min ms':>10}{'picco KiB':>12}{'richieste':>11}{'Δ tempo':>10}"]
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name]["median_ms"] > 0:
+            delta = f"{(r['median_ms'] / baseline[name]['median_ms'] - 1) * 100:+.0f}%"
+        lines.append(f"{name:<28}{r['median_ms']:>12.2f}{r['min_ms']:>10.2f}"
+                     f"{r['peak_kib']:>12.0f}{r['upstream_calls']:>11}{delta:>10}")
+        for message in r["errors"]:
+            lines.append(f"    ⚠️ {message}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark delle sezioni della guida")
+    parser.add_argument("--fixtures", help="cartella di fixture registrate (default: provider sintetico)")
+    parser.add_argument("--latency", type=float, default=0.0, help="latenza simulata per richiesta (s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", nargs="*", help="esegue solo i casi indicati")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        provider = FixtureProvider(args.fixtures, latency=args.latency)
+    else:
+        provider = SyntheticProvider(latency=args.latency)
+
+    results = run(provider, args.repeat, args.only)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_report(results, baseline))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline salvata in {args.baseline}")
+        return 0
+
+    if baseline:
+        regressions = compare(results, baseline)
+        if regressions:
+            print("\nRegressioni:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNessuna regressione rispetto alla baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
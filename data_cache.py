@@ -0,0 +1,436 @@
+# Cache dei dati Yahoo Finance - LRU in memoria con store opzionale su disco
+# Le chiavi sono (simbolo, endpoint, parametri); ogni endpoint ha il suo TTL.
+# get_or_fetch è single-flight: richieste concorrenti per la stessa chiave attendono
+# il primo fetch invece di ripeterlo. Con shared_path lo store SQLite è condiviso da
+# più processi, che si coordinano con un lease per chiave. Con snapshot le letture
+# mancanti consultano uno snapshot precalcolato (vedi snapshot.py) prima della rete.
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from providers import get_provider
+from shared_store import SQLiteStore
+
+# TTL in secondi per endpoint: quotazioni brevi, bilanci lunghi
+ENDPOINT_TTL = {
+    "info": 15 * 60,
+    "history": 60,
+    "download": 60,
+    "options": 30 * 60,
+    "option_chain": 5 * 60,
+    "dividends": 12 * 3600,
+    "splits": 12 * 3600,
+    "financials": 24 * 3600,
+    "quarterly_financials": 24 * 3600,
+    "balance_sheet": 24 * 3600,
+    "quarterly_balance_sheet": 24 * 3600,
+    "cashflow": 24 * 3600,
+    "quarterly_cashflow": 24 * 3600,
+}
+DEFAULT_TTL = 5 * 60
+DISK_RESYNC = 1000  # scritture su disco tra due scansioni complete della cartella
+DISK_PRUNE_TO = 0.9  # la eviction scende sotto questa frazione del limite: niente scansioni a ogni put
+
+
+def estimate_nbytes(value):
+    """Stima l'occupazione in byte di un valore in cache"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value) + 64
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+def make_key(symbol, endpoint, params=None):
+    """Costruisce la chiave (simbolo, endpoint, parametri) normalizzata"""
+    items = tuple(sorted((params or {}).items()))
+    return (symbol.strip().upper(), endpoint, items)
+
+
+class _Flight:
+    """Fetch in corso, condiviso dai thread che chiedono la stessa chiave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class DataCache:
+    """Cache LRU thread-safe con TTL per endpoint ed eviction per byte"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None, disk_dir=None,
+                 disk_max_bytes=2 * 1024 * 1024 * 1024, shared_path=None, snapshot=None):
+        self.max_bytes = max_bytes
+        self.ttl = dict(ENDPOINT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        # Totale corrente dei byte su disco: si riscansiona la cartella solo oltre il limite
+        # o ogni DISK_RESYNC scritture (altri processi possono scrivere nella stessa cartella)
+        self._disk_bytes = None
+        self._disk_writes = 0
+        self._disk_lock = threading.Lock()
+        self.shared = SQLiteStore(shared_path, disk_max_bytes) if shared_path else None
+        self.snapshot = snapshot
+        self._entries = OrderedDict()  # chiave -> (valore, scadenza, byte)
+        self._bytes = 0
+        self._flights = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.fetches = 0
+        self.errors = 0
+
+    # --- API principale ---
+
+    def get(self, symbol, endpoint, params=None):
+        """Restituisce (trovato, valore) cercando in memoria, su disco e nello store condiviso"""
+        key = make_key(symbol, endpoint, params)
+        found, value = self._lookup(key)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, value
+
+    def put(self, symbol, endpoint, value, params=None):
+        """Salva un valore con il TTL previsto per l'endpoint"""
+        self._put(make_key(symbol, endpoint, params), value)
+
+    def get_or_fetch(self, symbol, endpoint, fetch, params=None):
+        """Restituisce il valore in cache oppure lo scarica con fetch().
+
+        Un solo fetch per chiave alla volta: gli altri thread (e, con lo store
+        condiviso, gli altri processi) attendono il risultato del primo.
+        """
+        found, value = self.get(symbol, endpoint, params)
+        if found:
+            return value
+        key = make_key(symbol, endpoint, params)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.waits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._fetch(key, fetch)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def _fetch(self, key, fetch):
+        # Un altro thread potrebbe aver completato il fetch dopo il nostro get()
+        found, value = self._lookup(key)
+        if found:
+            return value
+        lease = False
+        if self.shared is not None:
+            lease = self.shared.acquire_lease(key)
+            if not lease:
+                found, value, expires_at = self.shared.wait_for(key)
+                if found:
+                    with self._lock:
+                        self._store(key, value, expires_at)
+                    return value
+        try:
+            with self._lock:
+                self.fetches += 1
+            value = fetch()
+            self._put(key, value)
+        finally:
+            if lease:
+                self.shared.release_lease(key)
+        return value
+
+    def _lookup(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return True, value
+                self._drop(key)
+
+        found, value, expires_at = self._disk_read(key, now)
+        if not found and self.shared is not None:
+            found, value, expires_at = self.shared.read(key, now)
+        if not found and self.snapshot is not None:
+            found, value, expires_at = self.snapshot.read(key, now)
+        if found:
+            with self._lock:
+                self._store(key, value, expires_at)
+        return found, value
+
+    def _put(self, key, value):
+        expires_at = time.time() + self.ttl.get(key[1], DEFAULT_TTL)
+        with self._lock:
+            self._store(key, value, expires_at)
+        self._disk_write(key, value, expires_at)
+        if self.shared is not None:
+            self.shared.write(key, value, expires_at)
+
+    def invalidate(self, symbol=None, endpoint=None):
+        """Rimuove le voci per simbolo e/o endpoint (tutte se entrambi None)"""
+        symbol = symbol.strip().upper() if symbol else None
+        with self._lock:
+            for key in list(self._entries):
+                if symbol is not None and key[0] != symbol:
+                    continue
+                if endpoint is not None and key[1] != endpoint:
+                    continue
+                self._drop(key)
+        if self.disk_dir:
+            for path, key in self._disk_entries():
+                if key is None:
+                    continue
+                if symbol is not None and key[0] != symbol:
+                    continue
+                if endpoint is not None and key[1] != endpoint:
+                    continue
+                self._disk_remove(path)
+        if self.shared is not None:
+            self.shared.delete(symbol, endpoint)
+
+    def stats(self):
+        """Statistiche di utilizzo della cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "voci": len(self._entries),
+                "byte": self._bytes,
+                "hit": self.hits,
+                "miss": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "fetch": self.fetches,
+                "attese": self.waits,
+                "errori": self.errors,
+                "in_corso": len(self._flights),
+            }
+
+    # --- Memoria ---
+
+    def _store(self, key, value, expires_at):
+        nbytes = estimate_nbytes(value)
+        if key in self._entries:
+            self._drop(key)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (value, expires_at, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    # --- Disco ---
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def _disk_read(self, key, now):
+        if not self.disk_dir:
+            return False, None, 0
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, expires_at = pickle.load(f)
+                if stored_key != key or expires_at <= now:
+                    raise LookupError
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return False, None, 0
+        except Exception:
+            # Voce scaduta, collisione di hash o file corrotto
+            self._disk_remove(path)
+            return False, None, 0
+        try:
+            os.utime(path)  # aggiorna l'ordine LRU su disco
+        except OSError:
+            pass
+        return True, value, expires_at
+
+    def _disk_write(self, key, value, expires_at):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                # Intestazione separata dal valore: invalidate() legge solo la chiave
+                pickle.dump((key, expires_at), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            replaced = _file_size(path)
+            os.replace(tmp_path, path)
+        except Exception:
+            _remove_quietly(tmp_path)
+            return
+        with self._disk_lock:
+            self._disk_writes += 1
+            if self._disk_bytes is None or self._disk_writes % DISK_RESYNC == 0:
+                self._disk_bytes = None
+            else:
+                self._disk_bytes += size - replaced
+            over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._disk_prune()
+
+    def _disk_remove(self, path):
+        size = _file_size(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def _disk_entries(self):
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    key = pickle.load(f)[0]
+            except Exception:
+                key = None
+            yield path, key
+
+    def _disk_prune(self):
+        # Eviction su disco per byte, dai file usati meno di recente; risincronizza il totale
+        files = []
+        total = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total > self.disk_max_bytes:
+            target = self.disk_max_bytes * DISK_PRUNE_TO
+            for _, size, path in sorted(files):
+                _remove_quietly(path)
+                total -= size
+                if total <= target:
+                    break
+        with self._disk_lock:
+            self._disk_bytes = total
+
+
+def _file_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CachedTicker:
+    """Ticker con la stessa interfaccia di yf.Ticker che legge ogni endpoint attraverso una DataCache"""
+
+    def __init__(self, symbol, cache, provider=None):
+        self.symbol = symbol.strip().upper()
+        self.cache = cache
+        self.provider = provider or get_provider()
+
+    def _get(self, endpoint, fetch, params=None):
+        return self.cache.get_or_fetch(self.symbol, endpoint, fetch, params)
+
+    def _statement(self, name):
+        return self._get(name, lambda: self.provider.statement(self.symbol, name))
+
+    @property
+    def info(self):
+        return self._get("info", lambda: self.provider.info(self.symbol))
+
+    def history(self, **params):
+        return self._get("history", lambda: self.provider.history(self.symbol, **params), params)
+
+    @property
+    def options(self):
+        return self._get("options", lambda: self.provider.options(self.symbol))
+
+    def option_chain(self, date=None):
+        return self._get("option_chain", lambda: self.provider.option_chain(self.symbol, date),
+                         {"date": date})
+
+    @property
+    def dividends(self):
+        return self._get("dividends", lambda: self.provider.dividends(self.symbol))
+
+    @property
+    def splits(self):
+        return self._get("splits", lambda: self.provider.splits(self.symbol))
+
+    @property
+    def financials(self):
+        return self._statement("financials")
+
+    @property
+    def quarterly_financials(self):
+        return self._statement("quarterly_financials")
+
+    @property
+    def balance_sheet(self):
+        return self._statement("balance_sheet")
+
+    @property
+    def quarterly_balance_sheet(self):
+        return self._statement("quarterly_balance_sheet")
+
+    @property
+    def cashflow(self):
+        return self._statement("cashflow")
+
+    @property
+    def quarterly_cashflow(self):
+        return self._statement("quarterly_cashflow")
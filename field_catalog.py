@@ -0,0 +1,342 @@
+# Catalogo dei campi yfinance documentati nella guida
+# Registro unico per sezione; i DataFrame vengono costruiti una sola volta per processo.
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class Table:
+    """Tabella del catalogo: sezione della guida, colonne e righe"""
+    section: str
+    columns: tuple
+    rows: tuple
+
+
+TABLES = {
+    "data_fields": Table(
+        section="📊 Informazioni Base",
+        columns=("campo", "descrizione", "esempio", "tipo"),
+        rows=(
+            ("symbol", "Simbolo ticker del titolo", "AAPL", "str"),
+            ("longName", "Nome completo dell'azienda", "Apple Inc.", "str"),
+            ("shortName", "Nome abbreviato", "Apple Inc.", "str"),
+            ("currentPrice", "Prezzo corrente dell'azione", "175.43", "float"),
+            ("previousClose", "Prezzo di chiusura precedente", "174.91", "float"),
+            ("open", "Prezzo di apertura giornaliero", "175.20", "float"),
+            ("dayLow", "Prezzo minimo giornaliero", "174.50", "float"),
+            ("dayHigh", "Prezzo massimo giornaliero", "176.80", "float"),
+            ("regularMarketOpen", "Apertura del mercato regolare", "175.20", "float"),
+            ("regularMarketDayHigh", "Massimo del mercato regolare", "176.80", "float"),
+            ("regularMarketDayLow", "Minimo del mercato regolare", "174.50", "float"),
+            ("regularMarketPreviousClose", "Chiusura precedente mercato regolare", "174.91", "float"),
+        ),
+    ),
+    "valuation_ratios": Table(
+        section="💰 Ratios Finanziari",
+        columns=("campo", "descrizione", "formula", "interpretazione"),
+        rows=(
+            ("trailingPE", "Price-to-Earnings ratio (ultimi 12 mesi)", "Prezzo / Utili per Azione", "Quanto gli investitori pagano per ogni $ di utili. P/E basso può indicare sottovalutazione."),
+            ("forwardPE", "P/E prospettico basato su stime future", "Prezzo / Utili Stimati", "P/E basato su previsioni analisti. Utile per valutare crescita attesa."),
+            ("pegRatio", "Price/Earnings to Growth ratio", "P/E / Tasso Crescita Utili", "PEG < 1 può indicare sottovalutazione rispetto alla crescita."),
+            ("priceToBook", "Rapporto prezzo/valore contabile", "Prezzo / Patrimonio Netto per Azione", "P/B < 1 può indicare che l'azione è sottovalutata."),
+            ("priceToSalesTrailing12Months", "Rapporto prezzo/ricavi", "Market Cap / Ricavi Annuali", "Valuta se l'azienda è cara rispetto ai suoi ricavi."),
+            ("enterpriseValue", "Valore dell'impresa", "Market Cap + Debito - Liquidità", "Costo teorico per acquisire l'intera azienda."),
+            ("enterpriseToRevenue", "EV/Ricavi", "Enterprise Value / Ricavi", "Rapporto enterprise value sui ricavi annuali."),
+            ("enterpriseToEbitda", "EV/EBITDA", "Enterprise Value / EBITDA", "Multiplo comune per valutazioni M&A."),
+        ),
+    ),
+    "profitability_ratios": Table(
+        section="💰 Ratios Finanziari",
+        columns=("campo", "descrizione", "formula", "interpretazione"),
+        rows=(
+            ("returnOnEquity", "Return on Equity (ROE)", "Utile Netto / Patrimonio Netto", "Efficienza nell'utilizzo del capitale degli azionisti. ROE > 15% è generalmente buono."),
+            ("returnOnAssets", "Return on Assets (ROA)", "Utile Netto / Totale Attivi", "Efficienza nell'utilizzo degli asset. ROA > 5% è positivo."),
+            ("profitMargins", "Margine di profitto netto", "Utile Netto / Ricavi", "Percentuale di ricavi che diventa profitto. Più alto è meglio."),
+            ("operatingMargins", "Margine operativo", "Utile Operativo / Ricavi", "Efficienza operativa. Margini > 15% sono buoni."),
+            ("grossMargins", "Margine lordo", "(Ricavi - Costo Venduto) / Ricavi", "Redditività dopo i costi diretti di produzione."),
+            ("ebitdaMargins", "Margine EBITDA", "EBITDA / Ricavi", "Redditività operativa prima di ammortamenti e tasse."),
+        ),
+    ),
+    "liquidity_ratios": Table(
+        section="💰 Ratios Finanziari",
+        columns=("campo", "descrizione", "formula", "interpretazione"),
+        rows=(
+            ("currentRatio", "Rapporto di liquidità corrente", "Attivi Correnti / Passivi Correnti", "Capacità di pagare debiti a breve. Ratio > 1.5 è buono."),
+            ("quickRatio", "Rapporto di liquidità immediata", "(Attivi Correnti - Scorte) / Passivi Correnti", "Liquidità senza considerare le scorte. > 1 è positivo."),
+            ("debtToEquity", "Rapporto debito/patrimonio", "Debito Totale / Patrimonio Netto", "Livello di indebitamento. Valori bassi indicano minor rischio."),
+            ("totalDebt", "Debito totale", "Debiti a Breve + Debiti a Lungo Termine", "Ammontare totale dei debiti dell'azienda."),
+            ("totalCash", "Liquidità totale", "Contanti + Equivalenti di Cassa", "Disponibilità liquide dell'azienda."),
+            ("totalCashPerShare", "Liquidità per azione", "Liquidità Totale / Azioni Outstanding", "Liquidità disponibile per ogni azione."),
+        ),
+    ),
+    "trading_data": Table(
+        section="📈 Dati di Trading",
+        columns=("campo", "descrizione", "spiegazione"),
+        rows=(
+            ("volume", "Volume di scambi giornaliero", "Numero di azioni scambiate nel giorno. Volume alto indica interesse."),
+            ("averageVolume", "Volume medio (ultimi 3 mesi)", "Media del volume giornaliero. Utile per identificare giorni anomali."),
+            ("averageVolume10days", "Volume medio (ultimi 10 giorni)", "Volume medio più recente, utile per trend di breve periodo."),
+            ("marketCap", "Capitalizzazione di mercato", "Valore totale di tutte le azioni (Prezzo × Azioni Outstanding)."),
+            ("sharesOutstanding", "Azioni in circolazione", "Numero totale di azioni emesse e in circolazione."),
+            ("floatShares", "Azioni flottanti", "Azioni disponibili per il trading pubblico (esclude insider)."),
+            ("sharesShort", "Azioni vendute allo scoperto", "Numero di azioni attualmente in posizione short."),
+            ("shortRatio", "Rapporto short", "Giorni necessari per coprire tutte le posizioni short al volume medio."),
+            ("shortPercentOfFloat", "% short sul flottante", "Percentuale del flottante venduto allo scoperto."),
+            ("beta", "Beta (volatilità relativa)", "Volatilità rispetto al mercato. Beta > 1 = più volatile del mercato."),
+            ("52WeekLow", "Minimo a 52 settimane", "Prezzo più basso degli ultimi 12 mesi."),
+            ("52WeekHigh", "Massimo a 52 settimane", "Prezzo più alto degli ultimi 12 mesi."),
+            ("fiftyTwoWeekLowChange", "Variazione dal minimo 52w", "Differenza tra prezzo corrente e minimo annuale."),
+            ("fiftyTwoWeekHighChange", "Variazione dal massimo 52w", "Differenza tra prezzo corrente e massimo annuale."),
+        ),
+    ),
+    "technical_data": Table(
+        section="📈 Dati di Trading",
+        columns=("campo", "descrizione", "spiegazione"),
+        rows=(
+            ("fiftyDayAverage", "Media mobile a 50 giorni", "Prezzo medio degli ultimi 50 giorni. Trend di medio termine."),
+            ("twoHundredDayAverage", "Media mobile a 200 giorni", "Prezzo medio degli ultimi 200 giorni. Trend di lungo termine."),
+            ("fiftyDayAverageChange", "Variazione da media 50gg", "Differenza tra prezzo corrente e media mobile 50 giorni."),
+            ("twoHundredDayAverageChange", "Variazione da media 200gg", "Differenza tra prezzo corrente e media mobile 200 giorni."),
+        ),
+    ),
+    "company_data": Table(
+        section="🏢 Informazioni Aziendali",
+        columns=("campo", "descrizione", "esempio", "utilità"),
+        rows=(
+            ("sector", "Settore di appartenenza", "Technology, Healthcare, Financial Services", "Classificazione macro-settoriale per comparazioni"),
+            ("industry", "Industria specifica", "Consumer Electronics, Biotechnology", "Sotto-categoria più specifica del settore"),
+            ("fullTimeEmployees", "Dipendenti a tempo pieno", "147000", "Dimensione aziendale e confronti settoriali"),
+            ("longBusinessSummary", "Descrizione business completa", "Descrizione dettagliata dell'attività aziendale", "Comprensione del modello di business"),
+            ("website", "Sito web aziendale", "https://www.apple.com", "Link diretto al sito ufficiale"),
+            ("phone", "Numero di telefono", "408 996 1010", "Contatto investor relations"),
+            ("address1", "Indirizzo sede principale", "One Apple Park Way", "Localizzazione geografica"),
+            ("city", "Città sede", "Cupertino", "Ubicazione geografica"),
+            ("state", "Stato/Provincia", "CA", "Giurisdizione fiscale e regolamentare"),
+            ("zip", "Codice postale", "95014", "Indirizzo completo"),
+            ("country", "Paese sede legale", "United States", "Giurisdizione e analisi geografica"),
+        ),
+    ),
+    "management_data": Table(
+        section="🏢 Informazioni Aziendali",
+        columns=("campo", "descrizione", "contenuto", "utilità"),
+        rows=(
+            ("companyOfficers", "Lista dirigenti aziendali", "Nome, ruolo, età, compenso totale", "Analisi del management team"),
+            ("governanceEpochDate", "Data aggiornamento governance", "Timestamp ultimo aggiornamento", "Freschezza dei dati governance"),
+            ("compensationRisk", "Rischio compensi", "Score 1-10", "Valutazione politiche retributive"),
+            ("auditRisk", "Rischio audit", "Score 1-10", "Qualità controlli contabili"),
+            ("boardRisk", "Rischio board", "Score 1-10", "Efficacia consiglio amministrazione"),
+            ("shareHolderRightsRisk", "Rischio diritti azionisti", "Score 1-10", "Protezione interessi azionisti"),
+        ),
+    ),
+    "periods_info": Table(
+        section="📋 Dati Storici",
+        columns=("periodo", "descrizione", "dettaglio"),
+        rows=(
+            ("1d", "1 giorno", "Dati intraday con intervalli di 1m, 2m, 5m, 15m, 30m, 60m, 90m"),
+            ("5d", "5 giorni", "Dati recenti con alta granularità"),
+            ("1mo", "1 mese", "Ultimo mese di trading"),
+            ("3mo", "3 mesi", "Trimestre corrente"),
+            ("6mo", "6 mesi", "Semestre corrente"),
+            ("1y", "1 anno", "Ultimi 12 mesi"),
+            ("2y", "2 anni", "Dati biennali"),
+            ("5y", "5 anni", "Quinquennio"),
+            ("10y", "10 anni", "Decennio"),
+            ("ytd", "Year-to-date", "Dall'inizio dell'anno"),
+            ("max", "Massimo disponibile", "Tutti i dati storici disponibili"),
+        ),
+    ),
+    "historical_fields": Table(
+        section="📋 Dati Storici",
+        columns=("campo", "descrizione", "utilità"),
+        rows=(
+            ("Open", "Prezzo di apertura", "Primo prezzo della sessione di trading"),
+            ("High", "Prezzo massimo", "Prezzo più alto raggiunto nel periodo"),
+            ("Low", "Prezzo minimo", "Prezzo più basso raggiunto nel periodo"),
+            ("Close", "Prezzo di chiusura", "Ultimo prezzo della sessione"),
+            ("Adj Close", "Prezzo aggiustato", "Prezzo corretto per split e dividendi"),
+            ("Volume", "Volume scambiato", "Numero di azioni scambiate nel periodo"),
+        ),
+    ),
+    "call_fields": Table(
+        section="🎯 Opzioni",
+        columns=("campo", "descrizione", "esempio"),
+        rows=(
+            ("contractSymbol", "Simbolo univoco del contratto", "AAPL240119C00180000"),
+            ("strike", "Prezzo di esercizio", "180.0"),
+            ("lastPrice", "Ultimo prezzo negoziato", "5.25"),
+            ("bid", "Prezzo di acquisto", "5.20"),
+            ("ask", "Prezzo di vendita", "5.30"),
+            ("change", "Variazione giornaliera", "+0.15"),
+            ("percentChange", "Variazione percentuale", "2.95%"),
+            ("volume", "Volume scambiato", "1250"),
+            ("openInterest", "Interesse aperto", "3450"),
+            ("impliedVolatility", "Volatilità implicita", "0.2150"),
+            ("inTheMoney", "In the money (boolean)", "True/False"),
+            ("contractSize", "Dimensione contratto", "REGULAR"),
+            ("currency", "Valuta", "USD"),
+            ("lastTradeDate", "Data ultimo scambio", "2024-01-15"),
+        ),
+    ),
+    "income_fields": Table(
+        section="💼 Bilanci",
+        columns=("campo", "descrizione", "significato"),
+        rows=(
+            ("Total Revenue", "Ricavi totali", "Vendite complessive dell'azienda"),
+            ("Cost Of Revenue", "Costo dei ricavi", "Costi diretti per produrre beni/servizi venduti"),
+            ("Gross Profit", "Utile lordo", "Ricavi - Costo dei ricavi"),
+            ("Operating Income", "Reddito operativo", "Utile dalle operazioni principali"),
+            ("Net Income", "Utile netto", "Profitto finale dopo tutte le spese"),
+            ("EBITDA", "EBITDA", "Utili prima di interessi, tasse, deprezzamenti"),
+            ("Diluted EPS", "Utile per azione diluito", "Utile netto / azioni totali (incluse potenziali)"),
+            ("Basic EPS", "Utile per azione base", "Utile netto / azioni in circolazione"),
+        ),
+    ),
+    "balance_fields": Table(
+        section="💼 Bilanci",
+        columns=("campo", "descrizione", "significato"),
+        rows=(
+            ("Total Assets", "Attività totali", "Tutti i beni posseduti dall'azienda"),
+            ("Current Assets", "Attività correnti", "Beni convertibili in cash entro 1 anno"),
+            ("Cash And Cash Equivalents", "Liquidità", "Denaro disponibile immediatamente"),
+            ("Total Liabilities Net Minority Interest", "Passività totali", "Tutti i debiti dell'azienda"),
+            ("Current Liabilities", "Passività correnti", "Debiti da pagare entro 1 anno"),
+            ("Total Equity Gross Minority Interest", "Patrimonio netto", "Valore residuo per gli azionisti"),
+            ("Retained Earnings", "Utili non distribuiti", "Profitti accumulati e reinvestiti"),
+            ("Inventory", "Rimanenze", "Valore delle scorte di magazzino"),
+        ),
+    ),
+    "cashflow_fields": Table(
+        section="📊 Flussi di Cassa",
+        columns=("categoria", "campo", "descrizione", "significato"),
+        rows=(
+            ("💰 Flussi Operativi", "Operating Cash Flow", "Flusso di cassa operativo", "Liquidità generata dalle operazioni principali"),
+            ("💰 Flussi Operativi", "Net Income", "Utile netto", "Punto di partenza per il calcolo dei flussi"),
+            ("💰 Flussi Operativi", "Depreciation And Amortization", "Ammortamenti", "Costi non monetari da riaggiungere"),
+            ("💰 Flussi Operativi", "Change In Working Capital", "Variazione capitale circolante", "Impatto delle variazioni di crediti/debiti"),
+            ("🏗️ Flussi Investimento", "Investing Cash Flow", "Flusso di cassa da investimenti", "Liquidità usata/generata da investimenti"),
+            ("🏗️ Flussi Investimento", "Capital Expenditure", "Investimenti in capitale fisso", "Spese per impianti, macchinari, tecnologia"),
+            ("🏗️ Flussi Investimento", "Investments In Other Ventures", "Altri investimenti", "Acquisizioni, partecipazioni, joint venture"),
+            ("💳 Flussi Finanziamento", "Financing Cash Flow", "Flusso di cassa da finanziamento", "Liquidità da/per azionisti e creditori"),
+            ("💳 Flussi Finanziamento", "Common Stock Dividends Paid", "Dividendi pagati", "Distribuzioni di utili agli azionisti"),
+            ("💳 Flussi Finanziamento", "Repurchase Of Capital Stock", "Riacquisto azioni proprie", "Programmi di buyback"),
+            ("💳 Flussi Finanziamento", "Issuance Of Debt", "Emissione debiti", "Nuovi prestiti e obbligazioni"),
+            ("💳 Flussi Finanziamento", "Repayment Of Debt", "Rimborso debiti", "Pagamento di prestiti e obbligazioni"),
+        ),
+    ),
+    "growth_fields": Table(
+        section="📈 Crescita e Dividendi",
+        columns=("campo", "descrizione", "calcolo", "interpretazione"),
+        rows=(
+            ("revenueGrowth", "Crescita ricavi", "(Ricavi Anno Corrente - Ricavi Anno Precedente) / Ricavi Anno Precedente", "Tasso di crescita delle vendite year-over-year"),
+            ("earningsGrowth", "Crescita utili", "(Utili Anno Corrente - Utili Anno Precedente) / Utili Anno Precedente", "Tasso di crescita degli utili year-over-year"),
+            ("earningsQuarterlyGrowth", "Crescita utili trimestrale", "Crescita utili ultimo trimestre vs stesso trimestre anno precedente", "Crescita più recente degli utili"),
+            ("revenueQuarterlyGrowth", "Crescita ricavi trimestrale", "Crescita ricavi ultimo trimestre vs stesso trimestre anno precedente", "Crescita più recente dei ricavi"),
+        ),
+    ),
+    "dividend_fields": Table(
+        section="📈 Crescita e Dividendi",
+        columns=("campo", "descrizione", "esempio", "significato"),
+        rows=(
+            ("dividendRate", "Tasso dividendo annuale", "0.92", "Dividendo annuale per azione in dollari"),
+            ("dividendYield", "Rendimento dividendo", "0.0052 (0.52%)", "Dividendo annuale / Prezzo corrente"),
+            ("exDividendDate", "Data ex-dividendo", "2024-02-09", "Ultima data per ricevere il prossimo dividendo"),
+            ("payoutRatio", "Payout ratio", "0.15 (15%)", "Percentuale di utili distribuita come dividendi"),
+            ("fiveYearAvgDividendYield", "Rendimento medio 5 anni", "0.0048", "Dividend yield medio degli ultimi 5 anni"),
+            ("trailingAnnualDividendRate", "Dividendo trailing annuale", "0.92", "Dividendi pagati negli ultimi 12 mesi"),
+            ("trailingAnnualDividendYield", "Yield trailing annuale", "0.0052", "Yield basato sui dividendi ultimi 12 mesi"),
+        ),
+    ),
+    "momentum_indicators": Table(
+        section="🔍 Analisi Tecnica",
+        columns=("indicatore", "calcolo", "interpretazione", "periodo"),
+        rows=(
+            ("RSI (Relative Strength Index)", "Non diretto - calcolabile dai prezzi storici", "RSI > 70 = ipercomprato, RSI < 30 = ipervenduto", "Tipicamente 14 giorni"),
+            ("MACD", "EMA(12) - EMA(26)", "Crossover segnalano cambi di trend", "12, 26, 9 giorni standard"),
+            ("Stochastic Oscillator", "(Close - Low) / (High - Low) * 100", "> 80 ipercomprato, < 20 ipervenduto", "14 giorni tipicamente"),
+        ),
+    ),
+    "ma_data": Table(
+        section="🔍 Analisi Tecnica",
+        columns=("campo", "descrizione", "utilizzo"),
+        rows=(
+            ("fiftyDayAverage", "Media mobile 50 giorni", "Trend di medio termine, supporto/resistenza"),
+            ("twoHundredDayAverage", "Media mobile 200 giorni", "Trend di lungo termine, bull/bear market"),
+        ),
+    ),
+    "volatility_data": Table(
+        section="🔍 Analisi Tecnica",
+        columns=("metrica", "calcolo", "interpretazione", "dati_necessari"),
+        rows=(
+            ("Bollinger Bands", "Media Mobile ± (2 × Deviazione Standard)", "Prezzi vicini alle bande indicano possibili inversioni", "Close prices per calcolo"),
+            ("Average True Range (ATR)", "Media dei True Range su N periodi", "Misura la volatilità del titolo", "High, Low, Close prices"),
+            ("Volatilità Storica", "Deviazione standard dei rendimenti", "Volatilità passata del titolo", "Close prices storici"),
+        ),
+    ),
+    "support_resistance": Table(
+        section="🔍 Analisi Tecnica",
+        columns=("livello", "campo_yahoo", "utilizzo"),
+        rows=(
+            ("52 Week High", "52WeekHigh", "Resistenza psicologica forte"),
+            ("52 Week Low", "52WeekLow", "Supporto psicologico forte"),
+            ("Media Mobile 200", "twoHundredDayAverage", "Supporto/resistenza dinamica long-term"),
+            ("Media Mobile 50", "fiftyDayAverage", "Supporto/resistenza dinamica medium-term"),
+        ),
+    ),
+    "env_fields": Table(
+        section="🌍 Dati ESG",
+        columns=("campo", "descrizione", "range", "significato", "valori"),
+        rows=(
+            ("environmentScore", "Punteggio ambientale", "1-100", "Performance su temi ambientali", None),
+            ("socialScore", "Punteggio sociale", "1-100", "Performance su responsabilità sociale", None),
+            ("governanceScore", "Punteggio governance", "1-100", "Qualità della governance aziendale", None),
+            ("totalEsg", "Punteggio ESG totale", "1-100", "Score complessivo ESG", None),
+            ("esgPerformance", "Performance ESG", None, "Performance relativa nel settore", "UNDER_PERF, AVG_PERF, OUT_PERF"),
+        ),
+    ),
+}
+
+
+@lru_cache(maxsize=None)
+def get_table(name):
+    """DataFrame della tabella, costruito alla prima richiesta e poi riusato (sola lettura)"""
+    table = TABLES[name]
+    return pd.DataFrame(list(table.rows), columns=list(table.columns))
+
+
+def tables_for_section(section):
+    """Nomi delle tabelle di una sezione della guida, in ordine"""
+    return _section_index().get(section, ())
+
+
+def get_field(name, campo):
+    """Riga del catalogo per tabella e nome campo, come dizionario"""
+    return _field_index()[(name, campo)]
+
+
+def find_field(campo):
+    """Tutte le occorrenze di un campo nel catalogo come (tabella, riga)"""
+    return [(name, row) for (name, key), row in _field_index().items() if key == campo]
+
+
+@lru_cache(maxsize=None)
+def _section_index():
+    index = {}
+    for name, table in TABLES.items():
+        index.setdefault(table.section, ())
+        index[table.section] += (name,)
+    return index
+
+
+@lru_cache(maxsize=None)
+def _field_index():
+    # La prima colonna identifica il campo (campo, periodo, indicatore, ...)
+    index = {}
+    for name, table in TABLES.items():
+        key_col = "campo" if "campo" in table.columns else table.columns[0]
+        pos = table.columns.index(key_col)
+        for row in table.rows:
+            index[(name, row[pos])] = dict(zip(table.columns, row))
+    return index
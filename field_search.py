@@ -0,0 +1,135 @@
+# Ricerca full-text sui campi del catalogo
+# Indice invertito costruito una volta per processo, con prefissi e ricerca fuzzy.
+
+import bisect
+import re
+import unicodedata
+from functools import lru_cache
+
+from field_catalog import TABLES
+
+# Peso dei token per colonna: il nome del campo conta più della descrizione
+KEY_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 2.0
+TEXT_WEIGHT = 1.0
+# Moltiplicatori per tipo di corrispondenza
+EXACT, PREFIX, FUZZY = 1.0, 0.6, 0.4
+MIN_PREFIX = 2
+MAX_RESULTS = 25
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Minuscolo senza accenti"""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Token di un testo, con i nomi camelCase divisi nelle loro parti"""
+    if not text:
+        return []
+    tokens = []
+    for word in re.split(r"[^\w]+", text):
+        if not word:
+            continue
+        parts = _CAMEL.split(word)
+        if len(parts) > 1:
+            tokens.append(normalize(word))
+        for part in parts:
+            tokens.extend(_WORD.findall(normalize(part)))
+    return tokens
+
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class FieldIndex:
+    """Indice invertito token -> {documento: peso} sui campi documentati"""
+
+    def __init__(self, tables):
+        self.docs = []  # (tabella, sezione, riga)
+        self.postings = {}
+        for name, table in tables.items():
+            key_col = "campo" if "campo" in table.columns else table.columns[0]
+            for row in table.rows:
+                record = dict(zip(table.columns, row))
+                doc_id = len(self.docs)
+                self.docs.append((name, table.section, record))
+                for col, value in record.items():
+                    if col == key_col:
+                        weight = KEY_WEIGHT
+                    elif col == "descrizione":
+                        weight = DESCRIPTION_WEIGHT
+                    else:
+                        weight = TEXT_WEIGHT
+                    for token in tokenize(value):
+                        docs = self.postings.setdefault(token, {})
+                        docs[doc_id] = max(docs.get(doc_id, 0.0), weight)
+        self.vocabulary = sorted(self.postings)
+        # Vicinato per cancellazione (distanza di edit 1) per la ricerca fuzzy
+        self.deletions = {}
+        for token in self.vocabulary:
+            if len(token) < 4:
+                continue
+            for variant in _deletes(token):
+                self.deletions.setdefault(variant, set()).add(token)
+
+    def _expand(self, term):
+        """Token del vocabolario che corrispondono al termine, con moltiplicatore"""
+        matches = {}
+        if term in self.postings:
+            matches[term] = EXACT
+        if len(term) >= MIN_PREFIX:
+            i = bisect.bisect_left(self.vocabulary, term)
+            while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+                matches.setdefault(self.vocabulary[i], PREFIX)
+                i += 1
+        if not matches and len(term) >= 4:
+            candidates = set(self.deletions.get(term, ()))
+            for variant in _deletes(term):
+                if variant in self.postings:
+                    candidates.add(variant)
+                candidates |= self.deletions.get(variant, set())
+            for token in candidates:
+                matches.setdefault(token, FUZZY)
+        return matches
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Documenti che corrispondono a tutti i termini, ordinati per punteggio"""
+        terms = []
+        for token in tokenize(query):
+            if token not in terms:
+                terms.append(token)
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token, factor in self._expand(term).items():
+                for doc_id, weight in self.postings[token].items():
+                    score = weight * factor
+                    if score > term_scores.get(doc_id, 0.0):
+                        term_scores[doc_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.docs[doc_id] + (score,) for doc_id, score in ranked[:limit]]
+
+
+@lru_cache(maxsize=None)
+def get_index():
+    """Indice dei campi, costruito alla prima ricerca"""
+    return FieldIndex(TABLES)
+
+
+def search_fields(query, limit=MAX_RESULTS):
+    """Cerca nei campi documentati: restituisce (tabella, sezione, riga, punteggio)"""
+    return get_index().search(query, limit)
@@ -0,0 +1,157 @@
+# Calcolo vettorizzato dei ratios fondamentali dai bilanci
+# I bilanci di molti simboli vengono allineati in un array 3-D (simbolo x periodo x voce);
+# FCF, margini, ROE, current ratio e crescite si calcolano su tutto l'array in una volta.
+# Il periodo 0 è il più recente (come le colonne dei bilanci yfinance).
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CachedTicker
+
+FUNDAMENTAL_WORKERS = 8
+
+STATEMENT_NAMES = {
+    "annual": ("financials", "balance_sheet", "cashflow"),
+    "quarterly": ("quarterly_financials", "quarterly_balance_sheet", "quarterly_cashflow"),
+}
+# Periodi di distanza per la crescita anno su anno
+GROWTH_LAG = {"annual": 1, "quarterly": 4}
+# Periodi caricati di default: con i trimestrali servono 4 trimestri in più per la crescita
+DEFAULT_PERIODS = {"annual": 4, "quarterly": 8}
+
+# Voce canonica -> nomi alternativi usati da yfinance, in ordine di preferenza
+LINE_ITEMS = {
+    "Total Revenue": ("Total Revenue", "Operating Revenue"),
+    "Cost Of Revenue": ("Cost Of Revenue",),
+    "Gross Profit": ("Gross Profit",),
+    "Operating Income": ("Operating Income",),
+    "Net Income": ("Net Income", "Net Income Common Stockholders"),
+    "EBITDA": ("EBITDA", "Normalized EBITDA"),
+    "Operating Cash Flow": ("Operating Cash Flow", "Cash Flow From Continuing Operating Activities"),
+    "Capital Expenditure": ("Capital Expenditure",),
+    "Total Assets": ("Total Assets",),
+    "Current Assets": ("Current Assets",),
+    "Current Liabilities": ("Current Liabilities",),
+    "Inventory": ("Inventory",),
+    "Total Equity": ("Stockholders Equity", "Common Stock Equity", "Total Equity Gross Minority Interest"),
+    "Total Debt": ("Total Debt",),
+    "Cash And Cash Equivalents": ("Cash And Cash Equivalents",),
+}
+
+
+class FundamentalsPanel:
+    """Array (simboli x periodi x voci) con le date di chiusura di ogni periodo"""
+
+    def __init__(self, values, symbols, period_end, frequency="annual"):
+        self.values = values
+        self.symbols = list(symbols)
+        self.items = list(LINE_ITEMS)
+        self.period_end = period_end
+        self.frequency = frequency
+        self._item_pos = {name: i for i, name in enumerate(self.items)}
+
+    @classmethod
+    def from_statements(cls, statements, periods=None, frequency="annual"):
+        """Allinea i bilanci: statements = {simbolo: [DataFrame, ...]} con voci sulle righe.
+
+        periods è portato almeno a GROWTH_LAG + 1, così il periodo più recente ha la crescita.
+        """
+        periods = DEFAULT_PERIODS[frequency] if periods is None else periods
+        periods = max(periods, GROWTH_LAG[frequency] + 1)
+        symbols = list(statements)
+        values = np.full((len(symbols), periods, len(LINE_ITEMS)), np.nan)
+        period_end = np.full((len(symbols), periods), np.datetime64("NaT"), dtype="datetime64[ns]")
+        for s, symbol in enumerate(symbols):
+            frames = [f for f in statements[symbol] if f is not None and not f.empty]
+            if not frames:
+                continue
+            merged = pd.concat(frames)
+            merged = merged[~merged.index.duplicated(keep="first")]
+            dates = sorted(pd.to_datetime(merged.columns), reverse=True)[:periods]
+            merged.columns = pd.to_datetime(merged.columns)
+            block = merged.reindex(columns=dates)
+            for i, aliases in enumerate(LINE_ITEMS.values()):
+                for alias in aliases:
+                    if alias in block.index:
+                        row = pd.to_numeric(block.loc[alias], errors="coerce").to_numpy(np.float64)
+                        values[s, :len(row), i] = row
+                        break
+            period_end[s, :len(dates)] = np.array(dates, dtype="datetime64[ns]")
+        return cls(values, symbols, period_end, frequency)
+
+    def item(self, name):
+        """Voce come array (simboli x periodi)"""
+        return self.values[:, :, self._item_pos[name]]
+
+    def compute_ratios(self):
+        """Tutti i ratios come dizionario nome -> array (simboli x periodi)"""
+        revenue = self.item("Total Revenue")
+        net_income = self.item("Net Income")
+        ocf = self.item("Operating Cash Flow")
+        capex = self.item("Capital Expenditure")
+        equity = self.item("Total Equity")
+        gross = self.item("Gross Profit")
+        gross = np.where(np.isnan(gross), revenue - self.item("Cost Of Revenue"), gross)
+
+        # yfinance riporta il Capex con segno negativo: FCF = OCF - |Capex|
+        fcf = ocf - np.abs(capex)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = {
+                "freeCashFlow": fcf,
+                "grossMargin": gross / revenue,
+                "operatingMargin": self.item("Operating Income") / revenue,
+                "netMargin": net_income / revenue,
+                "ebitdaMargin": self.item("EBITDA") / revenue,
+                "fcfMargin": fcf / revenue,
+                "returnOnEquity": np.where(equity > 0, net_income / equity, np.nan),
+                "returnOnAssets": net_income / self.item("Total Assets"),
+                "currentRatio": self.item("Current Assets") / self.item("Current Liabilities"),
+                "quickRatio": (self.item("Current Assets") - np.nan_to_num(self.item("Inventory")))
+                / self.item("Current Liabilities"),
+                "debtToEquity": np.where(equity > 0, self.item("Total Debt") / equity, np.nan),
+            }
+            ratios["revenueGrowth"] = self.growth(revenue)
+            ratios["earningsGrowth"] = self.growth(net_income)
+            ratios["fcfGrowth"] = self.growth(fcf)
+        return ratios
+
+    def growth(self, values, lag=None):
+        """Crescita rispetto a `lag` periodi prima (NaN se la base è <= 0)"""
+        lag = GROWTH_LAG[self.frequency] if lag is None else lag
+        out = np.full(values.shape, np.nan)
+        if lag < values.shape[1]:
+            base = values[:, lag:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[:, :-lag] = np.where(base > 0, values[:, :-lag] / base - 1.0, np.nan)
+        return out
+
+    def ratios_frame(self, period=0):
+        """Tabella simboli x ratios per un periodo (0 = più recente)"""
+        ratios = self.compute_ratios()
+        frame = pd.DataFrame({name: values[:, period] for name, values in ratios.items()},
+                             index=pd.Index(self.symbols, name="symbol"))
+        frame.insert(0, "periodEnd", self.period_end[:, period])
+        return frame
+
+
+def load_fundamentals(symbols, cache, frequency="annual", periods=None, provider=None,
+                      max_workers=FUNDAMENTAL_WORKERS):
+    """Scarica i bilanci di tutti i simboli su un pool limitato e costruisce il pannello"""
+    names = STATEMENT_NAMES[frequency]
+
+    def fetch(symbol):
+        ticker = CachedTicker(symbol, cache, provider)
+        frames = []
+        for name in names:
+            try:
+                frames.append(getattr(ticker, name))
+            except Exception:
+                frames.append(None)
+        return ticker.symbol, frames
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fundamentals") as pool:
+        statements = dict(pool.map(fetch, symbols))
+    return FundamentalsPanel.from_statements(statements, periods, frequency)
@@ -0,0 +1,268 @@
+# Black-Scholes vettorizzato: prezzi, greche, volatilità implicita e superficie IV
+# Tutte le funzioni accettano array NumPy (o scalari) e lavorano su intere chain in una volta.
+# Convenzioni: T in anni, tassi continui, vega e rho per 1 punto percentuale, theta per giorno.
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.0
+MIN_T = 1.0 / (DAYS_PER_YEAR * 24)  # un'ora: evita divisioni per zero a scadenza
+IV_LOW, IV_HIGH = 1e-4, 5.0
+IV_TOL = 1e-6
+IV_MAX_ITER = 60
+
+_SQRT2 = np.sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+# Coefficienti di erf/erfc (W. J. Cody, Math. Comp. 1969)
+_ERF_A = (3.16112374387056560e00, 1.13864154151050156e02, 3.77485237685302021e02,
+          3.20937758913846947e03, 1.85777706184603153e-1)
+_ERF_B = (2.36012909523441209e01, 2.44024637934444173e02, 1.28261652607737228e03,
+          2.84423683343917062e03)
+_ERFC_C = (5.64188496988670089e-1, 8.88314979438837594e00, 6.61191906371416295e01,
+           2.98635138197400131e02, 8.81952221241769090e02, 1.71204761263407058e03,
+           2.05107837782607147e03, 1.23033935479799725e03, 2.15311535474403846e-8)
+_ERFC_D = (1.57449261107098347e01, 1.17693950891312499e02, 5.37181101862009858e02,
+           1.62138957456669019e03, 3.29079923573345963e03, 4.36261909014324716e03,
+           3.43936767414372164e03, 1.23033935480374942e03)
+_ERFC_P = (3.05326634961232344e-1, 3.60344899949804439e-1, 1.25781726111229246e-1,
+           1.60837851487422766e-2, 6.58749161529837803e-4, 1.63153871373020978e-2)
+_ERFC_Q = (2.56852019228982242e00, 1.87295284992346725e00, 5.27905102951428412e-1,
+           6.05183413124413191e-2, 2.33520497626869185e-3)
+_INV_SQRT_PI = 5.6418958354775628695e-1
+
+
+def _erfc(x):
+    # Approssimazioni razionali di Cody (1969): errore relativo ~1e-16 su tutta la retta.
+    # Serve la doppia precisione: vicino al valore intrinseco un errore di 1e-8 nella
+    # ripartizione sposta la volatilità implicita di punti percentuali.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.abs(x)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore", under="ignore"):
+        ysq = y * y
+        num, den = _ERF_A[4] * ysq, ysq
+        for a, b in zip(_ERF_A[:3], _ERF_B[:3]):
+            num, den = (num + a) * ysq, (den + b) * ysq
+        small = 1.0 - y * (num + _ERF_A[3]) / (den + _ERF_B[3])  # |x| <= 0.46875
+
+        num, den = _ERFC_C[8] * y, y
+        for c, d in zip(_ERFC_C[:7], _ERFC_D[:7]):
+            num, den = (num + c) * y, (den + d) * y
+        mid = (num + _ERFC_C[7]) / (den + _ERFC_D[7])  # 0.46875 < |x| <= 4
+
+        inv = 1.0 / ysq
+        num, den = _ERFC_P[5] * inv, inv
+        for p, q in zip(_ERFC_P[:4], _ERFC_Q[:4]):
+            num, den = (num + p) * inv, (den + q) * inv
+        tail = (_INV_SQRT_PI - inv * (num + _ERFC_P[4]) / (den + _ERFC_Q[4])) / y  # |x| > 4
+
+        # exp(-y^2) in due fattori per non perdere cifre quando y è grande
+        head = np.trunc(y * 16.0) / 16.0
+        scale = np.exp(-head * head) * np.exp(-(y - head) * (y + head))
+        r = np.where(y <= 0.46875, small, scale * np.where(y <= 4.0, mid, tail))
+    r = np.where(y > 26.7, 0.0, r)  # sotto il minimo double
+    return np.where(x < 0, 2.0 - r, r)
+
+
+def norm_cdf(x):
+    """Funzione di ripartizione normale standard"""
+    return 0.5 * _erfc(-np.asarray(x, dtype=np.float64) / _SQRT2)
+
+
+def norm_pdf(x):
+    """Densità normale standard"""
+    x = np.asarray(x, dtype=np.float64)
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _d1_d2(S, K, T, r, sigma, q):
+    sqrt_t = np.sqrt(T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t, sqrt_t
+
+
+def _inputs(S, K, T, r, sigma, is_call, q):
+    S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                                 for v in (S, K, T, r, sigma, q)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    return S, K, np.maximum(T, MIN_T), r, sigma, is_call, q
+
+
+def bs_price(S, K, T, r, sigma, is_call=True, q=0.0):
+    """Prezzo Black-Scholes di call/put europee"""
+    S, K, T, r, sigma, is_call, q = _inputs(S, K, T, r, sigma, is_call, q)
+    d1, d2, _ = _d1_d2(S, K, T, r, sigma, q)
+    disc_s = S * np.exp(-q * T)
+    disc_k = K * np.exp(-r * T)
+    call = disc_s * norm_cdf(d1) - disc_k * norm_cdf(d2)
+    put = disc_k * norm_cdf(-d2) - disc_s * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(S, K, T, r, sigma, is_call=True, q=0.0):
+    """Delta, gamma, vega, theta e rho per tutti i contratti insieme"""
+    S, K, T, r, sigma, is_call, q = _inputs(S, K, T, r, sigma, is_call, q)
+    d1, d2, sqrt_t = _d1_d2(S, K, T, r, sigma, q)
+    eq = np.exp(-q * T)
+    er = np.exp(-r * T)
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1, cdf_d2 = norm_cdf(d1), norm_cdf(d2)
+    cdf_md1, cdf_md2 = 1.0 - cdf_d1, 1.0 - cdf_d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = eq * pdf_d1 / (S * sigma * sqrt_t)
+    vega = S * eq * pdf_d1 * sqrt_t
+    common_theta = -S * eq * pdf_d1 * sigma / (2.0 * sqrt_t)
+    theta_call = common_theta - r * K * er * cdf_d2 + q * S * eq * cdf_d1
+    theta_put = common_theta + r * K * er * cdf_md2 - q * S * eq * cdf_md1
+
+    return {
+        "delta": np.where(is_call, eq * cdf_d1, -eq * cdf_md1),
+        "gamma": gamma,
+        "vega": vega / 100.0,
+        "theta": np.where(is_call, theta_call, theta_put) / DAYS_PER_YEAR,
+        "rho": np.where(is_call, K * T * er * cdf_d2, -K * T * er * cdf_md2) / 100.0,
+    }
+
+
+def implied_volatility(price, S, K, T, r=0.0, is_call=True, q=0.0,
+                       tol=IV_TOL, max_iter=IV_MAX_ITER):
+    """Volatilità implicita con Newton-Raphson protetto da bisezione, su tutti i contratti insieme.
+
+    Restituisce NaN dove il prezzo viola i limiti di arbitraggio o non è disponibile.
+    """
+    price = np.asarray(price, dtype=np.float64)
+    S, K, T, r, _, is_call, q = _inputs(S, K, T, r, np.zeros(np.shape(price)), is_call, q)
+    shape = S.shape
+    # Gli scalari diventano array di un elemento: il ciclo indicizza per maschera
+    S, K, T, r, is_call, q = (np.atleast_1d(v) for v in (S, K, T, r, is_call, q))
+    price = np.broadcast_to(np.atleast_1d(price), S.shape)
+
+    # Limiti di arbitraggio: valore intrinseco scontato e prezzo massimo
+    disc_s = S * np.exp(-q * T)
+    disc_k = K * np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(disc_s - disc_k, 0.0), np.maximum(disc_k - disc_s, 0.0))
+    upper = np.where(is_call, disc_s, disc_k)
+    valid = np.isfinite(price) & (price > lower) & (price < upper) & (S > 0) & (K > 0)
+
+    lo = np.full(S.shape, IV_LOW)
+    hi = np.full(S.shape, IV_HIGH)
+    sigma = np.full(S.shape, 0.3)
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)
+        s, k, t, rr, qq, c = S[idx], K[idx], T[idx], r[idx], q[idx], is_call[idx]
+        sig = sigma[idx]
+        diff = bs_price(s, k, t, rr, sig, c, qq) - price[idx]
+        d1, _, sqrt_t = _d1_d2(s, k, t, rr, sig, qq)
+        vega = s * np.exp(-qq * t) * norm_pdf(d1) * sqrt_t
+
+        # Aggiorna l'intervallo che contiene la soluzione (prezzo crescente in sigma)
+        lo[idx] = np.where(diff < 0, sig, lo[idx])
+        hi[idx] = np.where(diff > 0, sig, hi[idx])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sig - diff / vega
+        inside = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        new_sigma = np.where(inside, newton, 0.5 * (lo[idx] + hi[idx]))
+        sigma[idx] = new_sigma
+
+        # Convergenza sul passo in sigma: il solo errore di prezzo non basta quando vega è piccola
+        done = (np.abs(new_sigma - sig) < tol) | (hi[idx] - lo[idx] < tol) | (diff == 0)
+        active[idx] = ~done
+
+    return np.where(valid, sigma, np.nan).reshape(shape)
+
+
+def year_fractions(expiry, now=None):
+    """Tempo a scadenza in anni (ACT/365), con scadenza alla chiusura del giorno"""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    if now.tzinfo is not None:
+        now = now.tz_convert(None)
+    expiry = pd.DatetimeIndex(expiry) + pd.Timedelta(hours=16)
+    days = (expiry - now) / pd.Timedelta(days=1)
+    return np.maximum(np.asarray(days, dtype=np.float64) / DAYS_PER_YEAR, MIN_T)
+
+
+def chain_greeks(table, spot, rate=0.0, dividend_yield=0.0, now=None):
+    """Aggiunge mid, IV ricalcolata e greche a una tabella di options_chain.load_chains.
+
+    spot: prezzo del sottostante, scalare o dizionario simbolo -> prezzo.
+    """
+    frame = table.reset_index()
+    if isinstance(spot, dict):
+        S = frame["symbol"].astype(str).map({k.upper(): v for k, v in spot.items()}).to_numpy(np.float64)
+    else:
+        S = np.full(len(frame), float(spot))
+    K = frame["strike"].to_numpy(np.float64)
+    T = year_fractions(frame["expiry"], now)
+    is_call = (frame["type"] == "call").to_numpy()
+
+    bid = frame["bid"].to_numpy(np.float64)
+    ask = frame["ask"].to_numpy(np.float64)
+    mid = np.where((bid > 0) & (ask > 0) & (ask >= bid), 0.5 * (bid + ask), np.nan)
+    if "lastPrice" in frame:
+        mid = np.where(np.isnan(mid), frame["lastPrice"].to_numpy(np.float64), mid)
+
+    iv = implied_volatility(mid, S, K, T, rate, is_call, dividend_yield)
+    greeks = bs_greeks(S, K, T, rate, iv, is_call, dividend_yield)
+
+    out = table.copy()
+    out["mid"] = mid.astype(np.float32)
+    out["T"] = T.astype(np.float32)
+    out["iv"] = iv.astype(np.float32)
+    for name, values in greeks.items():
+        out[name] = values.astype(np.float32)
+    return out
+
+
+def iv_surface(table, spot=None, strikes=None, iv_column="iv"):
+    """Superficie IV interpolata: righe = scadenze, colonne = strike.
+
+    Con spot indicato si usano solo le opzioni OTM (put sotto lo spot, call sopra).
+    Interpolazione lineare sullo strike per ogni scadenza, poi lineare in varianza
+    totale (sigma^2 * T) tra le scadenze per i punti mancanti.
+    """
+    frame = table.reset_index()
+    frame = frame[np.isfinite(frame[iv_column].to_numpy(np.float64))]
+    if spot is not None:
+        otm = ((frame["type"] == "put") & (frame["strike"] < spot)) | \
+              ((frame["type"] == "call") & (frame["strike"] >= spot))
+        frame = frame[otm]
+    if frame.empty:
+        return pd.DataFrame()
+
+    grid = np.sort(frame["strike"].unique()) if strikes is None else np.asarray(strikes, np.float64)
+    points = frame.groupby(["expiry", "strike"], observed=True)[iv_column].mean().reset_index()
+    expiries = np.sort(points["expiry"].unique())
+
+    rows = []
+    for expiry in expiries:
+        sub = points[points["expiry"] == expiry]
+        k = sub["strike"].to_numpy(np.float64)
+        v = sub[iv_column].to_numpy(np.float64)
+        order = np.argsort(k)
+        k, v = k[order], v[order]
+        row = np.interp(grid, k, v, left=np.nan, right=np.nan)
+        rows.append(row)
+    surface = np.vstack(rows)
+
+    # Riempie i buchi interpolando la varianza totale lungo le scadenze
+    if "T" in frame:
+        T = frame.groupby("expiry")["T"].first().reindex(expiries).to_numpy(np.float64)
+    else:
+        T = year_fractions(expiries)
+    total_var = surface * surface * T[:, None]
+    for j in range(total_var.shape[1]):
+        col = total_var[:, j]
+        known = np.isfinite(col)
+        if known.sum() >= 2 and not known.all():
+            col[~known] = np.interp(T[~known], T[known], col[known], left=np.nan, right=np.nan)
+    with np.errstate(invalid="ignore"):
+        surface = np.sqrt(total_var / T[:, None])
+
+    return pd.DataFrame(surface, index=pd.DatetimeIndex(expiries, name="expiry"),
+                        columns=pd.Index(grid, name="strike"))
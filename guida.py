@@ -2,11 +2,32 @@
 # pip install streamlit yfinance pandas numpy
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
+import os
+import time
 from datetime import datetime
 
+from data_cache import DataCache, CachedTicker
+from availability import (INFO_PROBES, PROBES, ProbeResult, info_probe_results,
+                          iter_probe_results, submit_probes)
+from async_data import AsyncData
+from batch import parse_symbols, parse_watchlist_file, resolve_watchlist
+from field_catalog import get_table
+from field_search import search_fields
+from snapshot import SnapshotStore
+
+@st.cache_resource
+def get_data_cache():
+    """Cache dati condivisa da tutte le sessioni del server"""
+    # GUIDA_CACHE_DIR abilita lo store su disco, che sopravvive ai riavvii;
+    # GUIDA_CACHE_DB uno store SQLite condiviso da più processi del server;
+    # GUIDA_SNAPSHOT_DIR lo snapshot giornaliero, letto prima di interrogare Yahoo
+    snapshot_dir = os.environ.get("GUIDA_SNAPSHOT_DIR")
+    return DataCache(disk_dir=os.environ.get("GUIDA_CACHE_DIR"),
+                     shared_path=os.environ.get("GUIDA_CACHE_DB"),
+                     snapshot=SnapshotStore(snapshot_dir) if snapshot_dir else None)
+
 def main():
     st.set_page_config(
         page_title="Guida Yahoo Finance",
@@ -36,14 +57,30 @@ def main():
     ]
     
     selected_section = st.sidebar.radio("Seleziona Sezione:", sections)
+    search_query = st.sidebar.text_input("🔎 Cerca campo:", placeholder="es. trailingPE, dividendi")
     
     # Input per testare i dati
     st.sidebar.markdown("---")
     st.sidebar.subheader("🧪 Test Dati")
-    test_symbol = st.sidebar.text_input("Simbolo per test:", value="AAPL")
+    test_symbol = st.sidebar.text_input(
+        "Simbolo per test:", value="AAPL",
+        help="Più simboli separati da virgola per il confronto in blocco"
+    )
+    watchlist_file = st.sidebar.file_uploader("Oppure carica una watchlist:", type=["csv", "txt"])
     
     if st.sidebar.button("🔍 Mostra Dati Esempio"):
-        show_example_data(test_symbol)
+        symbols = parse_symbols(test_symbol)
+        if watchlist_file is not None:
+            symbols += [s for s in parse_watchlist_file(watchlist_file.getvalue()) if s not in symbols]
+        if len(symbols) == 1:
+            show_example_data(symbols[0])
+        elif symbols:
+            show_batch_data(symbols)
+        else:
+            st.error("❌ Inserisci almeno un simbolo")
+        
+    if search_query.strip():
+        show_search_results(search_query)
         
     # Contenuto principale basato sulla sezione selezionata
     if selected_section == "📊 Informazioni Base":
@@ -71,555 +108,98 @@ def main():
     elif selected_section == "💡 Come Utilizzare":
         show_usage_guide()
 
+def show_search_results(query):
+    """Mostra i campi documentati che corrispondono alla ricerca"""
+    results = search_fields(query)
+    st.subheader(f"🔎 Risultati per \"{query}\"")
+    if not results:
+        st.info("Nessun campo trovato. Prova con un nome parziale o una parola della descrizione.")
+        st.markdown("---")
+        return
+    
+    rows = []
+    for _, section, record, _ in results:
+        values = list(record.values())
+        rows.append({
+            "campo": record.get("campo", values[0]),
+            "descrizione": record.get("descrizione") or values[1],
+            "sezione": section
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.markdown("---")
+
 def show_basic_info():
     st.header("📊 Informazioni Base del Titolo")
     
-    data_fields = [
-        {
-            "campo": "symbol",
-            "descrizione": "Simbolo ticker del titolo",
-            "esempio": "AAPL",
-            "tipo": "str"
-        },
-        {
-            "campo": "longName",
-            "descrizione": "Nome completo dell'azienda",
-            "esempio": "Apple Inc.",
-            "tipo": "str"
-        },
-        {
-            "campo": "shortName",
-            "descrizione": "Nome abbreviato",
-            "esempio": "Apple Inc.",
-            "tipo": "str"
-        },
-        {
-            "campo": "currentPrice",
-            "descrizione": "Prezzo corrente dell'azione",
-            "esempio": "175.43",
-            "tipo": "float"
-        },
-        {
-            "campo": "previousClose",
-            "descrizione": "Prezzo di chiusura precedente",
-            "esempio": "174.91",
-            "tipo": "float"
-        },
-        {
-            "campo": "open",
-            "descrizione": "Prezzo di apertura giornaliero",
-            "esempio": "175.20",
-            "tipo": "float"
-        },
-        {
-            "campo": "dayLow",
-            "descrizione": "Prezzo minimo giornaliero",
-            "esempio": "174.50",
-            "tipo": "float"
-        },
-        {
-            "campo": "dayHigh",
-            "descrizione": "Prezzo massimo giornaliero",
-            "esempio": "176.80",
-            "tipo": "float"
-        },
-        {
-            "campo": "regularMarketOpen",
-            "descrizione": "Apertura del mercato regolare",
-            "esempio": "175.20",
-            "tipo": "float"
-        },
-        {
-            "campo": "regularMarketDayHigh",
-            "descrizione": "Massimo del mercato regolare",
-            "esempio": "176.80",
-            "tipo": "float"
-        },
-        {
-            "campo": "regularMarketDayLow",
-            "descrizione": "Minimo del mercato regolare",
-            "esempio": "174.50",
-            "tipo": "float"
-        },
-        {
-            "campo": "regularMarketPreviousClose",
-            "descrizione": "Chiusura precedente mercato regolare",
-            "esempio": "174.91",
-            "tipo": "float"
-        }
-    ]
-    
-    df = pd.DataFrame(data_fields)
+    df = get_table("data_fields")
     st.dataframe(df, use_container_width=True)
 
 def show_financial_ratios():
     st.header("💰 Ratios e Metriche Finanziarie")
     
     st.subheader("🔍 Ratios di Valutazione")
-    valuation_ratios = [
-        {
-            "campo": "trailingPE",
-            "descrizione": "Price-to-Earnings ratio (ultimi 12 mesi)",
-            "formula": "Prezzo / Utili per Azione",
-            "interpretazione": "Quanto gli investitori pagano per ogni $ di utili. P/E basso può indicare sottovalutazione."
-        },
-        {
-            "campo": "forwardPE",
-            "descrizione": "P/E prospettico basato su stime future",
-            "formula": "Prezzo / Utili Stimati",
-            "interpretazione": "P/E basato su previsioni analisti. Utile per valutare crescita attesa."
-        },
-        {
-            "campo": "pegRatio",
-            "descrizione": "Price/Earnings to Growth ratio",
-            "formula": "P/E / Tasso Crescita Utili",
-            "interpretazione": "PEG < 1 può indicare sottovalutazione rispetto alla crescita."
-        },
-        {
-            "campo": "priceToBook",
-            "descrizione": "Rapporto prezzo/valore contabile",
-            "formula": "Prezzo / Patrimonio Netto per Azione",
-            "interpretazione": "P/B < 1 può indicare che l'azione è sottovalutata."
-        },
-        {
-            "campo": "priceToSalesTrailing12Months",
-            "descrizione": "Rapporto prezzo/ricavi",
-            "formula": "Market Cap / Ricavi Annuali",
-            "interpretazione": "Valuta se l'azienda è cara rispetto ai suoi ricavi."
-        },
-        {
-            "campo": "enterpriseValue",
-            "descrizione": "Valore dell'impresa",
-            "formula": "Market Cap + Debito - Liquidità",
-            "interpretazione": "Costo teorico per acquisire l'intera azienda."
-        },
-        {
-            "campo": "enterpriseToRevenue",
-            "descrizione": "EV/Ricavi",
-            "formula": "Enterprise Value / Ricavi",
-            "interpretazione": "Rapporto enterprise value sui ricavi annuali."
-        },
-        {
-            "campo": "enterpriseToEbitda",
-            "descrizione": "EV/EBITDA",
-            "formula": "Enterprise Value / EBITDA",
-            "interpretazione": "Multiplo comune per valutazioni M&A."
-        }
-    ]
-    
-    df_val = pd.DataFrame(valuation_ratios)
+    df_val = get_table("valuation_ratios")
     st.dataframe(df_val, use_container_width=True)
     
     st.subheader("💹 Ratios di Redditività")
-    profitability_ratios = [
-        {
-            "campo": "returnOnEquity",
-            "descrizione": "Return on Equity (ROE)",
-            "formula": "Utile Netto / Patrimonio Netto",
-            "interpretazione": "Efficienza nell'utilizzo del capitale degli azionisti. ROE > 15% è generalmente buono."
-        },
-        {
-            "campo": "returnOnAssets",
-            "descrizione": "Return on Assets (ROA)",
-            "formula": "Utile Netto / Totale Attivi",
-            "interpretazione": "Efficienza nell'utilizzo degli asset. ROA > 5% è positivo."
-        },
-        {
-            "campo": "profitMargins",
-            "descrizione": "Margine di profitto netto",
-            "formula": "Utile Netto / Ricavi",
-            "interpretazione": "Percentuale di ricavi che diventa profitto. Più alto è meglio."
-        },
-        {
-            "campo": "operatingMargins",
-            "descrizione": "Margine operativo",
-            "formula": "Utile Operativo / Ricavi",
-            "interpretazione": "Efficienza operativa. Margini > 15% sono buoni."
-        },
-        {
-            "campo": "grossMargins",
-            "descrizione": "Margine lordo",
-            "formula": "(Ricavi - Costo Venduto) / Ricavi",
-            "interpretazione": "Redditività dopo i costi diretti di produzione."
-        },
-        {
-            "campo": "ebitdaMargins",
-            "descrizione": "Margine EBITDA",
-            "formula": "EBITDA / Ricavi",
-            "interpretazione": "Redditività operativa prima di ammortamenti e tasse."
-        }
-    ]
-    
-    df_prof = pd.DataFrame(profitability_ratios)
+    df_prof = get_table("profitability_ratios")
     st.dataframe(df_prof, use_container_width=True)
     
     st.subheader("🏦 Ratios di Liquidità e Solidità")
-    liquidity_ratios = [
-        {
-            "campo": "currentRatio",
-            "descrizione": "Rapporto di liquidità corrente",
-            "formula": "Attivi Correnti / Passivi Correnti",
-            "interpretazione": "Capacità di pagare debiti a breve. Ratio > 1.5 è buono."
-        },
-        {
-            "campo": "quickRatio",
-            "descrizione": "Rapporto di liquidità immediata",
-            "formula": "(Attivi Correnti - Scorte) / Passivi Correnti",
-            "interpretazione": "Liquidità senza considerare le scorte. > 1 è positivo."
-        },
-        {
-            "campo": "debtToEquity",
-            "descrizione": "Rapporto debito/patrimonio",
-            "formula": "Debito Totale / Patrimonio Netto",
-            "interpretazione": "Livello di indebitamento. Valori bassi indicano minor rischio."
-        },
-        {
-            "campo": "totalDebt",
-            "descrizione": "Debito totale",
-            "formula": "Debiti a Breve + Debiti a Lungo Termine",
-            "interpretazione": "Ammontare totale dei debiti dell'azienda."
-        },
-        {
-            "campo": "totalCash",
-            "descrizione": "Liquidità totale",
-            "formula": "Contanti + Equivalenti di Cassa",
-            "interpretazione": "Disponibilità liquide dell'azienda."
-        },
-        {
-            "campo": "totalCashPerShare",
-            "descrizione": "Liquidità per azione",
-            "formula": "Liquidità Totale / Azioni Outstanding",
-            "interpretazione": "Liquidità disponibile per ogni azione."
-        }
-    ]
-    
-    df_liq = pd.DataFrame(liquidity_ratios)
+    df_liq = get_table("liquidity_ratios")
     st.dataframe(df_liq, use_container_width=True)
 
+    st.subheader("🔎 Screener su Molti Titoli")
+    screener_code = '''
+from data_cache import DataCache
+from screener import InfoSnapshot
+
+snapshot = InfoSnapshot()
+universe = ["AAPL", "MSFT", "GOOG", "JPM", "XOM", "JNJ"]
+
+# Scarica solo i simboli mancanti o più vecchi di 6 ore
+snapshot.refresh(universe, DataCache(), max_age=6 * 3600)
+
+# Filtri composti (AND) e classifica dei primi 10 per ROE
+top = snapshot.screen(
+    [("trailingPE", "<", 25), ("priceToBook", "between", (0, 5)),
+     ("sector", "in", ["Technology", "Healthcare"])],
+    sort_by="returnOnEquity", top=10,
+    fields=["sector", "trailingPE", "priceToBook", "returnOnEquity"],
+)
+print(top)
+'''
+    st.code(screener_code, language='python')
+
 def show_trading_data():
     st.header("📈 Dati di Trading e Mercato")
     
-    trading_data = [
-        {
-            "campo": "volume",
-            "descrizione": "Volume di scambi giornaliero",
-            "spiegazione": "Numero di azioni scambiate nel giorno. Volume alto indica interesse."
-        },
-        {
-            "campo": "averageVolume",
-            "descrizione": "Volume medio (ultimi 3 mesi)",
-            "spiegazione": "Media del volume giornaliero. Utile per identificare giorni anomali."
-        },
-        {
-            "campo": "averageVolume10days",
-            "descrizione": "Volume medio (ultimi 10 giorni)",
-            "spiegazione": "Volume medio più recente, utile per trend di breve periodo."
-        },
-        {
-            "campo": "marketCap",
-            "descrizione": "Capitalizzazione di mercato",
-            "spiegazione": "Valore totale di tutte le azioni (Prezzo × Azioni Outstanding)."
-        },
-        {
-            "campo": "sharesOutstanding",
-            "descrizione": "Azioni in circolazione",
-            "spiegazione": "Numero totale di azioni emesse e in circolazione."
-        },
-        {
-            "campo": "floatShares",
-            "descrizione": "Azioni flottanti",
-            "spiegazione": "Azioni disponibili per il trading pubblico (esclude insider)."
-        },
-        {
-            "campo": "sharesShort",
-            "descrizione": "Azioni vendute allo scoperto",
-            "spiegazione": "Numero di azioni attualmente in posizione short."
-        },
-        {
-            "campo": "shortRatio",
-            "descrizione": "Rapporto short",
-            "spiegazione": "Giorni necessari per coprire tutte le posizioni short al volume medio."
-        },
-        {
-            "campo": "shortPercentOfFloat",
-            "descrizione": "% short sul flottante",
-            "spiegazione": "Percentuale del flottante venduto allo scoperto."
-        },
-        {
-            "campo": "beta",
-            "descrizione": "Beta (volatilità relativa)",
-            "spiegazione": "Volatilità rispetto al mercato. Beta > 1 = più volatile del mercato."
-        },
-        {
-            "campo": "52WeekLow",
-            "descrizione": "Minimo a 52 settimane",
-            "spiegazione": "Prezzo più basso degli ultimi 12 mesi."
-        },
-        {
-            "campo": "52WeekHigh",
-            "descrizione": "Massimo a 52 settimane",
-            "spiegazione": "Prezzo più alto degli ultimi 12 mesi."
-        },
-        {
-            "campo": "fiftyTwoWeekLowChange",
-            "descrizione": "Variazione dal minimo 52w",
-            "spiegazione": "Differenza tra prezzo corrente e minimo annuale."
-        },
-        {
-            "campo": "fiftyTwoWeekHighChange",
-            "descrizione": "Variazione dal massimo 52w",
-            "spiegazione": "Differenza tra prezzo corrente e massimo annuale."
-        }
-    ]
-    
-    df_trading = pd.DataFrame(trading_data)
+    df_trading = get_table("trading_data")
     st.dataframe(df_trading, use_container_width=True)
     
     st.subheader("📊 Medie Mobili e Indicatori Tecnici")
-    technical_data = [
-        {
-            "campo": "fiftyDayAverage",
-            "descrizione": "Media mobile a 50 giorni",
-            "spiegazione": "Prezzo medio degli ultimi 50 giorni. Trend di medio termine."
-        },
-        {
-            "campo": "twoHundredDayAverage",
-            "descrizione": "Media mobile a 200 giorni",
-            "spiegazione": "Prezzo medio degli ultimi 200 giorni. Trend di lungo termine."
-        },
-        {
-            "campo": "fiftyDayAverageChange",
-            "descrizione": "Variazione da media 50gg",
-            "spiegazione": "Differenza tra prezzo corrente e media mobile 50 giorni."
-        },
-        {
-            "campo": "twoHundredDayAverageChange",
-            "descrizione": "Variazione da media 200gg",
-            "spiegazione": "Differenza tra prezzo corrente e media mobile 200 giorni."
-        }
-    ]
-    
-    df_tech = pd.DataFrame(technical_data)
+    df_tech = get_table("technical_data")
     st.dataframe(df_tech, use_container_width=True)
 
 def show_company_info():
     st.header("🏢 Informazioni Aziendali Dettagliate")
     
-    company_data = [
-        {
-            "campo": "sector",
-            "descrizione": "Settore di appartenenza",
-            "esempio": "Technology, Healthcare, Financial Services",
-            "utilità": "Classificazione macro-settoriale per comparazioni"
-        },
-        {
-            "campo": "industry",
-            "descrizione": "Industria specifica",
-            "esempio": "Consumer Electronics, Biotechnology",
-            "utilità": "Sotto-categoria più specifica del settore"
-        },
-        {
-            "campo": "fullTimeEmployees",
-            "descrizione": "Dipendenti a tempo pieno",
-            "esempio": "147000",
-            "utilità": "Dimensione aziendale e confronti settoriali"
-        },
-        {
-            "campo": "longBusinessSummary",
-            "descrizione": "Descrizione business completa",
-            "esempio": "Descrizione dettagliata dell'attività aziendale",
-            "utilità": "Comprensione del modello di business"
-        },
-        {
-            "campo": "website",
-            "descrizione": "Sito web aziendale",
-            "esempio": "https://www.apple.com",
-            "utilità": "Link diretto al sito ufficiale"
-        },
-        {
-            "campo": "phone",
-            "descrizione": "Numero di telefono",
-            "esempio": "408 996 1010",
-            "utilità": "Contatto investor relations"
-        },
-        {
-            "campo": "address1",
-            "descrizione": "Indirizzo sede principale",
-            "esempio": "One Apple Park Way",
-            "utilità": "Localizzazione geografica"
-        },
-        {
-            "campo": "city",
-            "descrizione": "Città sede",
-            "esempio": "Cupertino",
-            "utilità": "Ubicazione geografica"
-        },
-        {
-            "campo": "state",
-            "descrizione": "Stato/Provincia",
-            "esempio": "CA",
-            "utilità": "Giurisdizione fiscale e regolamentare"
-        },
-        {
-            "campo": "zip",
-            "descrizione": "Codice postale",
-            "esempio": "95014",
-            "utilità": "Indirizzo completo"
-        },
-        {
-            "campo": "country",
-            "descrizione": "Paese sede legale",
-            "esempio": "United States",
-            "utilità": "Giurisdizione e analisi geografica"
-        }
-    ]
-    
-    df_company = pd.DataFrame(company_data)
+    df_company = get_table("company_data")
     st.dataframe(df_company, use_container_width=True)
     
     st.subheader("👥 Management e Governance")
-    management_data = [
-        {
-            "campo": "companyOfficers",
-            "descrizione": "Lista dirigenti aziendali",
-            "contenuto": "Nome, ruolo, età, compenso totale",
-            "utilità": "Analisi del management team"
-        },
-        {
-            "campo": "governanceEpochDate",
-            "descrizione": "Data aggiornamento governance",
-            "contenuto": "Timestamp ultimo aggiornamento",
-            "utilità": "Freschezza dei dati governance"
-        },
-        {
-            "campo": "compensationRisk",
-            "descrizione": "Rischio compensi",
-            "contenuto": "Score 1-10",
-            "utilità": "Valutazione politiche retributive"
-        },
-        {
-            "campo": "auditRisk",
-            "descrizione": "Rischio audit",
-            "contenuto": "Score 1-10",
-            "utilità": "Qualità controlli contabili"
-        },
-        {
-            "campo": "boardRisk",
-            "descrizione": "Rischio board",
-            "contenuto": "Score 1-10",
-            "utilità": "Efficacia consiglio amministrazione"
-        },
-        {
-            "campo": "shareHolderRightsRisk",
-            "descrizione": "Rischio diritti azionisti",
-            "contenuto": "Score 1-10",
-            "utilità": "Protezione interessi azionisti"
-        }
-    ]
-    
-    df_mgmt = pd.DataFrame(management_data)
+    df_mgmt = get_table("management_data")
     st.dataframe(df_mgmt, use_container_width=True)
 
 def show_historical_data():
     st.header("📋 Dati Storici Disponibili")
     
     st.subheader("🕐 Periodi Disponibili")
-    periods_info = [
-        {
-            "periodo": "1d",
-            "descrizione": "1 giorno",
-            "dettaglio": "Dati intraday con intervalli di 1m, 2m, 5m, 15m, 30m, 60m, 90m"
-        },
-        {
-            "periodo": "5d",
-            "descrizione": "5 giorni",
-            "dettaglio": "Dati recenti con alta granularità"
-        },
-        {
-            "periodo": "1mo",
-            "descrizione": "1 mese",
-            "dettaglio": "Ultimo mese di trading"
-        },
-        {
-            "periodo": "3mo",
-            "descrizione": "3 mesi",
-            "dettaglio": "Trimestre corrente"
-        },
-        {
-            "periodo": "6mo",
-            "descrizione": "6 mesi",
-            "dettaglio": "Semestre corrente"
-        },
-        {
-            "periodo": "1y",
-            "descrizione": "1 anno",
-            "dettaglio": "Ultimi 12 mesi"
-        },
-        {
-            "periodo": "2y",
-            "descrizione": "2 anni",
-            "dettaglio": "Dati biennali"
-        },
-        {
-            "periodo": "5y",
-            "descrizione": "5 anni",
-            "dettaglio": "Quinquennio"
-        },
-        {
-            "periodo": "10y",
-            "descrizione": "10 anni",
-            "dettaglio": "Decennio"
-        },
-        {
-            "periodo": "ytd",
-            "descrizione": "Year-to-date",
-            "dettaglio": "Dall'inizio dell'anno"
-        },
-        {
-            "periodo": "max",
-            "descrizione": "Massimo disponibile",
-            "dettaglio": "Tutti i dati storici disponibili"
-        }
-    ]
-    
-    df_periods = pd.DataFrame(periods_info)
+    df_periods = get_table("periods_info")
     st.dataframe(df_periods, use_container_width=True)
     
     st.subheader("📊 Dati Contenuti nei Prezzi Storici")
-    historical_fields = [
-        {
-            "campo": "Open",
-            "descrizione": "Prezzo di apertura",
-            "utilità": "Primo prezzo della sessione di trading"
-        },
-        {
-            "campo": "High",
-            "descrizione": "Prezzo massimo",
-            "utilità": "Prezzo più alto raggiunto nel periodo"
-        },
-        {
-            "campo": "Low",
-            "descrizione": "Prezzo minimo",
-            "utilità": "Prezzo più basso raggiunto nel periodo"
-        },
-        {
-            "campo": "Close",
-            "descrizione": "Prezzo di chiusura",
-            "utilità": "Ultimo prezzo della sessione"
-        },
-        {
-            "campo": "Adj Close",
-            "descrizione": "Prezzo aggiustato",
-            "utilità": "Prezzo corretto per split e dividendi"
-        },
-        {
-            "campo": "Volume",
-            "descrizione": "Volume scambiato",
-            "utilità": "Numero di azioni scambiate nel periodo"
-        }
-    ]
-    
-    df_hist = pd.DataFrame(historical_fields)
+    df_hist = get_table("historical_fields")
     st.dataframe(df_hist, use_container_width=True)
     
     st.info("""
@@ -631,6 +211,88 @@ def show_historical_data():
     
     Usa sempre 'Adj Close' per calcoli di rendimento e analisi tecniche.
     """)
+    
+    st.subheader("💾 Archivio Locale dei Prezzi")
+    st.write("Con `PriceStore` la storia resta su disco e ad ogni accesso si scaricano solo le barre mancanti:")
+    store_code = '''
+from price_store import PriceStore
+
+store = PriceStore("dati_prezzi")
+
+# Primo accesso: scarica 5 anni; i successivi solo la coda dall'ultima barra, e solo se
+# può esserci una barra nuova o la barra parziale è più vecchia di refresh_age (5 minuti)
+hist = store.history("AAPL", interval="1d")
+
+# Intraday: la storia iniziale rispetta i limiti di Yahoo (7 giorni per 1m, 60 per 5m-90m)
+hist_1m = store.history("AAPL", interval="1m")
+
+# Range query servita dal disco, senza rete
+hist_2023 = store.load("AAPL", "1d", start="2023-01-01", end="2023-12-31")
+
+# Colonne come viste memory-mapped, senza copia
+cols = store.columns("AAPL", "1d")
+closes = cols["Close"]
+'''
+    st.code(store_code, language='python')
+
+    st.subheader("🧮 Barre Intraday Compatte")
+    st.write("Per storie a 1 minuto su molti simboli `Bars` usa 28 byte per barra invece dei 64 di un DataFrame float64:")
+    bars_code = '''
+from bars import Bars, load_intraday
+
+# Conversione subito dopo il download (cache=None: i DataFrame non restano in memoria)
+bars = load_intraday(["AAPL", "MSFT", "NVDA"], None, interval="1m", period="5d")
+aapl = bars["AAPL"]
+
+# Prezzi in virgola fissa (4 decimali) per aritmetica esatta
+fixed = Bars.from_frame(hist_1min, scale=10_000)
+
+# Viste senza copia: slice per orario e DataFrame sullo stesso buffer
+seduta = aapl.between("2024-06-05 09:30", "2024-06-05 16:00")
+df = seduta.to_frame()           # indice UTC, nessuna copia
+df_ny = seduta.to_frame(tz=True) # copia solo i timestamp per il fuso orario
+
+# Salvataggio e riapertura in memory map
+aapl.save("dati_intraday/AAPL_1m")
+aapl = Bars.load("dati_intraday/AAPL_1m")
+'''
+    st.code(bars_code, language='python')
+
+    st.subheader("⏱️ Timeframe Derivati in Locale")
+    st.write("I timeframe più ampi si ricavano dalle barre a 1 minuto già salvate, senza altri download:")
+    resample_code = '''
+from resample import MultiTimeframe, aggregate, from_store
+
+base = from_store(store, "AAPL", interval="1m")
+
+# Singolo timeframe (ore allineate all'apertura delle 9:30)
+hourly = aggregate(base, "1h", offset="30min").to_frame(tz=True)
+
+# 5m/15m/1h/1d/1wk sempre allineati: ogni update ricalcola solo l'ultimo bucket
+mtf = MultiTimeframe(base, offsets={"1h": "30min"})
+mtf.update(nuove_barre_1m)
+daily = mtf.frame("1d")
+weekly = mtf.frame("1wk")
+'''
+    st.code(resample_code, language='python')
+
+    st.subheader("🧾 Prezzi Aggiustati Calcolati in Locale")
+    st.write("Si salvano i prezzi grezzi e la tabella di dividendi e split: un nuovo dividendo aggiunge solo una riga, senza riscaricare la storia:")
+    adjust_code = '''
+from adjust import AdjustedPrices
+
+adjusted = AdjustedPrices()  # PriceStore grezzo (auto_adjust=False) + tabella operazioni
+
+# OHLC aggiustati come ticker.history(auto_adjust=True), calcolati in lettura
+hist = adjusted.history("AAPL")
+
+# Close aggiustato per gli split più la colonna 'Adj Close'
+hist_raw = adjusted.history("AAPL", auto_adjust=False)
+
+# Tabella delle operazioni societarie (importi dei dividendi effettivamente pagati)
+print(adjusted.actions("AAPL"))
+'''
+    st.code(adjust_code, language='python')
 
 def show_options_data():
     st.header("🎯 Dati delle Opzioni")
@@ -643,80 +305,7 @@ def show_options_data():
     """)
     
     st.subheader("📋 Dati Call Options")
-    call_fields = [
-        {
-            "campo": "contractSymbol",
-            "descrizione": "Simbolo univoco del contratto",
-            "esempio": "AAPL240119C00180000"
-        },
-        {
-            "campo": "strike",
-            "descrizione": "Prezzo di esercizio",
-            "esempio": "180.0"
-        },
-        {
-            "campo": "lastPrice",
-            "descrizione": "Ultimo prezzo negoziato",
-            "esempio": "5.25"
-        },
-        {
-            "campo": "bid",
-            "descrizione": "Prezzo di acquisto",
-            "esempio": "5.20"
-        },
-        {
-            "campo": "ask",
-            "descrizione": "Prezzo di vendita",
-            "esempio": "5.30"
-        },
-        {
-            "campo": "change",
-            "descrizione": "Variazione giornaliera",
-            "esempio": "+0.15"
-        },
-        {
-            "campo": "percentChange",
-            "descrizione": "Variazione percentuale",
-            "esempio": "2.95%"
-        },
-        {
-            "campo": "volume",
-            "descrizione": "Volume scambiato",
-            "esempio": "1250"
-        },
-        {
-            "campo": "openInterest",
-            "descrizione": "Interesse aperto",
-            "esempio": "3450"
-        },
-        {
-            "campo": "impliedVolatility",
-            "descrizione": "Volatilità implicita",
-            "esempio": "0.2150"
-        },
-        {
-            "campo": "inTheMoney",
-            "descrizione": "In the money (boolean)",
-            "esempio": "True/False"
-        },
-        {
-            "campo": "contractSize",
-            "descrizione": "Dimensione contratto",
-            "esempio": "REGULAR"
-        },
-        {
-            "campo": "currency",
-            "descrizione": "Valuta",
-            "esempio": "USD"
-        },
-        {
-            "campo": "lastTradeDate",
-            "descrizione": "Data ultimo scambio",
-            "esempio": "2024-01-15"
-        }
-    ]
-    
-    df_calls = pd.DataFrame(call_fields)
+    df_calls = get_table("call_fields")
     st.dataframe(df_calls, use_container_width=True)
     
     st.subheader("📉 Dati Put Options")
@@ -755,6 +344,36 @@ sorted_by_iv = calls.sort_values('impliedVolatility', ascending=False)
 '''
     
     st.code(code_example, language='python')
+    
+    st.subheader("🗂️ Superficie Completa su Tutte le Scadenze")
+    st.write("Per caricare tutte le scadenze in parallelo, in un'unica tabella indicizzata per (simbolo, scadenza, strike, tipo):")
+    surface_code = '''
+from options_chain import load_chains, calls_puts
+
+surface = load_chains(["AAPL", "SPY"], max_workers=8)
+print(surface.attrs["errors"])  # scadenze non caricate
+
+# Tutte le call di AAPL
+calls, puts = calls_puts(surface, "AAPL")
+
+# Una singola scadenza
+jan = surface.xs("2024-01-19", level="expiry")
+
+# IV ricalcolata dai prezzi mid e greche su tutta la chain
+from greeks import chain_greeks, iv_surface
+priced = chain_greeks(surface.xs("AAPL", level="symbol", drop_level=False), spot=175.0, rate=0.05)
+print(priced[["mid", "iv", "delta", "gamma", "vega", "theta"]].head())
+
+# Superficie IV (scadenze x strike) dalle opzioni OTM
+iv_grid = iv_surface(priced, spot=175.0)
+
+# Filtri ripetuti sulla stessa chain: indici costruiti una volta, query con ricerca binaria
+from options_screener import ChainScreener
+screener = ChainScreener(priced, spot=175.0)
+near_money = screener.near_money(band=0.05, option_type="call")
+liquid = screener.query(moneyness=(0.9, 1.1), min_volume=100, iv_rank=(80, None))
+'''
+    st.code(surface_code, language='python')
 
 def show_financial_statements():
     st.header("💼 Bilanci e Statements Finanziari")
@@ -762,181 +381,20 @@ def show_financial_statements():
     st.subheader("📊 Income Statement (Conto Economico)")
     st.write("Accessibile tramite `ticker.financials` (annuale) e `ticker.quarterly_financials` (trimestrale)")
     
-    income_fields = [
-        {
-            "campo": "Total Revenue",
-            "descrizione": "Ricavi totali",
-            "significato": "Vendite complessive dell'azienda"
-        },
-        {
-            "campo": "Cost Of Revenue",
-            "descrizione": "Costo dei ricavi",
-            "significato": "Costi diretti per produrre beni/servizi venduti"
-        },
-        {
-            "campo": "Gross Profit",
-            "descrizione": "Utile lordo",
-            "significato": "Ricavi - Costo dei ricavi"
-        },
-        {
-            "campo": "Operating Income",
-            "descrizione": "Reddito operativo",
-            "significato": "Utile dalle operazioni principali"
-        },
-        {
-            "campo": "Net Income",
-            "descrizione": "Utile netto",
-            "significato": "Profitto finale dopo tutte le spese"
-        },
-        {
-            "campo": "EBITDA",
-            "descrizione": "EBITDA",
-            "significato": "Utili prima di interessi, tasse, deprezzamenti"
-        },
-        {
-            "campo": "Diluted EPS",
-            "descrizione": "Utile per azione diluito",
-            "significato": "Utile netto / azioni totali (incluse potenziali)"
-        },
-        {
-            "campo": "Basic EPS",
-            "descrizione": "Utile per azione base",
-            "significato": "Utile netto / azioni in circolazione"
-        }
-    ]
-    
-    df_income = pd.DataFrame(income_fields)
+    df_income = get_table("income_fields")
     st.dataframe(df_income, use_container_width=True)
     
     st.subheader("🏦 Balance Sheet (Stato Patrimoniale)")
     st.write("Accessibile tramite `ticker.balance_sheet` (annuale) e `ticker.quarterly_balance_sheet` (trimestrale)")
     
-    balance_fields = [
-        {
-            "campo": "Total Assets",
-            "descrizione": "Attività totali",
-            "significato": "Tutti i beni posseduti dall'azienda"
-        },
-        {
-            "campo": "Current Assets",
-            "descrizione": "Attività correnti",
-            "significato": "Beni convertibili in cash entro 1 anno"
-        },
-        {
-            "campo": "Cash And Cash Equivalents",
-            "descrizione": "Liquidità",
-            "significato": "Denaro disponibile immediatamente"
-        },
-        {
-            "campo": "Total Liabilities Net Minority Interest",
-            "descrizione": "Passività totali",
-            "significato": "Tutti i debiti dell'azienda"
-        },
-        {
-            "campo": "Current Liabilities",
-            "descrizione": "Passività correnti",
-            "significato": "Debiti da pagare entro 1 anno"
-        },
-        {
-            "campo": "Total Equity Gross Minority Interest",
-            "descrizione": "Patrimonio netto",
-            "significato": "Valore residuo per gli azionisti"
-        },
-        {
-            "campo": "Retained Earnings",
-            "descrizione": "Utili non distribuiti",
-            "significato": "Profitti accumulati e reinvestiti"
-        },
-        {
-            "campo": "Inventory",
-            "descrizione": "Rimanenze",
-            "significato": "Valore delle scorte di magazzino"
-        }
-    ]
-    
-    df_balance = pd.DataFrame(balance_fields)
+    df_balance = get_table("balance_fields")
     st.dataframe(df_balance, use_container_width=True)
 
 def show_cash_flow():
     st.header("📊 Cash Flow Statement (Rendiconto Flussi di Cassa)")
     st.write("Accessibile tramite `ticker.cashflow` (annuale) e `ticker.quarterly_cashflow` (trimestrale)")
     
-    cashflow_fields = [
-        {
-            "categoria": "💰 Flussi Operativi",
-            "campo": "Operating Cash Flow",
-            "descrizione": "Flusso di cassa operativo",
-            "significato": "Liquidità generata dalle operazioni principali"
-        },
-        {
-            "categoria": "💰 Flussi Operativi",
-            "campo": "Net Income",
-            "descrizione": "Utile netto",
-            "significato": "Punto di partenza per il calcolo dei flussi"
-        },
-        {
-            "categoria": "💰 Flussi Operativi",
-            "campo": "Depreciation And Amortization",
-            "descrizione": "Ammortamenti",
-            "significato": "Costi non monetari da riaggiungere"
-        },
-        {
-            "categoria": "💰 Flussi Operativi",
-            "campo": "Change In Working Capital",
-            "descrizione": "Variazione capitale circolante",
-            "significato": "Impatto delle variazioni di crediti/debiti"
-        },
-        {
-            "categoria": "🏗️ Flussi Investimento",
-            "campo": "Investing Cash Flow",
-            "descrizione": "Flusso di cassa da investimenti",
-            "significato": "Liquidità usata/generata da investimenti"
-        },
-        {
-            "categoria": "🏗️ Flussi Investimento",
-            "campo": "Capital Expenditure",
-            "descrizione": "Investimenti in capitale fisso",
-            "significato": "Spese per impianti, macchinari, tecnologia"
-        },
-        {
-            "categoria": "🏗️ Flussi Investimento",
-            "campo": "Investments In Other Ventures",
-            "descrizione": "Altri investimenti",
-            "significato": "Acquisizioni, partecipazioni, joint venture"
-        },
-        {
-            "categoria": "💳 Flussi Finanziamento",
-            "campo": "Financing Cash Flow",
-            "descrizione": "Flusso di cassa da finanziamento",
-            "significato": "Liquidità da/per azionisti e creditori"
-        },
-        {
-            "categoria": "💳 Flussi Finanziamento",
-            "campo": "Common Stock Dividends Paid",
-            "descrizione": "Dividendi pagati",
-            "significato": "Distribuzioni di utili agli azionisti"
-        },
-        {
-            "categoria": "💳 Flussi Finanziamento",
-            "campo": "Repurchase Of Capital Stock",
-            "descrizione": "Riacquisto azioni proprie",
-            "significato": "Programmi di buyback"
-        },
-        {
-            "categoria": "💳 Flussi Finanziamento",
-            "campo": "Issuance Of Debt",
-            "descrizione": "Emissione debiti",
-            "significato": "Nuovi prestiti e obbligazioni"
-        },
-        {
-            "categoria": "💳 Flussi Finanziamento",
-            "campo": "Repayment Of Debt",
-            "descrizione": "Rimborso debiti",
-            "significato": "Pagamento di prestiti e obbligazioni"
-        }
-    ]
-    
-    df_cashflow = pd.DataFrame(cashflow_fields)
+    df_cashflow = get_table("cashflow_fields")
     st.dataframe(df_cashflow, use_container_width=True)
     
     st.subheader("🔍 Free Cash Flow - Calcolo")
@@ -949,88 +407,36 @@ def show_cash_flow():
     - **Negativo**: L'azienda consuma più liquidità di quella che genera
     - **Crescente**: Trend positivo nella generazione di cassa
     """)
+    
+    st.subheader("🧮 Ratios da Bilanci per Molti Titoli")
+    fundamentals_code = '''
+from data_cache import DataCache
+from fundamentals import load_fundamentals
+
+# Bilanci annuali allineati in un array (simboli x periodi x voci)
+panel = load_fundamentals(["AAPL", "MSFT", "GOOG"], DataCache(), frequency="annual")
+
+# FCF, margini, ROE, current ratio e crescite dell'ultimo esercizio
+ratios = panel.ratios_frame(period=0)
+print(ratios[["freeCashFlow", "fcfMargin", "returnOnEquity", "revenueGrowth"]])
+
+# Serie complete (simboli x periodi) per analisi multi-periodo
+fcf = panel.compute_ratios()["freeCashFlow"]
+
+# Trimestrali: 8 trimestri di default, crescita anno su anno (stesso trimestre)
+quarterly = load_fundamentals(["AAPL", "MSFT", "GOOG"], DataCache(), frequency="quarterly")
+'''
+    st.code(fundamentals_code, language='python')
 
 def show_growth_dividends():
     st.header("📈 Crescita e Dividendi")
     
     st.subheader("📊 Metriche di Crescita")
-    growth_fields = [
-        {
-            "campo": "revenueGrowth",
-            "descrizione": "Crescita ricavi",
-            "calcolo": "(Ricavi Anno Corrente - Ricavi Anno Precedente) / Ricavi Anno Precedente",
-            "interpretazione": "Tasso di crescita delle vendite year-over-year"
-        },
-        {
-            "campo": "earningsGrowth",
-            "descrizione": "Crescita utili",
-            "calcolo": "(Utili Anno Corrente - Utili Anno Precedente) / Utili Anno Precedente",
-            "interpretazione": "Tasso di crescita degli utili year-over-year"
-        },
-        {
-            "campo": "earningsQuarterlyGrowth",
-            "descrizione": "Crescita utili trimestrale",
-            "calcolo": "Crescita utili ultimo trimestre vs stesso trimestre anno precedente",
-            "interpretazione": "Crescita più recente degli utili"
-        },
-        {
-            "campo": "revenueQuarterlyGrowth",
-            "descrizione": "Crescita ricavi trimestrale",
-            "calcolo": "Crescita ricavi ultimo trimestre vs stesso trimestre anno precedente",
-            "interpretazione": "Crescita più recente dei ricavi"
-        }
-    ]
-    
-    df_growth = pd.DataFrame(growth_fields)
+    df_growth = get_table("growth_fields")
     st.dataframe(df_growth, use_container_width=True)
     
     st.subheader("💰 Informazioni sui Dividendi")
-    dividend_fields = [
-        {
-            "campo": "dividendRate",
-            "descrizione": "Tasso dividendo annuale",
-            "esempio": "0.92",
-            "significato": "Dividendo annuale per azione in dollari"
-        },
-        {
-            "campo": "dividendYield",
-            "descrizione": "Rendimento dividendo",
-            "esempio": "0.0052 (0.52%)",
-            "significato": "Dividendo annuale / Prezzo corrente"
-        },
-        {
-            "campo": "exDividendDate",
-            "descrizione": "Data ex-dividendo",
-            "esempio": "2024-02-09",
-            "significato": "Ultima data per ricevere il prossimo dividendo"
-        },
-        {
-            "campo": "payoutRatio",
-            "descrizione": "Payout ratio",
-            "esempio": "0.15 (15%)",
-            "significato": "Percentuale di utili distribuita come dividendi"
-        },
-        {
-            "campo": "fiveYearAvgDividendYield",
-            "descrizione": "Rendimento medio 5 anni",
-            "esempio": "0.0048",
-            "significato": "Dividend yield medio degli ultimi 5 anni"
-        },
-        {
-            "campo": "trailingAnnualDividendRate",
-            "descrizione": "Dividendo trailing annuale",
-            "esempio": "0.92",
-            "significato": "Dividendi pagati negli ultimi 12 mesi"
-        },
-        {
-            "campo": "trailingAnnualDividendYield",
-            "descrizione": "Yield trailing annuale",
-            "esempio": "0.0052",
-            "significato": "Yield basato sui dividendi ultimi 12 mesi"
-        }
-    ]
-    
-    df_dividends = pd.DataFrame(dividend_fields)
+    df_dividends = get_table("dividend_fields")
     st.dataframe(df_dividends, use_container_width=True)
     
     st.subheader("📅 Dati Storici Dividendi")
@@ -1055,137 +461,58 @@ def show_technical_analysis():
     st.header("🔍 Dati per Analisi Tecnica")
     
     st.subheader("📈 Indicatori di Momentum")
-    momentum_indicators = [
-        {
-            "indicatore": "RSI (Relative Strength Index)",
-            "calcolo": "Non diretto - calcolabile dai prezzi storici",
-            "interpretazione": "RSI > 70 = ipercomprato, RSI < 30 = ipervenduto",
-            "periodo": "Tipicamente 14 giorni"
-        },
-        {
-            "indicatore": "MACD",
-            "calcolo": "EMA(12) - EMA(26)",
-            "interpretazione": "Crossover segnalano cambi di trend",
-            "periodo": "12, 26, 9 giorni standard"
-        },
-        {
-            "indicatore": "Stochastic Oscillator",
-            "calcolo": "(Close - Low) / (High - Low) * 100",
-            "interpretazione": "> 80 ipercomprato, < 20 ipervenduto",
-            "periodo": "14 giorni tipicamente"
-        }
-    ]
-    
-    df_momentum = pd.DataFrame(momentum_indicators)
+    df_momentum = get_table("momentum_indicators")
     st.dataframe(df_momentum, use_container_width=True)
     
     st.subheader("📊 Medie Mobili Disponibili")
-    ma_data = [
-        {
-            "campo": "fiftyDayAverage",
-            "descrizione": "Media mobile 50 giorni",
-            "utilizzo": "Trend di medio termine, supporto/resistenza"
-        },
-        {
-            "campo": "twoHundredDayAverage",
-            "descrizione": "Media mobile 200 giorni",
-            "utilizzo": "Trend di lungo termine, bull/bear market"
-        }
-    ]
-    
-    df_ma = pd.DataFrame(ma_data)
+    df_ma = get_table("ma_data")
     st.dataframe(df_ma, use_container_width=True)
     
     st.subheader("📐 Bande di Bollinger e Volatilità")
-    volatility_data = [
-        {
-            "metrica": "Bollinger Bands",
-            "calcolo": "Media Mobile ± (2 × Deviazione Standard)",
-            "interpretazione": "Prezzi vicini alle bande indicano possibili inversioni",
-            "dati_necessari": "Close prices per calcolo"
-        },
-        {
-            "metrica": "Average True Range (ATR)",
-            "calcolo": "Media dei True Range su N periodi",
-            "interpretazione": "Misura la volatilità del titolo",
-            "dati_necessari": "High, Low, Close prices"
-        },
-        {
-            "metrica": "Volatilità Storica",
-            "calcolo": "Deviazione standard dei rendimenti",
-            "interpretazione": "Volatilità passata del titolo",
-            "dati_necessari": "Close prices storici"
-        }
-    ]
-    
-    df_vol = pd.DataFrame(volatility_data)
+    df_vol = get_table("volatility_data")
     st.dataframe(df_vol, use_container_width=True)
     
     st.subheader("🎯 Livelli di Supporto e Resistenza")
-    support_resistance = [
-        {
-            "livello": "52 Week High",
-            "campo_yahoo": "52WeekHigh",
-            "utilizzo": "Resistenza psicologica forte"
-        },
-        {
-            "livello": "52 Week Low",
-            "campo_yahoo": "52WeekLow",
-            "utilizzo": "Supporto psicologico forte"
-        },
-        {
-            "livello": "Media Mobile 200",
-            "campo_yahoo": "twoHundredDayAverage",
-            "utilizzo": "Supporto/resistenza dinamica long-term"
-        },
-        {
-            "livello": "Media Mobile 50",
-            "campo_yahoo": "fiftyDayAverage",
-            "utilizzo": "Supporto/resistenza dinamica medium-term"
-        }
-    ]
-    
-    df_sr = pd.DataFrame(support_resistance)
+    df_sr = get_table("support_resistance")
     st.dataframe(df_sr, use_container_width=True)
+    
+    st.subheader("🧮 Calcolo degli Indicatori")
+    st.write("Il modulo `indicators` calcola tutti gli indicatori in un solo passaggio, anche su molti titoli insieme:")
+    indicators_code = '''
+from indicators import compute_indicators, indicators_frame, indicators_panel, price_matrix
+
+# Un solo titolo: DataFrame con RSI, MACD, Bollinger, Stocastico, ATR, medie mobili
+hist = yf.Ticker("AAPL").history(period="1y")
+ind = indicators_frame(hist)
+print(ind[["RSI", "MACD", "BB_upper", "ATR"]].tail())
+
+# Molti titoli: matrice date x simboli, calcolo per colonne
+data = yf.download(["AAPL", "MSFT", "GOOG"], period="1y", group_by="column")
+panel = indicators_panel(data["Close"], data["High"], data["Low"])
+print(panel["RSI"].iloc[-1])  # RSI corrente di ogni simbolo
+'''
+    st.code(indicators_code, language='python')
+    
+    st.subheader("🧪 Backtest delle Regole")
+    st.write("Le regole descritte sopra (RSI 70/30, incrocio delle medie, Bollinger, MACD) si possono verificare su molti titoli e parametri insieme:")
+    backtest_code = '''
+from backtest import backtest, best, sweep
+
+# close: DataFrame (date x simboli), ad es. price_matrix(histories)
+metrics, equity = backtest(close, "rsi", cost_bps=5, window=14, lower=30, upper=70)
+
+# Sweep di parametri su un pool di processi: una riga per (combinazione, simbolo)
+results = sweep(close, "ma_cross", {"fast": range(5, 60, 5), "slow": range(50, 260, 10)})
+print(best(results, metric="sharpe"))                   # migliore combinazione per titolo
+print(best(results, metric="sharpe", by_symbol=False))  # migliore in media
+'''
+    st.code(backtest_code, language='python')
 
 def show_esg_data():
     st.header("🌍 Dati ESG (Environmental, Social, Governance)")
     
     st.subheader("🌱 Environmental (Ambientali)")
-    env_fields = [
-        {
-            "campo": "environmentScore",
-            "descrizione": "Punteggio ambientale",
-            "range": "1-100",
-            "significato": "Performance su temi ambientali"
-        },
-        {
-            "campo": "socialScore",
-            "descrizione": "Punteggio sociale",
-            "range": "1-100",
-            "significato": "Performance su responsabilità sociale"
-        },
-        {
-            "campo": "governanceScore",
-            "descrizione": "Punteggio governance",
-            "range": "1-100",
-            "significato": "Qualità della governance aziendale"
-        },
-        {
-            "campo": "totalEsg",
-            "descrizione": "Punteggio ESG totale",
-            "range": "1-100",
-            "significato": "Score complessivo ESG"
-        },
-        {
-            "campo": "esgPerformance",
-            "descrizione": "Performance ESG",
-            "valori": "UNDER_PERF, AVG_PERF, OUT_PERF",
-            "significato": "Performance relativa nel settore"
-        }
-    ]
-    
-    df_esg = pd.DataFrame(env_fields)
+    df_esg = get_table("env_fields")
     st.dataframe(df_esg, use_container_width=True)
     
     st.subheader("🏆 Classificazioni ESG")
@@ -1390,6 +717,34 @@ print(f"RSI corrente: {rsi.iloc[-1]:.2f}")
 '''
     st.code(calculations_code, language='python')
     
+    st.subheader("📐 Rischio di Portafoglio su Molti Titoli")
+    portfolio_code = '''
+import pandas as pd
+
+from data_cache import DataCache
+from portfolio import load_portfolio
+
+cache = DataCache()
+portfolio = load_portfolio(["AAPL", "MSFT", "GOOG", "JPM", "XOM"], cache, period="2y")
+spy = load_portfolio(["SPY"], cache, period="2y")
+# Benchmark allineato per data alle sedute del portafoglio (NaN dove manca)
+benchmark = pd.Series(spy.prices[:, 0], index=spy.dates).reindex(portfolio.dates)
+
+# Covarianza e correlazione di tutte le coppie con un solo prodotto di matrici
+corr = portfolio.correlation(window=60)
+
+# Volatilità, VaR/CVaR storici al 95% e beta, per titolo e per il portafoglio
+weights = {"AAPL": 0.3, "MSFT": 0.3, "GOOG": 0.2, "JPM": 0.1, "XOM": 0.1}
+report = portfolio.risk_report(weights, benchmark=benchmark)
+print(report)
+
+# Finestra mobile aggiornata in modo incrementale a ogni nuova seduta
+rolling = portfolio.rolling(window=60)
+rolling.update(new_returns)  # array con un rendimento per simbolo
+cov = rolling.covariance()
+'''
+    st.code(portfolio_code, language='python')
+    
     st.subheader("⚠️ Limitazioni e Considerazioni")
     st.warning("""
     **Limitazioni Yahoo Finance**:
@@ -1407,21 +762,69 @@ print(f"RSI corrente: {rsi.iloc[-1]:.2f}")
     - Usa timeout nelle richieste
     - Considera API alternative per uso professionale
     """)
+    st.info(
+        "In questa app tutte le richieste a Yahoo Finance passano da uno scheduler con "
+        "token bucket, concorrenza adattiva e retry con backoff; il ritmo massimo si "
+        "imposta con la variabile d'ambiente `GUIDA_RATE_LIMIT` (richieste al secondo)."
+    )
 
 def show_example_data(symbol):
-    """Mostra dati di esempio per il simbolo inserito"""
+    """Mostra dati di esempio per il simbolo inserito, riempiendo ogni blocco appena arriva"""
+    waiting = {}  # segnaposto ancora con "⏳": chiusi in ogni caso all'uscita
+    status = None
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        if not info or info.get('longName') == 'N/A':
-            st.error(f"❌ Simbolo '{symbol}' non trovato")
-            return
-            
-        st.success(f"✅ Dati trovati per {symbol}")
+        cache = get_data_cache()
+        data = AsyncData(cache)
+        ticker = CachedTicker(symbol, cache)
         
-        # Informazioni base
+        # Segnaposto: la pagina è subito completa e si aggiorna man mano
+        status = st.empty()
+        status.info(f"⏳ Caricamento dati per {symbol}...")
         st.subheader("📊 Informazioni Base")
+        info_slot = waiting["info"] = st.empty()
+        info_slot.write("⏳ In attesa di ticker.info...")
+        st.subheader("💵 Prezzi Recenti")
+        price_slot = waiting["prices"] = st.empty()
+        price_slot.write("⏳ In attesa dei prezzi storici...")
+        st.subheader("🔍 Disponibilità Dati")
+        for category, _ in PROBES + INFO_PROBES:
+            waiting[category] = st.empty()
+            waiting[category].write(f"⏳ {category}")
+        
+        def render_probe(result):
+            _render_probe(waiting.pop(result.category), result)
+        
+        # Tutte le richieste partono insieme; si disegna ciò che arriva per primo.
+        # ticker.info gira subito sull'event loop: il suo timeout parte dall'invio, quello
+        # dei probe dal loro avvio nel pool condiviso (iter_probe_results)
+        pending = submit_probes(ticker)
+        pending[data.submit(data.info(symbol))] = "info"
+        pending.started["info"] = time.perf_counter()
+        for result in iter_probe_results(pending):
+            if not isinstance(result, ProbeResult):
+                info = result
+                if not info or info.get('longName') == 'N/A':
+                    status.error(f"❌ Simbolo '{symbol}' non trovato")
+                    return
+                status.success(f"✅ Dati trovati per {symbol}")
+                _render_info(waiting.pop("info"), info)
+                for probe in info_probe_results(info):
+                    render_probe(probe)
+            elif result.category == "info":
+                status.error(f"❌ Timeout nel recupero dati per {symbol}")
+            else:
+                render_probe(result)
+                if result.category == "Dati Storici":
+                    _render_prices(waiting.pop("prices"), ticker if result.available else None)
+            
+    except Exception as e:
+        (status or st).error(f"❌ Errore nel recupero dati: {e}")
+    finally:
+        for name, slot in waiting.items():
+            slot.write(f"— {name}: non disponibile" if name not in ("info", "prices") else "— non disponibile")
+
+def _render_info(slot, info):
+    with slot.container():
         col1, col2 = st.columns(2)
         
         with col1:
@@ -1433,24 +836,45 @@ def show_example_data(symbol):
             st.write(f"**P/E**: {info.get('trailingPE', 'N/A')}")
             st.write(f"**Market Cap**: {info.get('marketCap', 'N/A')}")
             st.write(f"**Beta**: {info.get('beta', 'N/A')}")
+
+def _render_prices(slot, ticker):
+    hist = ticker.history(period="5d") if ticker is not None else None
+    if hist is None or hist.empty:
+        slot.write("❌ Prezzi storici non disponibili")
+        return
+    close = hist["Close"]
+    change = (close.iloc[-1] / close.iloc[0] - 1) * 100 if len(close) > 1 else 0.0
+    with slot.container():
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Ultima chiusura", f"{close.iloc[-1]:.2f}", f"{change:+.2f}% (5g)")
+        col2.metric("Massimo 5g", f"{hist['High'].max():.2f}")
+        col3.metric("Minimo 5g", f"{hist['Low'].min():.2f}")
+
+def _render_probe(slot, result):
+    if result.error:
+        slot.write(f"{result.status} {result.category} ({result.error})")
+    else:
+        slot.write(f"{result.status} {result.category}")
+
+def show_batch_data(symbols):
+    """Mostra una tabella comparativa per tutti i simboli della watchlist"""
+    try:
+        with st.spinner(f"Caricamento di {len(symbols)} simboli..."):
+            df = resolve_watchlist(symbols, get_data_cache())
         
-        # Dati disponibili
-        st.subheader("🔍 Disponibilità Dati")
-        checks = {
-            'Dati Storici': len(ticker.history(period="5d")) > 0,
-            'Opzioni': len(ticker.options) > 0,
-            'Dividendi': len(ticker.dividends) > 0,
-            'Bilanci': hasattr(ticker, 'balance_sheet') and not ticker.balance_sheet.empty,
-            'Flussi Cassa': hasattr(ticker, 'cashflow') and not ticker.cashflow.empty,
-            'Dati ESG': info.get('totalEsg') is not None
-        }
+        found = df["Nome"].notna().sum()
+        st.success(f"✅ Dati trovati per {found} simboli su {len(symbols)}")
+        
+        st.subheader("📊 Confronto Watchlist")
+        st.dataframe(df, use_container_width=True, hide_index=True)
         
-        for category, available in checks.items():
-            status = "✅" if available else "❌"
-            st.write(f"{status} {category}")
-            
     except Exception as e:
         st.error(f"❌ Errore nel recupero dati: {e}")
 
 if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["snapshot"]:
+        # python guida.py snapshot --universe AAPL,MSFT: job giornaliero senza interfaccia
+        from snapshot import main as snapshot_main
+        sys.exit(snapshot_main(sys.argv[2:]))
     main()
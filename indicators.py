@@ -0,0 +1,260 @@
+# Motore di indicatori tecnici vettorizzato
+# Lavora su matrici (tempo x simboli): ogni colonna è un titolo, nessun ciclo per simbolo.
+# I NaN iniziali (titoli quotati più tardi) sono gestiti: una finestra con NaN dà NaN.
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+OHLCV = ("Open", "High", "Low", "Close", "Volume")
+
+DEFAULT_PARAMS = {
+    "ma_windows": (20, 50, 200),
+    "volatility_window": 30,
+    "rsi_window": 14,
+    "macd": (12, 26, 9),
+    "stochastic": (14, 3),
+    "bollinger": (20, 2.0),
+    "atr_window": 14,
+}
+
+
+def _as_2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def _restore(x, like):
+    return x[:, 0] if np.ndim(like) == 1 else x
+
+
+def _cumsum0(x):
+    out = np.zeros((x.shape[0] + 1, x.shape[1]))
+    np.cumsum(x, axis=0, out=out[1:])
+    return out
+
+
+class _Rolling:
+    """Somme cumulative condivise per medie e deviazioni mobili della stessa serie"""
+
+    def __init__(self, x):
+        x = _as_2d(x)
+        valid = ~np.isnan(x)
+        # Centrare sul primo valore valido riduce la cancellazione numerica nella varianza
+        first = np.argmax(valid, axis=0)
+        shift = np.where(valid.any(axis=0), x[first, np.arange(x.shape[1])], 0.0)
+        centered = np.where(valid, x - shift, 0.0)
+        self.shift = shift
+        self.centered = centered
+        self.csum = _cumsum0(centered)
+        self.ccount = _cumsum0(valid)
+        self._csq = None
+        self._complete_cache = {}
+
+    @property
+    def csq(self):
+        # Somme dei quadrati calcolate solo se serve una deviazione standard
+        if self._csq is None:
+            self._csq = _cumsum0(self.centered * self.centered)
+        return self._csq
+
+    def _window(self, c, window):
+        out = np.full((c.shape[0] - 1, c.shape[1]), np.nan)
+        if window <= out.shape[0]:
+            out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    def _complete(self, window):
+        if window not in self._complete_cache:
+            self._complete_cache[window] = self._window(self.ccount, window) == window
+        return self._complete_cache[window]
+
+    def mean(self, window):
+        with np.errstate(invalid="ignore"):
+            m = self._window(self.csum, window) / window + self.shift
+        return np.where(self._complete(window), m, np.nan)
+
+    def std(self, window, ddof=1):
+        s = self._window(self.csum, window)
+        sq = self._window(self.csq, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (sq - s * s / window) / (window - ddof)
+        var = np.maximum(var, 0.0)
+        if window <= ddof:
+            var[:] = np.nan  # come pandas: nessun grado di libertà, nessuna deviazione
+        return np.where(self._complete(window), np.sqrt(var), np.nan)
+
+
+def rolling_mean(x, window):
+    """Media mobile semplice per colonna"""
+    return _restore(_Rolling(x).mean(window), x)
+
+
+def rolling_std(x, window, ddof=1):
+    """Deviazione standard mobile per colonna"""
+    return _restore(_Rolling(x).std(window, ddof), x)
+
+
+def rolling_max(x, window):
+    """Massimo mobile per colonna"""
+    return _restore(_sliding(_as_2d(x), window, np.max), x)
+
+
+def rolling_min(x, window):
+    """Minimo mobile per colonna"""
+    return _restore(_sliding(_as_2d(x), window, np.min), x)
+
+
+def _sliding(x, window, reduce):
+    out = np.full(x.shape, np.nan)
+    if window <= x.shape[0]:
+        view = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        out[window - 1:] = reduce(view, axis=-1)  # NaN nella finestra -> NaN
+    return out
+
+
+def ema(x, span=None, alpha=None):
+    """Media mobile esponenziale (come pandas ewm(adjust=False)), avviata al primo valore valido"""
+    x2 = _as_2d(x)
+    alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+    out = np.full(x2.shape, np.nan)
+    prev = np.full(x2.shape[1], np.nan)
+    # Ciclo sul tempo soltanto: ogni passo aggiorna tutti i simboli insieme
+    for t in range(x2.shape[0]):
+        row = x2[t]
+        valid = ~np.isnan(row)
+        start = valid & np.isnan(prev)
+        prev = np.where(start, row, prev)
+        step = valid & ~start
+        prev = np.where(step, prev + alpha * (row - prev), prev)
+        out[t] = prev
+    return _restore(out, x)
+
+
+def returns(close):
+    """Rendimenti percentuali (il primo valore è NaN)"""
+    close = _as_2d(close)
+    out = np.full(close.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[1:] = close[1:] / close[:-1] - 1.0
+    return out
+
+
+def true_range(high, low, close):
+    """True Range: max(H-L, |H-C prec.|, |L-C prec.|)"""
+    high, low, close = _as_2d(high), _as_2d(low), _as_2d(close)
+    prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), close[:-1]])
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    tr = np.nanmax(np.where(np.isnan(ranges).all(axis=0), 0.0, ranges), axis=0)
+    return np.where(np.isnan(high - low), np.nan, tr)
+
+
+def _rsi_from_delta(delta, window):
+    # RSI con medie semplici di guadagni e perdite (come calculate_rsi)
+    gains = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    losses = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    avg_gain = _Rolling(gains).mean(window)
+    avg_loss = _Rolling(losses).mean(window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+def _bands(close_roll, mid, window, k):
+    std = close_roll.std(window, ddof=0)
+    return mid, mid + k * std, mid - k * std
+
+
+def rsi(close, window=14):
+    """RSI per colonna (medie semplici, come calculate_rsi)"""
+    x = _as_2d(close)
+    delta = np.vstack([np.full((1, x.shape[1]), np.nan), np.diff(x, axis=0)])
+    return _restore(_rsi_from_delta(delta, window), close)
+
+
+def bollinger_bands(close, window=20, k=2.0):
+    """Bande di Bollinger per colonna: (media, superiore, inferiore)"""
+    roll = _Rolling(close)
+    bands = _bands(roll, roll.mean(window), window, k)
+    return tuple(_restore(b, close) for b in bands)
+
+
+def compute_indicators(close, high=None, low=None, params=None):
+    """Calcola tutti gli indicatori in un solo passaggio, riusando i risultati intermedi.
+
+    close, high, low: array (T,) o (T, N). Restituisce un dizionario nome -> array.
+    """
+    p = dict(DEFAULT_PARAMS)
+    p.update(params or {})
+    one_d = np.ndim(close) == 1
+    close = _as_2d(close)
+    out = {}
+
+    # Intermedi condivisi
+    rets = returns(close)
+    close_roll = _Rolling(close)
+    delta = np.vstack([np.full((1, close.shape[1]), np.nan), np.diff(close, axis=0)])
+
+    out["returns"] = rets
+    out["volatility"] = _Rolling(rets).std(p["volatility_window"]) * np.sqrt(TRADING_DAYS)
+
+    for window in p["ma_windows"]:
+        out[f"MA_{window}"] = close_roll.mean(window)
+
+    out["RSI"] = _rsi_from_delta(delta, p["rsi_window"])
+
+    fast, slow, signal = p["macd"]
+    macd = ema(close, fast) - ema(close, slow)
+    out["MACD"] = macd
+    out["MACD_signal"] = ema(macd, signal)
+    out["MACD_hist"] = macd - out["MACD_signal"]
+
+    bb_window, bb_k = p["bollinger"]
+    bb_mid = out.get(f"MA_{bb_window}")
+    if bb_mid is None:
+        bb_mid = close_roll.mean(bb_window)
+    out["BB_middle"], out["BB_upper"], out["BB_lower"] = _bands(close_roll, bb_mid, bb_window, bb_k)
+
+    if high is not None and low is not None:
+        high, low = _as_2d(high), _as_2d(low)
+        k_window, d_window = p["stochastic"]
+        lowest = _sliding(low, k_window, np.min)
+        highest = _sliding(high, k_window, np.max)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stoch_k = (close - lowest) / (highest - lowest) * 100.0
+        out["STOCH_K"] = stoch_k
+        out["STOCH_D"] = _Rolling(stoch_k).mean(d_window)
+        out["ATR"] = _Rolling(true_range(high, low, close)).mean(p["atr_window"])
+
+    if one_d:
+        out = {name: values[:, 0] for name, values in out.items()}
+    return out
+
+
+def compute_from_ohlcv(ohlcv, params=None):
+    """Indicatori da un array OHLCV (T, 5) o (T, N, 5) con colonne Open, High, Low, Close, Volume"""
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    return compute_indicators(ohlcv[..., 3], ohlcv[..., 1], ohlcv[..., 2], params)
+
+
+def price_matrix(histories, field="Close"):
+    """Allinea le serie di più simboli in una matrice (date x simboli)"""
+    frame = pd.DataFrame({symbol: hist[field] for symbol, hist in histories.items()})
+    return frame.sort_index()
+
+
+def indicators_frame(hist, params=None):
+    """Indicatori per un singolo DataFrame di ticker.history()"""
+    values = compute_indicators(hist["Close"].to_numpy(), hist["High"].to_numpy(),
+                                hist["Low"].to_numpy(), params)
+    return pd.DataFrame(values, index=hist.index)
+
+
+def indicators_panel(close_frame, high_frame=None, low_frame=None, params=None):
+    """Indicatori per una matrice di prezzi: dizionario nome -> DataFrame (date x simboli)"""
+    high = None if high_frame is None else high_frame.to_numpy(dtype=np.float64)
+    low = None if low_frame is None else low_frame.to_numpy(dtype=np.float64)
+    values = compute_indicators(close_frame.to_numpy(dtype=np.float64), high, low, params)
+    return {
+        name: pd.DataFrame(array, index=close_frame.index, columns=close_frame.columns)
+        for name, array in values.items()
+    }
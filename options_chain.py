@@ -0,0 +1,134 @@
+# Caricamento in blocco delle chain di opzioni su tutte le scadenze
+# Le richieste (simbolo, scadenza) girano su un pool limitato; calls e puts vengono
+# unite in un'unica tabella colonnare indicizzata per (simbolo, scadenza, strike, tipo).
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CachedTicker
+from providers import get_provider
+
+CHAIN_WORKERS = 8
+KEY_COLUMNS = ["symbol", "expiry", "strike", "type"]
+
+# Tipi compatti per le colonne della chain
+COLUMN_DTYPES = {
+    "lastPrice": np.float32,
+    "bid": np.float32,
+    "ask": np.float32,
+    "change": np.float32,
+    "percentChange": np.float32,
+    "impliedVolatility": np.float32,
+    "volume": "UInt32",
+    "openInterest": "UInt32",
+    "inTheMoney": "boolean",
+    "contractSize": "category",
+    "currency": "category",
+}
+
+
+class _ProviderChains:
+    """Accesso diretto al provider, senza cache"""
+
+    def __init__(self, symbol, provider):
+        self.symbol = symbol
+        self.provider = provider
+
+    @property
+    def options(self):
+        return self.provider.options(self.symbol)
+
+    def option_chain(self, date=None):
+        return self.provider.option_chain(self.symbol, date)
+
+
+def _source(symbol, cache, provider):
+    if cache is not None:
+        return CachedTicker(symbol, cache, provider)
+    return _ProviderChains(symbol.strip().upper(), provider or get_provider())
+
+
+def _compact(frame, symbol, expiry, option_type):
+    frame = frame.copy()
+    for column, dtype in COLUMN_DTYPES.items():
+        if column not in frame:
+            continue
+        if dtype == "UInt32":
+            values = pd.to_numeric(frame[column], errors="coerce").round()
+            frame[column] = values.clip(lower=0).astype("UInt32")
+        else:
+            frame[column] = frame[column].astype(dtype)
+    frame["symbol"] = symbol
+    frame["expiry"] = pd.Timestamp(expiry)
+    frame["type"] = option_type
+    return frame
+
+
+def _fetch_expiry(source, expiry):
+    chain = source.option_chain(expiry)
+    frames = [
+        _compact(chain.calls, source.symbol, expiry, "call"),
+        _compact(chain.puts, source.symbol, expiry, "put"),
+    ]
+    return [f for f in frames if not f.empty]
+
+
+def load_chains(symbols, cache=None, provider=None, expirations=None, max_workers=CHAIN_WORKERS):
+    """Scarica in parallelo le chain di tutte le scadenze e le unisce in una tabella.
+
+    expirations: lista opzionale di scadenze da caricare (default tutte).
+    Gli errori per singola richiesta non interrompono il caricamento e sono
+    riportati in df.attrs["errors"] come lista di (simbolo, scadenza, messaggio).
+    """
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    sources = [_source(symbol, cache, provider) for symbol in symbols]
+    wanted = None if expirations is None else set(expirations)
+    frames = []
+    errors = []
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chain") as pool:
+        # Prima le date di scadenza di ogni simbolo, poi tutte le chain insieme
+        expiry_futures = {pool.submit(lambda s: s.options, source): source for source in sources}
+        chain_futures = {}
+        for future in as_completed(expiry_futures):
+            source = expiry_futures[future]
+            try:
+                dates = list(future.result() or ())
+            except Exception as e:
+                errors.append((source.symbol, None, str(e)))
+                continue
+            if wanted is not None:
+                dates = [d for d in dates if d in wanted]
+            for expiry in dates:
+                chain_futures[pool.submit(_fetch_expiry, source, expiry)] = (source.symbol, expiry)
+
+        for future in as_completed(chain_futures):
+            symbol, expiry = chain_futures[future]
+            try:
+                frames.extend(future.result())
+            except Exception as e:
+                errors.append((symbol, expiry, str(e)))
+
+    if not frames:
+        table = pd.DataFrame(columns=KEY_COLUMNS).set_index(KEY_COLUMNS)
+    else:
+        table = pd.concat(frames, ignore_index=True)
+        table["symbol"] = table["symbol"].astype("category")
+        table["type"] = pd.Categorical(table["type"], categories=["call", "put"])
+        for column in ("contractSize", "currency"):
+            if column in table:
+                table[column] = table[column].astype("category")
+        table = table.set_index(KEY_COLUMNS).sort_index()
+    table.attrs["errors"] = errors
+    return table
+
+
+def calls_puts(table, symbol=None):
+    """Divide la tabella unificata in (calls, puts), opzionalmente per un simbolo"""
+    if symbol is not None:
+        table = table.xs(symbol.strip().upper(), level="symbol", drop_level=False)
+    types = table.index.get_level_values("type")
+    return table[types == "call"], table[types == "put"]
@@ -0,0 +1,122 @@
+# Screener di liquidità e moneyness sulle chain di opzioni
+# Gli indici ordinati (moneyness, strike, volume, open interest, IV rank) si costruiscono
+# una volta per chain; ogni query usa la ricerca binaria invece di una scansione completa.
+
+import numpy as np
+import pandas as pd
+
+RANGE_KEYS = ("moneyness", "strike", "volume", "openInterest", "iv_rank")
+
+
+class _SortedIndex:
+    """Valori ordinati con le posizioni originali delle righe"""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.nonzero(np.isfinite(values))[0]
+        order = finite[np.argsort(values[finite], kind="stable")]
+        self.values = values
+        self.order = order
+        self.sorted = values[order]
+
+    def range(self, low=None, high=None):
+        """Righe con low <= valore <= high"""
+        a = 0 if low is None else int(np.searchsorted(self.sorted, low, "left"))
+        b = len(self.sorted) if high is None else int(np.searchsorted(self.sorted, high, "right"))
+        return self.order[a:b]
+
+
+class ChainScreener:
+    """Indici precalcolati su una chain per filtri ripetuti e veloci.
+
+    table: tabella di options_chain.load_chains (eventualmente arricchita da greeks.chain_greeks).
+    spot: prezzo del sottostante, scalare o dizionario simbolo -> prezzo (serve per la moneyness).
+    """
+
+    def __init__(self, table, spot=None, iv_column=None):
+        self.table = table
+        frame = table.reset_index()
+        self._symbol = frame["symbol"].astype(str).to_numpy() if "symbol" in frame else None
+        self._type = frame["type"].astype(str).to_numpy()
+        self._expiry = frame["expiry"].to_numpy(dtype="datetime64[ns]")
+
+        strike = frame["strike"].to_numpy(np.float64)
+        columns = {
+            "strike": strike,
+            "volume": _filled(frame, "volume"),
+            "openInterest": _filled(frame, "openInterest"),
+        }
+        if spot is not None:
+            if isinstance(spot, dict):
+                spots = pd.Series(self._symbol).map({k.upper(): v for k, v in spot.items()})
+                spots = spots.to_numpy(np.float64)
+            else:
+                spots = np.full(len(frame), float(spot))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                columns["moneyness"] = strike / spots
+        iv_column = iv_column or ("iv" if "iv" in frame else "impliedVolatility")
+        if iv_column in frame:
+            # IV rank 0-100 rispetto agli altri contratti dello stesso simbolo
+            groups = frame["symbol"] if "symbol" in frame else pd.Series(0, index=frame.index)
+            iv = pd.to_numeric(frame[iv_column], errors="coerce").astype(np.float64)
+            columns["iv_rank"] = (iv.groupby(groups.to_numpy()).rank(pct=True) * 100).to_numpy(np.float64)
+
+        self._indexes = {name: _SortedIndex(values) for name, values in columns.items()}
+
+    def query(self, moneyness=None, strike=None, min_volume=None, min_open_interest=None,
+              iv_rank=None, option_type=None, expiry=None, symbol=None):
+        """Filtra la chain; gli intervalli sono tuple (min, max) con None per estremo aperto"""
+        ranges = {}
+        if moneyness is not None:
+            ranges["moneyness"] = moneyness
+        if strike is not None:
+            ranges["strike"] = strike
+        if min_volume is not None:
+            ranges["volume"] = (min_volume, None)
+        if min_open_interest is not None:
+            ranges["openInterest"] = (min_open_interest, None)
+        if iv_rank is not None:
+            ranges["iv_rank"] = iv_rank
+        for name in ranges:
+            if name not in self._indexes:
+                raise ValueError(f"Indice non disponibile: {name}")
+
+        # La condizione più selettiva fornisce i candidati, le altre si verificano solo su quelli
+        candidates = None
+        if ranges:
+            slices = {name: self._indexes[name].range(*bounds) for name, bounds in ranges.items()}
+            driver = min(slices, key=lambda name: len(slices[name]))
+            candidates = np.sort(slices.pop(driver))
+            for name in slices:
+                low, high = ranges[name]
+                values = self._indexes[name].values[candidates]
+                keep = np.isfinite(values)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                candidates = candidates[keep]
+        else:
+            candidates = np.arange(len(self._type))
+
+        if option_type is not None:
+            candidates = candidates[self._type[candidates] == option_type]
+        if expiry is not None:
+            candidates = candidates[self._expiry[candidates] == np.datetime64(pd.Timestamp(expiry), "ns")]
+        if symbol is not None and self._symbol is not None:
+            candidates = candidates[self._symbol[candidates] == symbol.strip().upper()]
+        return self.table.iloc[candidates]
+
+    def near_money(self, band=0.05, **filters):
+        """Contratti entro +/- band dallo spot (es. 0.05 = 95%-105%)"""
+        return self.query(moneyness=(1.0 - band, 1.0 + band), **filters)
+
+    def liquid(self, min_volume=100, min_open_interest=None, **filters):
+        """Contratti con volume (e open interest) minimo"""
+        return self.query(min_volume=min_volume, min_open_interest=min_open_interest, **filters)
+
+
+def _filled(frame, column):
+    if column not in frame:
+        return np.zeros(len(frame))
+    return pd.to_numeric(frame[column], errors="coerce").astype(np.float64).fillna(0.0).to_numpy()
@@ -0,0 +1,334 @@
+# Motore di analisi di portafoglio su molti simboli
+# I prezzi aggiustati sono allineati in una matrice (date x simboli); covarianze e
+# correlazioni si ottengono da prodotti di matrici invece che da un ciclo per coppia.
+# I NaN (titoli quotati più tardi, giorni mancanti) sono gestiti a coppie come in pandas:
+# ogni elemento usa solo le date in cui entrambi i titoli hanno un rendimento.
+
+import numpy as np
+import pandas as pd
+
+from batch import download_prices
+from indicators import TRADING_DAYS, price_matrix, returns as simple_returns
+
+PORTFOLIO_PERIOD = "1y"
+VAR_LEVEL = 0.95
+# Dopo quanti aggiornamenti incrementali si ricalcolano le somme da zero (deriva numerica)
+RESYNC_STEPS = 1000
+
+
+def return_matrix(prices, log=False):
+    """Rendimenti (date x simboli) da una matrice di prezzi; la prima riga è NaN"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if not log:
+        return simple_returns(prices)
+    out = np.full(prices.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[1:] = np.log(prices[1:] / prices[:-1])
+    return out
+
+
+class _PairwiseMoments:
+    """Somme a coppie: conteggi, somme, quadrati e prodotti incrociati sulle date comuni"""
+
+    def __init__(self, n):
+        self.count = np.zeros((n, n))
+        self.sum = np.zeros((n, n))     # sum[i, j] = somma di x_i dove x_i e x_j sono validi
+        self.sumsq = np.zeros((n, n))   # sumsq[i, j] = somma di x_i^2 sulle stesse date
+        self.cross = np.zeros((n, n))   # cross[i, j] = somma di x_i * x_j
+
+    def add(self, x, sign=1.0):
+        """Aggiunge (sign=1) o toglie (sign=-1) righe (k x n); sign può valere riga per riga"""
+        x = np.atleast_2d(x)
+        valid = (~np.isnan(x)).astype(np.float64)
+        filled = np.where(valid > 0, x, 0.0)
+        signed = valid * np.reshape(sign, (-1, 1))
+        self.count += signed.T @ valid
+        self.sum += filled.T @ signed
+        self.sumsq += (filled * filled).T @ signed
+        self.cross += (filled * np.reshape(sign, (-1, 1))).T @ filled
+
+    def covariance(self, min_periods=2, ddof=1):
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.cross - self.sum * self.sum.T / n) / (n - ddof)
+        return np.where(n >= max(min_periods, ddof + 1), cov, np.nan)
+
+    def correlation(self, min_periods=2):
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            num = self.cross - self.sum * self.sum.T / n
+            var_i = self.sumsq - self.sum * self.sum / n
+            corr = num / np.sqrt(np.maximum(var_i, 0.0) * np.maximum(var_i.T, 0.0))
+        corr = np.clip(corr, -1.0, 1.0)
+        return np.where(n >= max(min_periods, 2), corr, np.nan)
+
+
+def covariance(returns, min_periods=2):
+    """Matrice di covarianza a coppie (come DataFrame.cov) con un solo prodotto di matrici"""
+    moments = _PairwiseMoments(np.shape(returns)[1])
+    moments.add(np.asarray(returns, dtype=np.float64))
+    return moments.covariance(min_periods)
+
+
+def correlation(returns, min_periods=2):
+    """Matrice di correlazione a coppie (come DataFrame.corr)"""
+    moments = _PairwiseMoments(np.shape(returns)[1])
+    moments.add(np.asarray(returns, dtype=np.float64))
+    return moments.correlation(min_periods)
+
+
+class RollingCovariance:
+    """Covarianza e correlazione su una finestra mobile, aggiornate in O(n^2) per nuova riga.
+
+    Ogni update() aggiunge la riga entrante e toglie quella uscente dalle somme a coppie,
+    senza ricalcolare la finestra; ogni RESYNC_STEPS aggiornamenti le somme si ricostruiscono.
+    """
+
+    def __init__(self, n_assets, window, min_periods=None, resync=RESYNC_STEPS):
+        self.n = n_assets
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.resync = resync
+        self._rows = np.full((window, n_assets), np.nan)  # buffer circolare
+        self._pos = 0
+        self._filled = 0
+        self._steps = 0
+        self._moments = _PairwiseMoments(n_assets)
+
+    @classmethod
+    def from_returns(cls, returns, window, min_periods=None):
+        """Inizializza con le ultime `window` righe della matrice dei rendimenti"""
+        returns = np.asarray(returns, dtype=np.float64)
+        rolling = cls(returns.shape[1], window, min_periods)
+        tail = returns[-window:]
+        rolling._rows[:len(tail)] = tail
+        rolling._pos = len(tail) % window
+        rolling._filled = len(tail)
+        rolling._moments.add(tail)
+        return rolling
+
+    def update(self, row):
+        """Aggiunge una riga di rendimenti (NaN ammessi); restituisce self"""
+        row = np.asarray(row, dtype=np.float64).reshape(1, self.n)
+        if self._filled == self.window:
+            # Riga entrante e uscente in un solo aggiornamento di rango 2
+            self._moments.add(np.vstack([row, self._rows[self._pos]]), sign=(1.0, -1.0))
+        else:
+            self._filled += 1
+            self._moments.add(row)
+        self._rows[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+        self._steps += 1
+        if self._steps >= self.resync:
+            self._rebuild()
+        return self
+
+    def _rebuild(self):
+        self._moments = _PairwiseMoments(self.n)
+        self._moments.add(self.rows())
+        self._steps = 0
+
+    def rows(self):
+        """Righe della finestra in ordine cronologico"""
+        if self._filled < self.window:
+            return self._rows[:self._filled]
+        return np.roll(self._rows, -self._pos, axis=0)
+
+    def covariance(self):
+        return self._moments.covariance(self.min_periods)
+
+    def correlation(self):
+        return self._moments.correlation(self.min_periods)
+
+
+def rolling_covariance(returns, window, min_periods=None, step=1, correlation=False):
+    """Generatore di (indice riga, matrice) per ogni `step` righe, con aggiornamento incrementale"""
+    returns = np.asarray(returns, dtype=np.float64)
+    rolling = RollingCovariance(returns.shape[1], window, min_periods)
+    for t in range(returns.shape[0]):
+        rolling.update(returns[t])
+        if (t + 1) >= window and (t + 1 - window) % step == 0:
+            yield t, rolling.correlation() if correlation else rolling.covariance()
+
+
+def portfolio_volatility(weights, cov, annualize=True):
+    """Volatilità sqrt(w' S w); weights può essere (n,) o (portafogli x n).
+
+    NaN se una coppia di titoli con peso non nullo non ha covarianza (nessuna data comune):
+    trattarla come zero sottostimerebbe il rischio.
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    missing = np.isnan(cov)
+    var = np.einsum("...i,ij,...j->...", w, np.where(missing, 0.0, cov), w)
+    held = (w != 0).astype(np.float64)
+    unknown = np.einsum("...i,ij,...j->...", held, missing.astype(np.float64), held) > 0
+    vol = np.where(unknown, np.nan, np.sqrt(np.maximum(var, 0.0)))
+    return vol * np.sqrt(TRADING_DAYS) if annualize else vol
+
+
+def portfolio_returns(returns, weights):
+    """Rendimenti del portafoglio; i pesi dei titoli senza dato del giorno sono ridistribuiti"""
+    r = np.asarray(returns, dtype=np.float64)
+    w = np.asarray(weights, dtype=np.float64)
+    valid = ~np.isnan(r)
+    active = valid @ np.abs(w) if w.ndim == 1 else valid @ np.abs(w).T
+    total = np.abs(w).sum(axis=-1)
+    out = np.nan_to_num(r) @ (w if w.ndim == 1 else w.T)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = out * total / active
+    return np.where(active > 0, out, np.nan)
+
+
+def beta(returns, benchmark, window=None, min_periods=2):
+    """Beta di ogni colonna rispetto al benchmark: cov(r, b) / var(b) sulle date comuni.
+
+    Con window restituisce la beta mobile (date x simboli) calcolata da somme cumulative.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    r = r[:, None] if r.ndim == 1 else r
+    b = np.asarray(benchmark, dtype=np.float64).reshape(-1, 1)
+    valid = ~np.isnan(r) & ~np.isnan(b)
+    rv = np.where(valid, r, 0.0)
+    bv = np.where(valid, b, 0.0)
+    terms = np.stack([valid.astype(np.float64), rv, bv, rv * bv, bv * bv])
+
+    if window is None:
+        n, sr, sb, srb, sbb = terms.sum(axis=1)
+        min_periods = max(min_periods, 2)
+    else:
+        c = np.zeros((terms.shape[0], terms.shape[1] + 1, terms.shape[2]))
+        np.cumsum(terms, axis=1, out=c[:, 1:])
+        sums = np.full(terms.shape, np.nan)
+        if window <= terms.shape[1]:
+            sums[:, window - 1:] = c[:, window:] - c[:, :-window]
+        n, sr, sb, srb, sbb = sums
+        min_periods = window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = srb - sr * sb / n
+        var = sbb - sb * sb / n
+        out = cov / var
+    return np.where(n >= min_periods, out, np.nan)
+
+
+def historical_var(returns, level=VAR_LEVEL):
+    """Value at Risk storico come perdita positiva, per colonna (NaN ignorati)"""
+    r = np.asarray(returns, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return -np.nanquantile(r, 1.0 - level, axis=0)
+
+
+def historical_cvar(returns, level=VAR_LEVEL):
+    """Expected Shortfall storico: perdita media oltre il VaR, per colonna"""
+    r = np.asarray(returns, dtype=np.float64)
+    threshold = -historical_var(r, level)
+    tail = r <= threshold  # NaN -> False
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return -(np.where(tail, r, 0.0).sum(axis=0) / tail.sum(axis=0))
+
+
+class Portfolio:
+    """Prezzi aggiustati allineati con rendimenti e misure di rischio vettorizzate"""
+
+    def __init__(self, prices, log_returns=False):
+        prices = prices.sort_index()
+        self.symbols = list(prices.columns)
+        self.dates = prices.index
+        self.prices = prices.to_numpy(np.float64)
+        self.returns = return_matrix(self.prices, log_returns)
+
+    @classmethod
+    def from_histories(cls, histories, field=None, log_returns=False):
+        """Da {simbolo: DataFrame OHLCV}; usa 'Adj Close' se presente, altrimenti 'Close'"""
+        histories = {s: h for s, h in histories.items() if h is not None and not h.empty}
+        if field is None:
+            field = "Adj Close" if all("Adj Close" in h for h in histories.values()) else "Close"
+        return cls(price_matrix(histories, field), log_returns)
+
+    def _frame(self, matrix):
+        return pd.DataFrame(matrix, index=self.symbols, columns=self.symbols)
+
+    def covariance(self, window=None, annualize=False):
+        """Covarianza a coppie su tutto il periodo o sulle ultime `window` sedute"""
+        r = self.returns if window is None else self.returns[-window:]
+        cov = covariance(r)
+        return self._frame(cov * TRADING_DAYS if annualize else cov)
+
+    def correlation(self, window=None):
+        r = self.returns if window is None else self.returns[-window:]
+        return self._frame(correlation(r))
+
+    def rolling(self, window, min_periods=None):
+        """RollingCovariance pronta per aggiornamenti incrementali con nuove sedute"""
+        return RollingCovariance.from_returns(self.returns, window, min_periods)
+
+    def volatility(self, window=None):
+        """Volatilità annualizzata per simbolo"""
+        r = self.returns if window is None else self.returns[-window:]
+        with np.errstate(invalid="ignore"):
+            vol = np.nanstd(r, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        return pd.Series(vol, index=self.symbols, name="volatility")
+
+    def weights(self, weights=None):
+        """Pesi come array allineato ai simboli (equipesati se None, dict ammesso)"""
+        if weights is None:
+            return np.full(len(self.symbols), 1.0 / len(self.symbols))
+        if isinstance(weights, dict):
+            return np.array([weights.get(s, 0.0) for s in self.symbols], dtype=np.float64)
+        return np.asarray(weights, dtype=np.float64)
+
+    def portfolio_returns(self, weights=None):
+        return pd.Series(portfolio_returns(self.returns, self.weights(weights)),
+                         index=self.dates, name="portfolio")
+
+    def portfolio_volatility(self, weights=None, window=None):
+        r = self.returns if window is None else self.returns[-window:]
+        return float(portfolio_volatility(self.weights(weights), covariance(r)))
+
+    def beta(self, benchmark, window=None):
+        """Beta rispetto a una serie di prezzi del benchmark (allineata per data)"""
+        bench = benchmark.reindex(self.dates).to_numpy(np.float64)
+        b = return_matrix(bench[:, None])[:, 0]
+        out = beta(self.returns, b, window)
+        if window is None:
+            return pd.Series(out, index=self.symbols, name="beta")
+        return pd.DataFrame(out, index=self.dates, columns=self.symbols)
+
+    def var(self, level=VAR_LEVEL, weights=None):
+        """VaR storico giornaliero per simbolo, o del portafoglio se si passano i pesi"""
+        if weights is not None:
+            return float(historical_var(self.portfolio_returns(weights).to_numpy(), level))
+        return pd.Series(historical_var(self.returns, level), index=self.symbols, name="VaR")
+
+    def cvar(self, level=VAR_LEVEL, weights=None):
+        if weights is not None:
+            return float(historical_cvar(self.portfolio_returns(weights).to_numpy(), level))
+        return pd.Series(historical_cvar(self.returns, level), index=self.symbols, name="CVaR")
+
+    def risk_report(self, weights=None, benchmark=None, level=VAR_LEVEL):
+        """Tabella per simbolo (volatilità, VaR, CVaR, beta) più la riga del portafoglio"""
+        report = pd.DataFrame({
+            "volatility": self.volatility(),
+            "VaR": self.var(level),
+            "CVaR": self.cvar(level),
+        })
+        if benchmark is not None:
+            report["beta"] = self.beta(benchmark)
+        w = self.weights(weights)
+        row = {
+            "volatility": self.portfolio_volatility(w),
+            "VaR": self.var(level, w),
+            "CVaR": self.cvar(level, w),
+        }
+        if benchmark is not None:
+            bench = benchmark.reindex(self.dates).to_numpy(np.float64)
+            b = return_matrix(bench[:, None])[:, 0]
+            row["beta"] = float(beta(self.portfolio_returns(w).to_numpy(), b)[0])
+        report.loc["PORTAFOGLIO"] = row
+        return report
+
+
+def load_portfolio(symbols, cache, period=PORTFOLIO_PERIOD, provider=None, log_returns=False):
+    """Scarica la storia di tutti i simboli con un download batch e costruisce il Portfolio"""
+    histories = download_prices(symbols, cache, period=period, provider=provider)
+    return Portfolio.from_histories(histories, log_returns=log_returns)
@@ -0,0 +1,288 @@
+# Archivio locale dei prezzi storici (OHLCV) per simbolo e intervallo
+# Colonne in file binari letti con memory map; si scarica e si scrive solo la coda mancante.
+#
+# Struttura su disco:
+#   <root>/<intervallo>/<SIMBOLO>/meta.json
+#   <root>/<intervallo>/<SIMBOLO>/<colonna>.bin
+
+import datetime
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from providers import get_provider
+
+COLUMNS = {
+    "ts": np.int64,  # nanosecondi UTC
+    "Open": np.float64,
+    "High": np.float64,
+    "Low": np.float64,
+    "Close": np.float64,
+    "Volume": np.float64,
+}
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+INITIAL_PERIOD = "5y"
+# Yahoo limita la profondità dei dati intraday: storia iniziale massima per intervallo
+INTRADAY_PERIODS = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "90m": "60d",
+    "60m": "730d",
+    "1h": "730d",
+}
+
+# Durata di una barra in secondi: una barra più recente non può esistere prima della fine
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "90m": 5400,
+    "1h": 3600,
+    "1d": 86400,
+    "5d": 5 * 86400,
+    "1wk": 7 * 86400,
+    "1mo": 31 * 86400,
+    "3mo": 92 * 86400,
+}
+# Intervallo minimo tra due aggiornamenti della barra parziale (al più la durata della barra)
+REFRESH_AGE = 5 * 60
+
+_DATE_ONLY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def initial_period(interval):
+    """Periodo del primo download per un intervallo (INITIAL_PERIOD per 1d e oltre)"""
+    return INTRADAY_PERIODS.get(interval, INITIAL_PERIOD)
+
+
+def provider_history(symbol, interval, start=None, period=None):
+    """Fetch predefinito: history() del provider attivo"""
+    provider = get_provider()
+    if start is not None:
+        return provider.history(symbol, start=start, interval=interval)
+    return provider.history(symbol, period=period or initial_period(interval), interval=interval)
+
+
+class PriceStore:
+    """Archivio OHLCV su disco con aggiornamento incrementale della coda"""
+
+    def __init__(self, root, fetch=provider_history, initial_period=None, refresh_age=REFRESH_AGE):
+        self.root = root
+        self.fetch = fetch
+        self.initial_period = initial_period  # None: periodo per intervallo, vedi initial_period()
+        self.refresh_age = refresh_age
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # --- Percorsi e metadati ---
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol.strip().upper())
+
+    def _lock(self, symbol, interval):
+        key = (symbol.strip().upper(), interval)
+        with self._locks_guard:
+            # Rientrante: refresh() tiene il lock mentre chiama append()
+            return self._locks.setdefault(key, threading.RLock())
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"count": 0, "tz": None}
+
+    def _write_meta(self, path, meta):
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    def timezone(self, symbol, interval="1d"):
+        """Fuso orario della borsa registrato con le barre (None se assente)"""
+        return self._read_meta(self._dir(symbol, interval)).get("tz")
+
+    def count(self, symbol, interval="1d"):
+        """Numero di barre salvate"""
+        return self._read_meta(self._dir(symbol, interval))["count"]
+
+    # --- Lettura ---
+
+    def columns(self, symbol, interval="1d", start=None, end=None):
+        """Colonne come viste memory-mapped (senza copia), filtrate per intervallo di date"""
+        path = self._dir(symbol, interval)
+        meta = self._read_meta(path)
+        n = meta["count"]
+        if n == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        cols = {
+            name: np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(n,))
+            for name, dtype in COLUMNS.items()
+        }
+        # Range query con ricerca binaria sui timestamp ordinati
+        tz = meta.get("tz")
+        lo = 0 if start is None else int(np.searchsorted(cols["ts"], to_utc_ns(start, tz), "left"))
+        hi = n if end is None else int(np.searchsorted(cols["ts"], to_utc_ns(end, tz, end=True), "right"))
+        return {name: col[lo:hi] for name, col in cols.items()}
+
+    def load(self, symbol, interval="1d", start=None, end=None):
+        """DataFrame OHLCV con indice temporale, come ticker.history()"""
+        cols = self.columns(symbol, interval, start, end)
+        meta = self._read_meta(self._dir(symbol, interval))
+        index = pd.DatetimeIndex(np.array(cols["ts"]).view("datetime64[ns]"), name="Date")
+        index = index.tz_localize("UTC")
+        if meta.get("tz"):
+            index = index.tz_convert(meta["tz"])
+        return pd.DataFrame({name: np.array(cols[name]) for name in PRICE_COLUMNS}, index=index)
+
+    def last_timestamp(self, symbol, interval="1d"):
+        """Timestamp dell'ultima barra salvata (None se vuoto)"""
+        ts = self.columns(symbol, interval)["ts"]
+        return pd.Timestamp(int(ts[-1]), tz="UTC") if len(ts) else None
+
+    def stale(self, symbol, interval="1d", now=None):
+        """True se la coda salvata va riscaricata.
+
+        Finché l'ultima barra è quella della seduta in corso può cambiare solo la barra
+        parziale, riletta al più ogni refresh_age secondi; appena può esistere una barra
+        nuova (fine del periodo dell'ultima) si riscarica subito, una volta.
+        """
+        meta = self._read_meta(self._dir(symbol, interval))
+        refreshed = meta.get("refreshed")
+        if refreshed is None:
+            return True
+        now = time.time() if now is None else now
+        width = INTERVAL_SECONDS.get(interval, 86400)
+        last = self.last_timestamp(symbol, interval)
+        if last is not None and refreshed < last.value / 1e9 + width <= now:
+            return True
+        return now - refreshed >= min(self.refresh_age, width)
+
+    # --- Scrittura ---
+
+    def append(self, symbol, interval, hist):
+        """Aggiunge barre; quelle con timestamp già presente (ultima barra parziale) vengono sostituite.
+
+        Le barre dopo l'ultima salvata si scrivono in coda senza toccare i dati esistenti;
+        un blocco che si sovrappone allo storico viene unito riscrivendo le colonne in file
+        temporanei sostituiti con os.replace, così le viste memory-mapped aperte restano valide.
+        """
+        if hist is None or hist.empty:
+            return 0
+        path = self._dir(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        hist = hist[~hist.index.duplicated(keep="last")].sort_index()
+        ts = _utc_index(hist.index).as_unit("ns").asi8
+        values = {
+            name: ts if name == "ts" else (
+                hist[name].to_numpy(dtype=dtype) if name in hist else np.full(len(hist), np.nan))
+            for name, dtype in COLUMNS.items()
+        }
+
+        with self._lock(symbol, interval):
+            meta = self._read_meta(path)
+            n = meta["count"]
+            stored = self.columns(symbol, interval) if n else None
+            if n == 0 or ts[0] >= stored["ts"][-1]:
+                # Coda: si sovrascrive al più l'ultima barra (parziale) con lo stesso timestamp
+                keep = n - 1 if n and ts[0] == stored["ts"][-1] else n
+                for name, dtype in COLUMNS.items():
+                    self._write_at(path, name, dtype, keep, values[name])
+                meta["count"] = keep + len(ts)
+            else:
+                merged = self._merge(stored, values)
+                for name, dtype in COLUMNS.items():
+                    self._replace_column(path, name, dtype, merged[name])
+                meta["count"] = len(merged["ts"])
+            del stored
+
+            if meta.get("tz") is None and hist.index.tz is not None:
+                meta["tz"] = str(hist.index.tz)
+            self._write_meta(path, meta)
+        return len(ts)
+
+    @staticmethod
+    def _merge(stored, values):
+        # Unione ordinata per timestamp; a parità vincono le barre nuove
+        combined = {name: np.concatenate([np.asarray(stored[name]), values[name]]) for name in COLUMNS}
+        order = np.argsort(combined["ts"], kind="stable")
+        ts = combined["ts"][order]
+        last = np.append(ts[1:] != ts[:-1], True)
+        return {name: col[order][last] for name, col in combined.items()}
+
+    @staticmethod
+    def _write_at(path, name, dtype, position, values):
+        # Scrittura oltre i dati letti dai lettori: nessun troncamento dei file mappati
+        file_path = os.path.join(path, f"{name}.bin")
+        with open(file_path, "r+b" if os.path.exists(file_path) else "wb") as f:
+            f.seek(position * np.dtype(dtype).itemsize)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+    @staticmethod
+    def _replace_column(path, name, dtype, values):
+        file_path = os.path.join(path, f"{name}.bin")
+        tmp = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        os.replace(tmp, file_path)
+
+    def refresh(self, symbol, interval="1d"):
+        """Scarica solo le barre mancanti dall'ultima salvata (storia iniziale se vuoto)"""
+        with self._lock(symbol, interval):
+            started = time.time()
+            last = self.last_timestamp(symbol, interval)
+            if last is None:
+                hist = self.fetch(symbol, interval, period=self.initial_period or initial_period(interval))
+            else:
+                # Si riparte dall'ultima barra: se era parziale viene aggiornata
+                hist = self.fetch(symbol, interval, start=last)
+                if hist is not None and not hist.empty:
+                    hist = hist[_utc_index(hist.index) >= last]
+            count = self.append(symbol, interval, hist)
+            # Istante del controllo, anche senza barre nuove: stale() evita il giro di rete
+            path = self._dir(symbol, interval)
+            os.makedirs(path, exist_ok=True)
+            meta = self._read_meta(path)
+            meta["refreshed"] = started
+            self._write_meta(path, meta)
+            return count
+
+    def history(self, symbol, interval="1d", start=None, end=None, refresh=True):
+        """Storia dal disco, aggiornata prima con la sola coda mancante se non è recente"""
+        if refresh and self.stale(symbol, interval):
+            self.refresh(symbol, interval)
+        return self.load(symbol, interval, start, end)
+
+
+def _utc_index(index):
+    return index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+
+def to_utc_ns(value, tz=None, end=False):
+    """Limite di un intervallo di date in ns UTC.
+
+    Le date senza fuso sono nell'ora della borsa (`tz`, UTC se assente); con end=True una
+    data senza orario ("2023-12-29" o datetime.date) comprende tutta la giornata, come .loc.
+    """
+    date_only = (isinstance(value, str) and _DATE_ONLY.match(value.strip())) or (
+        isinstance(value, datetime.date) and not isinstance(value, datetime.datetime))
+    ts = pd.Timestamp(value)
+    if end and date_only:
+        # Mezzanotte del giorno dopo (nell'ora locale, anche nei giorni di cambio ora) - 1 ns
+        ts = ts.tz_localize(None) + pd.Timedelta(days=1)
+        ts = ts.tz_localize(tz or "UTC") - pd.Timedelta(1, "ns")
+    elif ts.tzinfo is None:
+        ts = ts.tz_localize(tz or "UTC")
+    return ts.tz_convert("UTC").as_unit("ns").value
@@ -0,0 +1,320 @@
+# Provider di dati - interfaccia comune con implementazione yfinance e fixture offline
+# Il provider attivo si sceglie con set_provider() oppure con variabili d'ambiente:
+#   GUIDA_FIXTURES_DIR      replay delle risposte salvate su disco (nessuna rete)
+#   GUIDA_FIXTURES_LATENCY  latenza simulata in secondi per ogni richiesta
+#   GUIDA_RECORD_DIR        registra le risposte di yfinance come fixture
+#   GUIDA_RATE_LIMIT        richieste al secondo verso yfinance (default scheduler.DEFAULT_RATE)
+
+import hashlib
+import os
+import pickle
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import pandas as pd
+import yfinance as yf
+
+from scheduler import DEFAULT_RATE, RequestScheduler
+
+STATEMENTS = (
+    "financials",
+    "quarterly_financials",
+    "balance_sheet",
+    "quarterly_balance_sheet",
+    "cashflow",
+    "quarterly_cashflow",
+)
+
+
+class FixtureMissing(LookupError):
+    """Nessuna risposta registrata per la richiesta"""
+
+
+class DataProvider(ABC):
+    """Interfaccia per l'accesso ai dati di mercato"""
+
+    name = "base"
+
+    @abstractmethod
+    def info(self, symbol):
+        """Dizionario ticker.info"""
+
+    @abstractmethod
+    def history(self, symbol, **params):
+        """DataFrame OHLCV come ticker.history(**params)"""
+
+    @abstractmethod
+    def options(self, symbol):
+        """Tupla delle date di scadenza"""
+
+    @abstractmethod
+    def option_chain(self, symbol, date=None):
+        """Chain con attributi calls e puts"""
+
+    @abstractmethod
+    def statement(self, symbol, name):
+        """Bilancio per nome (vedi STATEMENTS)"""
+
+    @abstractmethod
+    def dividends(self, symbol):
+        """Serie storica dei dividendi"""
+
+    @abstractmethod
+    def splits(self, symbol):
+        """Serie storica degli split"""
+
+    def download(self, symbols, **params):
+        """Storia di più simboli: dizionario simbolo -> DataFrame (vuoto se non disponibile)"""
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self.history(symbol, **params)
+            except Exception:
+                # Come yf.download: un simbolo mancante non blocca gli altri
+                frames[symbol] = pd.DataFrame()
+        return frames
+
+
+class YFinanceProvider(DataProvider):
+    """Provider che interroga Yahoo Finance tramite yfinance"""
+
+    name = "yfinance"
+
+    def ticker(self, symbol):
+        # Un Ticker nuovo per chiamata: yf.Ticker conserva info, scadenze e bilanci già
+        # scaricati, e riusarlo farebbe rileggere dati vecchi dopo la scadenza del TTL
+        return yf.Ticker(symbol.strip().upper())
+
+    def info(self, symbol):
+        return self.ticker(symbol).info
+
+    def history(self, symbol, **params):
+        return self.ticker(symbol).history(**params)
+
+    def options(self, symbol):
+        return self.ticker(symbol).options
+
+    def option_chain(self, symbol, date=None):
+        return self.ticker(symbol).option_chain(date)
+
+    def statement(self, symbol, name):
+        if name not in STATEMENTS:
+            raise ValueError(f"Bilancio sconosciuto: {name}")
+        return getattr(self.ticker(symbol), name)
+
+    def dividends(self, symbol):
+        return self.ticker(symbol).dividends
+
+    def splits(self, symbol):
+        return self.ticker(symbol).splits
+
+    def download(self, symbols, **params):
+        """Un solo download batch per tutti i simboli"""
+        symbols = list(symbols)
+        data = yf.download(symbols, group_by="ticker", threads=True, progress=False, **params)
+        frames = {}
+        if data is None or data.empty:
+            return {symbol: pd.DataFrame() for symbol in symbols}
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for symbol in symbols:
+                if symbol in available:
+                    frames[symbol] = data[symbol].dropna(how="all")
+        elif len(symbols) == 1:
+            frames[symbols[0]] = data.dropna(how="all")
+        return {symbol: frames.get(symbol, pd.DataFrame()) for symbol in symbols}
+
+
+def fixture_path(root, symbol, endpoint, params=None):
+    """Percorso della fixture per (simbolo, endpoint, parametri)"""
+    name = endpoint
+    if params:
+        items = tuple(sorted(params.items()))
+        name += "-" + hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(root, symbol.strip().upper(), f"{name}.pkl")
+
+
+class FixtureProvider(DataProvider):
+    """Replay di risposte registrate su disco, con latenza simulata configurabile"""
+
+    name = "fixture"
+
+    def __init__(self, root, latency=0.0, jitter=0.0, endpoint_latency=None, seed=None):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.endpoint_latency = endpoint_latency or {}
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _sleep(self, endpoint):
+        delay = self.endpoint_latency.get(endpoint, self.latency)
+        if self.jitter:
+            with self._random_lock:
+                delay += self._random.uniform(0.0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _load(self, symbol, endpoint, params=None):
+        self._sleep(endpoint)
+        path = fixture_path(self.root, symbol, endpoint, params)
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            raise FixtureMissing(f"{symbol} {endpoint} {params or ''}".strip()) from None
+
+    def info(self, symbol):
+        return self._load(symbol, "info")
+
+    def history(self, symbol, **params):
+        return self._load(symbol, "history", params)
+
+    def options(self, symbol):
+        return self._load(symbol, "options")
+
+    def option_chain(self, symbol, date=None):
+        return self._load(symbol, "option_chain", {"date": date})
+
+    def statement(self, symbol, name):
+        return self._load(symbol, name)
+
+    def dividends(self, symbol):
+        return self._load(symbol, "dividends")
+
+    def splits(self, symbol):
+        return self._load(symbol, "splits")
+
+    def download(self, symbols, **params):
+        # Le risposte di yf.download hanno una forma diversa da history(): fixture separate
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self._load(symbol, "download", params)
+            except FixtureMissing:
+                frames[symbol] = pd.DataFrame()
+        return frames
+
+
+class RecordingProvider(DataProvider):
+    """Inoltra le richieste a un altro provider e salva le risposte come fixture"""
+
+    def __init__(self, inner, root):
+        self.inner = inner
+        self.root = root
+        self.name = f"recording({inner.name})"
+
+    def _record(self, symbol, endpoint, value, params=None):
+        path = fixture_path(self.root, symbol, endpoint, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return value
+
+    def info(self, symbol):
+        return self._record(symbol, "info", self.inner.info(symbol))
+
+    def history(self, symbol, **params):
+        return self._record(symbol, "history", self.inner.history(symbol, **params), params)
+
+    def options(self, symbol):
+        return self._record(symbol, "options", tuple(self.inner.options(symbol)))
+
+    def option_chain(self, symbol, date=None):
+        chain = self.inner.option_chain(symbol, date)
+        return self._record(symbol, "option_chain", chain, {"date": date})
+
+    def statement(self, symbol, name):
+        return self._record(symbol, name, self.inner.statement(symbol, name))
+
+    def dividends(self, symbol):
+        return self._record(symbol, "dividends", self.inner.dividends(symbol))
+
+    def splits(self, symbol):
+        return self._record(symbol, "splits", self.inner.splits(symbol))
+
+    def download(self, symbols, **params):
+        frames = self.inner.download(symbols, **params)
+        for symbol, hist in frames.items():
+            self._record(symbol, "download", hist, params)
+        return frames
+
+
+class ScheduledProvider(DataProvider):
+    """Fa passare ogni richiesta dallo scheduler (rate limit, retry, coalescenza)"""
+
+    def __init__(self, inner, scheduler=None):
+        self.inner = inner
+        self.scheduler = scheduler or RequestScheduler()
+        self.name = f"scheduled({inner.name})"
+
+    def _call(self, endpoint, symbol, fn, *args, **params):
+        key = (endpoint, symbol.strip().upper(), args, tuple(sorted(params.items())))
+        return self.scheduler.call(key, lambda: fn(symbol, *args, **params))
+
+    def info(self, symbol):
+        return self._call("info", symbol, self.inner.info)
+
+    def history(self, symbol, **params):
+        return self._call("history", symbol, self.inner.history, **params)
+
+    def options(self, symbol):
+        return self._call("options", symbol, self.inner.options)
+
+    def option_chain(self, symbol, date=None):
+        return self._call("option_chain", symbol, self.inner.option_chain, date)
+
+    def statement(self, symbol, name):
+        return self._call(name, symbol, self.inner.statement, name)
+
+    def dividends(self, symbol):
+        return self._call("dividends", symbol, self.inner.dividends)
+
+    def splits(self, symbol):
+        return self._call("splits", symbol, self.inner.splits)
+
+    def download(self, symbols, **params):
+        # Il download batch conta come una richiesta per simbolo nel token bucket
+        symbols = list(symbols)
+        key = ("download", tuple(symbols), tuple(sorted(params.items())))
+        return self.scheduler.call(key, lambda: self.inner.download(symbols, **params),
+                                   cost=max(1, len(symbols)))
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def provider_from_env(environ=None):
+    """Crea il provider indicato dalle variabili d'ambiente (yfinance se nessuna)"""
+    environ = os.environ if environ is None else environ
+    fixtures = environ.get("GUIDA_FIXTURES_DIR")
+    if fixtures:
+        latency = float(environ.get("GUIDA_FIXTURES_LATENCY", "0") or 0)
+        return FixtureProvider(fixtures, latency=latency)
+    rate = float(environ.get("GUIDA_RATE_LIMIT", "0") or DEFAULT_RATE)
+    provider = ScheduledProvider(YFinanceProvider(), RequestScheduler(rate=rate))
+    record = environ.get("GUIDA_RECORD_DIR")
+    if record:
+        provider = RecordingProvider(provider, record)
+    return provider
+
+
+def get_provider():
+    """Provider attivo per il processo"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_env()
+        return _provider
+
+
+def set_provider(provider):
+    """Sostituisce il provider attivo (per test e benchmark)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
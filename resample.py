@@ -0,0 +1,262 @@
+# Aggregazione multi-timeframe delle barre OHLCV
+# I timeframe più ampi (5m, 15m, 1h, 1d, 1wk, 1mo, 3mo) si costruiscono in locale da barre
+# più fini già salvate, senza un nuovo download: ogni barra di arrivo viene assegnata a un
+# bucket nell'ora locale della borsa e i bucket si riducono con kernel reduceat
+# (primo / massimo / minimo / ultimo / somma). Con MultiTimeframe i timeframe superiori
+# si aggiornano ricalcolando solo l'ultimo bucket quando arrivano nuove barre di base.
+
+import numpy as np
+import pandas as pd
+
+from bars import Bars
+
+_MINUTE = 60 * 1_000_000_000
+_DAY = 1440 * _MINUTE
+
+# Timeframe uniformi nell'ora locale: (ampiezza, origine) in ns dall'epoca.
+# Il 1970-01-01 era un giovedì: l'origine di 4 giorni fa iniziare le settimane di lunedì.
+TIMEFRAMES = {
+    "1m": (_MINUTE, 0),
+    "2m": (2 * _MINUTE, 0),
+    "5m": (5 * _MINUTE, 0),
+    "15m": (15 * _MINUTE, 0),
+    "30m": (30 * _MINUTE, 0),
+    "60m": (60 * _MINUTE, 0),
+    "90m": (90 * _MINUTE, 0),
+    "1h": (60 * _MINUTE, 0),
+    "1d": (_DAY, 0),
+    "5d": (5 * _DAY, 0),
+    "1wk": (7 * _DAY, 4 * _DAY),
+}
+# Timeframe di calendario: numero di mesi per bucket
+MONTHLY = {"1mo": 1, "3mo": 3}
+DEFAULT_TIMEFRAMES = ("5m", "15m", "1h", "1d", "1wk")
+
+
+def _spec(timeframe, offset=None):
+    """(ampiezza, origine) in ns, oppure ("M", mesi) per i timeframe mensili"""
+    if timeframe in MONTHLY:
+        return "M", MONTHLY[timeframe]
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Timeframe non supportato: {timeframe}")
+    step, origin = TIMEFRAMES[timeframe]
+    if offset is not None:
+        origin = pd.Timedelta(offset).value
+    return step, origin % step
+
+
+def _nests(fine, coarse):
+    """True se ogni confine di `coarse` è anche un confine di `fine`"""
+    if fine[0] == "M":
+        return coarse[0] == "M" and coarse[1] % fine[1] == 0
+    step, origin = fine
+    if coarse[0] == "M":
+        # I mesi iniziano a mezzanotte: basta che `fine` abbia un confine a ogni mezzanotte
+        return _DAY % step == 0 and origin == 0
+    return coarse[0] % step == 0 and (coarse[1] - origin) % step == 0
+
+
+def _local(ts, tz):
+    """Timestamp UTC (int64 ns) convertiti in ns nell'ora locale"""
+    if not tz or len(ts) == 0:
+        return ts
+    index = pd.DatetimeIndex(ts.view("datetime64[ns]"), copy=False).tz_localize("UTC")
+    return index.tz_convert(tz).tz_localize(None).asi8
+
+
+def bucket_keys(ts, tz, timeframe, offset=None):
+    """Chiave intera del bucket di ogni barra (non decrescente se ts è ordinato)"""
+    spec = _spec(timeframe, offset) if isinstance(timeframe, str) else timeframe
+    local = _local(ts, tz)
+    if spec[0] == "M":
+        months = local.view("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        return months // spec[1]
+    step, origin = spec
+    return (local - origin) // step
+
+
+def _labels(keys, spec, tz, fallback):
+    """Inizio di ogni bucket in ns UTC (la prima barra del bucket se l'ora locale è ambigua)"""
+    if spec[0] == "M":
+        local = (keys * spec[1]).astype("datetime64[M]").astype("datetime64[ns]")
+    else:
+        local = (keys * spec[0] + spec[1]).view("datetime64[ns]")
+    if not tz:
+        return np.asarray(local).view(np.int64)
+    index = pd.DatetimeIndex(local).tz_localize(tz, ambiguous="NaT", nonexistent="shift_forward")
+    labels = index.tz_convert("UTC").tz_localize(None).as_unit("ns").asi8.copy()
+    missing = index.isna()
+    labels[missing] = fallback[missing]
+    return labels
+
+
+def _reduce(bars, keys):
+    """Riduce le barre per bucket contigui: (inizi dei bucket, prezzi, volumi)"""
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+    ends = np.append(starts[1:], len(keys)) - 1
+    prices = np.empty((4, len(starts)), dtype=bars.prices.dtype)
+    prices[0] = bars.prices[0, starts]
+    prices[3] = bars.prices[3, ends]
+    if bars.fixed:
+        high, low = bars.prices[1], bars.prices[2]
+        missing = np.iinfo(high.dtype).min
+        prices[1] = np.maximum.reduceat(high, starts)
+        # Il valore mancante è il minimo dell'intero: per il minimo va escluso a parte
+        low = np.where(low == missing, np.iinfo(low.dtype).max, low)
+        reduced = np.minimum.reduceat(low, starts)
+        prices[2] = np.where(reduced == np.iinfo(low.dtype).max, missing, reduced)
+    else:
+        # fmax/fmin ignorano i NaN di barre incomplete
+        prices[1] = np.fmax.reduceat(bars.prices[1], starts)
+        prices[2] = np.fmin.reduceat(bars.prices[2], starts)
+    volume = np.add.reduceat(bars.volume.astype(np.uint64), starts)
+    return starts, prices, volume
+
+
+def _valid(bars):
+    """Barre con prezzo di chiusura presente"""
+    close = bars.prices[3]
+    if bars.fixed:
+        return close != np.iinfo(close.dtype).min
+    return ~np.isnan(close)
+
+
+def _compact(bars, mask):
+    if mask.all():
+        return bars
+    out = Bars.allocate(int(mask.sum()), bars.prices.dtype, bars.volume.dtype,
+                        bars.scale, bars.tz, bars.symbol)
+    out.ts[:] = bars.ts[mask]
+    out.prices[:] = bars.prices[:, mask]
+    out.volume[:] = bars.volume[mask]
+    return out
+
+
+def aggregate(bars, timeframe, offset=None):
+    """Barre di `timeframe` costruite da barre più fini.
+
+    offset sposta l'origine dei bucket intraday (es. "30min" per ore allineate
+    all'apertura delle 9:30, come le barre 1h di Yahoo).
+    """
+    spec = _spec(timeframe, offset) if isinstance(timeframe, str) else timeframe
+    bars = _compact(bars, _valid(bars))
+    if len(bars) == 0:
+        return Bars.allocate(0, bars.prices.dtype, bars.volume.dtype, bars.scale, bars.tz, bars.symbol)
+    keys = bucket_keys(bars.ts, bars.tz, spec)
+    starts, prices, volume = _reduce(bars, keys)
+    labels = _labels(keys[starts], spec, bars.tz, bars.ts[starts])
+    volume_dtype = np.uint64 if volume.size and volume.max() > np.iinfo(np.uint32).max else bars.volume.dtype
+    out = Bars.allocate(len(starts), bars.prices.dtype, volume_dtype, bars.scale, bars.tz, bars.symbol)
+    out.ts[:] = labels
+    out.prices[:] = prices
+    out.volume[:] = volume
+    return out
+
+
+def resample_frame(hist, timeframe, offset=None):
+    """Come aggregate() ma su un DataFrame di ticker.history()"""
+    return aggregate(Bars.from_frame(hist), timeframe, offset).to_frame(tz=True)
+
+
+class _Series:
+    """Barre di un timeframe in un buffer con capacità che raddoppia (append in coda)"""
+
+    def __init__(self, template, capacity=1024):
+        self.n = 0
+        self._meta = (template.prices.dtype, template.scale, template.tz, template.symbol)
+        self._data = self._allocate(capacity, template.volume.dtype)
+
+    def _allocate(self, capacity, volume_dtype):
+        price_dtype, scale, tz, symbol = self._meta
+        return Bars.allocate(capacity, price_dtype, volume_dtype, scale, tz, symbol)
+
+    @property
+    def bars(self):
+        return self._data[:self.n]
+
+    def replace_tail(self, start, new):
+        """Sostituisce le barre da `start` in poi con `new`"""
+        n = start + len(new)
+        volume_dtype = np.result_type(self._data.volume.dtype, new.volume.dtype)
+        if n > len(self._data) or volume_dtype != self._data.volume.dtype:
+            grown = self._allocate(max(n, 2 * len(self._data)), volume_dtype)
+            grown.ts[:start] = self._data.ts[:start]
+            grown.prices[:, :start] = self._data.prices[:, :start]
+            grown.volume[:start] = self._data.volume[:start]
+            self._data = grown
+        self._data.ts[start:n] = new.ts
+        self._data.prices[:, start:n] = new.prices
+        self._data.volume[start:n] = new.volume
+        self.n = n
+
+
+class MultiTimeframe:
+    """Barre di base e timeframe derivati, tenuti allineati ad ogni aggiornamento.
+
+    Ogni timeframe si costruisce dal timeframe più fine già presente i cui bucket vi si
+    annidano (es. 15m da 5m, 1wk da 1d), così le riduzioni lavorano su meno righe.
+    update() ricalcola solo dall'ultimo bucket di ogni timeframe in poi.
+    """
+
+    def __init__(self, base, timeframes=DEFAULT_TIMEFRAMES, offsets=None):
+        offsets = offsets or {}
+        self.specs = {tf: _spec(tf, offsets.get(tf)) for tf in timeframes}
+        self.base = _Series(base)
+        self.sources = {}
+        ordered = sorted(self.specs, key=lambda tf: self._width(self.specs[tf]))
+        for tf in ordered:
+            source = None
+            for finer in ordered:
+                if finer == tf or self._width(self.specs[finer]) >= self._width(self.specs[tf]):
+                    break
+                if _nests(self.specs[finer], self.specs[tf]):
+                    source = finer
+            self.sources[tf] = source
+        self.order = ordered
+        self.series = {tf: _Series(base) for tf in ordered}
+        self.update(base)
+
+    @staticmethod
+    def _width(spec):
+        return spec[1] * 31 * _DAY if spec[0] == "M" else spec[0]
+
+    def bars(self, timeframe=None):
+        """Barre di un timeframe (le barre di base con None), come viste sul buffer"""
+        return self.base.bars if timeframe is None else self.series[timeframe].bars
+
+    def frame(self, timeframe=None, tz=True):
+        return self.bars(timeframe).to_frame(tz)
+
+    def update(self, new):
+        """Aggiunge barre di base; quelle dal primo timestamp di `new` in poi vengono sostituite.
+
+        Restituisce {timeframe: numero di barre ricalcolate}.
+        """
+        if len(new) == 0:
+            return {}
+        start = self.base.bars.searchsorted(int(new.ts[0]))
+        self.base.replace_tail(start, new)
+        changed = {}
+        for tf in self.order:
+            source = self.sources[tf]
+            src = self.base.bars if source is None else self.series[source].bars
+            series = self.series[tf]
+            current = series.bars
+            # Ricalcolo dall'inizio del bucket che contiene la prima barra nuova
+            keep = current.searchsorted(int(new.ts[0]), "right") - 1
+            if keep < 0:
+                keep, pos = 0, 0
+            else:
+                pos = src.searchsorted(int(current.ts[keep]))
+            tail = aggregate(src[pos:], self.specs[tf])
+            series.replace_tail(keep, tail)
+            changed[tf] = len(tail)
+        return changed
+
+
+def from_store(store, symbol, interval="1m", start=None, end=None, scale=None):
+    """Barre di base lette da un PriceStore (le colonne memory-mapped vengono compattate)"""
+    cols = store.columns(symbol, interval, start, end)
+    return Bars.from_arrays(cols["ts"], cols["Open"], cols["High"], cols["Low"], cols["Close"],
+                            cols["Volume"], scale, store.timezone(symbol, interval),
+                            symbol.strip().upper())
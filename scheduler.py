@@ -0,0 +1,198 @@
+# Scheduler delle richieste verso Yahoo Finance
+# Tutte le chiamate passano da qui: token bucket per il ritmo, concorrenza adattiva AIMD
+# (cresce di 1 a ogni finestra di successi, si dimezza su throttling), retry con backoff
+# esponenziale e jitter, e coalescenza delle richieste identiche già in volo.
+
+import random
+import threading
+import time
+
+DEFAULT_RATE = 4.0  # richieste al secondo
+DEFAULT_BURST = 8
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+THROTTLE_COOLDOWN = 5.0
+
+_TRANSIENT_NAMES = ("Timeout", "ConnectionError", "ChunkedEncodingError", "ProxyError")
+
+
+def is_throttled(exc):
+    """True se l'errore indica un rate limit (YFRateLimitError, HTTP 429)"""
+    text = f"{type(exc).__name__} {exc}"
+    return "RateLimit" in text or "Too Many Requests" in text or " 429" in text
+
+
+def is_transient(exc):
+    """True per errori di rete che vale la pena ritentare"""
+    if is_throttled(exc) or isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    return any(name in type(exc).__name__ for name in _TRANSIENT_NAMES)
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `rate` token al secondo, al massimo `capacity` accumulati"""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # Durante una pausa non si accumulano token: alla ripresa niente raffica
+        elapsed = now - max(self._updated, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, cost=1.0):
+        """Attende finché ci sono token; un costo oltre la capacità lascia il bucket in debito"""
+        need = min(float(cost), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= need:
+                        self._tokens -= cost
+                        return
+                    wait = (need - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Sospende l'emissione di token (dopo un throttling)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveLimiter:
+    """Limite di concorrenza AIMD: +1 per finestra di successi, riduzione moltiplicativa su errore"""
+
+    def __init__(self, initial=DEFAULT_CONCURRENCY, minimum=1, maximum=MAX_CONCURRENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, outcome):
+        """Esito: "ok", "error" (decremento lieve), "throttled" (dimezza), "neutral" (invariato)"""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "ok":
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            elif outcome == "throttled":
+                self.limit = max(self.minimum, self.limit * 0.5)
+            elif outcome == "error":
+                self.limit = max(self.minimum, self.limit * 0.9)
+            self._cond.notify_all()
+
+
+class _InFlight:
+    """Richiesta in corso condivisa tra i chiamanti con la stessa chiave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class RequestScheduler:
+    """Esegue le chiamate rispettando rate, concorrenza adattiva, retry e coalescenza"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, concurrency=DEFAULT_CONCURRENCY,
+                 max_concurrency=MAX_CONCURRENCY, retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 backoff_max=BACKOFF_MAX, cooldown=THROTTLE_COOLDOWN, seed=None):
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(concurrency, 1, max_concurrency)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cooldown = cooldown
+        self._random = random.Random(seed)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {"richieste": 0, "coalescenti": 0, "retry": 0, "throttled": 0, "errori": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def call(self, key, fn, cost=1.0):
+        """Esegue fn() per la chiave; le chiamate identiche in volo condividono il risultato"""
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _InFlight()
+            else:
+                self.counters["coalescenti"] += 1
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = self._run(fn, cost)
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            pending.done.set()
+        return pending.value
+
+    def _run(self, fn, cost):
+        attempt = 0
+        while True:
+            self.bucket.acquire(cost)
+            self.limiter.acquire()
+            self._count("richieste")
+            try:
+                value = fn()
+            except Exception as e:
+                # Gli errori applicativi (simbolo inesistente...) non riducono la concorrenza
+                throttled, transient = is_throttled(e), is_transient(e)
+                self.limiter.release("throttled" if throttled else "error" if transient else "neutral")
+                if throttled:
+                    self._count("throttled")
+                    self.bucket.pause(self.cooldown)
+                if attempt >= self.retries or not transient:
+                    self._count("errori")
+                    raise
+                attempt += 1
+                self._count("retry")
+                time.sleep(self._backoff(attempt))
+                continue
+            self.limiter.release("ok")
+            return value
+
+    def _backoff(self, attempt):
+        # Full jitter: attesa casuale in [0, min(max, base * 2^attempt)]
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        with self._lock:
+            return self._random.uniform(0.0, ceiling)
+
+    def stats(self):
+        """Contatori e limite di concorrenza attuale"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["concorrenza"] = round(self.limiter.limit, 2)
+        stats["in_volo"] = self.limiter.in_flight
+        return stats
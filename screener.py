@@ -0,0 +1,208 @@
+# Screener trasversale sui campi di ticker.info
+# Uno snapshot colonnare dell'universo (un array NumPy per campo) supporta filtri composti
+# con maschere vettorizzate e classifiche top-N con argpartition; l'aggiornamento è
+# incrementale: si riscaricano solo i simboli mancanti o più vecchi di max_age.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CachedTicker
+from field_catalog import TABLES
+
+SCREENER_WORKERS = 8
+DEFAULT_MAX_AGE = 6 * 3600
+
+# Nomi del catalogo che non sono chiavi di ticker.info -> chiave reale
+INFO_KEYS = {
+    "52WeekLow": "fiftyTwoWeekLow",
+    "52WeekHigh": "fiftyTwoWeekHigh",
+}
+# Campi numerici documentati nella guida (ratios, trading, crescita, dividendi)
+NUMERIC_FIELDS = tuple(dict.fromkeys(
+    INFO_KEYS.get(row[0], row[0])
+    for name in ("valuation_ratios", "profitability_ratios", "liquidity_ratios",
+                 "trading_data", "technical_data", "growth_fields", "dividend_fields")
+    for row in TABLES[name].rows
+)) + ("currentPrice", "previousClose")
+CATEGORY_FIELDS = ("sector", "industry", "country", "currency")
+
+OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+class InfoSnapshot:
+    """Snapshot colonnare dei campi info per un universo di simboli"""
+
+    def __init__(self, numeric_fields=NUMERIC_FIELDS, category_fields=CATEGORY_FIELDS, capacity=1024):
+        self.numeric_fields = tuple(numeric_fields)
+        self.category_fields = tuple(category_fields)
+        self._capacity = capacity
+        self._size = 0
+        self._rows = {}
+        self._symbols = np.empty(capacity, dtype=object)
+        self._fetched_at = np.zeros(capacity)
+        self._numeric = {f: np.full(capacity, np.nan) for f in self.numeric_fields}
+        # Campi testuali come codici interi + vocabolario
+        self._codes = {f: np.full(capacity, -1, dtype=np.int32) for f in self.category_fields}
+        self._vocab = {f: {} for f in self.category_fields}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def symbols(self):
+        return self._symbols[:self._size]
+
+    def _grow(self):
+        new = self._capacity * 2
+        self._symbols = np.concatenate([self._symbols, np.empty(new - self._capacity, dtype=object)])
+        self._fetched_at = np.concatenate([self._fetched_at, np.zeros(new - self._capacity)])
+        for f in self.numeric_fields:
+            self._numeric[f] = np.concatenate([self._numeric[f], np.full(new - self._capacity, np.nan)])
+        for f in self.category_fields:
+            self._codes[f] = np.concatenate([self._codes[f], np.full(new - self._capacity, -1, np.int32)])
+        self._capacity = new
+
+    def update(self, symbol, info, fetched_at=None):
+        """Inserisce o aggiorna la riga di un simbolo"""
+        symbol = symbol.strip().upper()
+        with self._lock:
+            row = self._rows.get(symbol)
+            if row is None:
+                if self._size == self._capacity:
+                    self._grow()
+                row = self._size
+                self._rows[symbol] = row
+                self._symbols[row] = symbol
+                self._size += 1
+            self._fetched_at[row] = time.time() if fetched_at is None else fetched_at
+            for f in self.numeric_fields:
+                value = info.get(f)
+                try:
+                    self._numeric[f][row] = np.nan if value is None else float(value)
+                except (TypeError, ValueError):
+                    self._numeric[f][row] = np.nan
+            for f in self.category_fields:
+                value = info.get(f)
+                if value is None:
+                    self._codes[f][row] = -1
+                else:
+                    vocab = self._vocab[f]
+                    self._codes[f][row] = vocab.setdefault(value, len(vocab))
+
+    def stale(self, symbols, max_age=DEFAULT_MAX_AGE, now=None):
+        """Simboli assenti dallo snapshot o più vecchi di max_age secondi"""
+        now = time.time() if now is None else now
+        out = []
+        with self._lock:
+            for symbol in symbols:
+                row = self._rows.get(symbol.strip().upper())
+                if row is None or now - self._fetched_at[row] > max_age:
+                    out.append(symbol)
+        return out
+
+    def refresh(self, symbols, cache, max_age=DEFAULT_MAX_AGE, provider=None,
+                max_workers=SCREENER_WORKERS):
+        """Aggiorna solo i simboli mancanti o scaduti; restituisce quelli non riusciti"""
+        todo = self.stale(symbols, max_age)
+
+        def fetch(symbol):
+            try:
+                return symbol, CachedTicker(symbol, cache, provider).info or {}, None
+            except Exception as e:
+                return symbol, None, str(e)
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener") as pool:
+            for symbol, info, error in pool.map(fetch, todo):
+                if error is None:
+                    self.update(symbol, info)
+                else:
+                    failed.append((symbol, error))
+        return failed
+
+    def column(self, field):
+        """Colonna di un campo (vista senza copia per i campi numerici)"""
+        if field in self._numeric:
+            return self._numeric[field][:self._size]
+        if field in self._codes:
+            labels = np.array(list(self._vocab[field]) + [None], dtype=object)
+            return labels[self._codes[field][:self._size]]
+        raise KeyError(field)
+
+    def mask(self, filters):
+        """Maschera booleana per filtri composti (AND) come (campo, operatore, valore).
+
+        Operatori: < <= > >= == != su campi numerici; "between" con (min, max);
+        "in" / "not in" con una lista di valori (anche sui campi testuali).
+        """
+        n = self._size
+        mask = np.ones(n, dtype=bool)
+        for field, op, value in filters:
+            if field in self._codes:
+                codes = self._codes[field][:n]
+                vocab = self._vocab[field]
+                if op in ("==", "!="):
+                    value, op = [value], "in" if op == "==" else "not in"
+                wanted = np.array([vocab[v] for v in value if v in vocab], dtype=np.int32)
+                hit = np.isin(codes, wanted)
+                mask &= hit if op == "in" else ~hit & (codes >= 0)
+                continue
+            col = self._numeric[field][:n]
+            with np.errstate(invalid="ignore"):
+                if op == "between":
+                    low, high = value
+                    mask &= (col >= low) & (col <= high)
+                elif op == "in":
+                    mask &= np.isin(col, value)
+                elif op == "not in":
+                    mask &= ~np.isin(col, value) & ~np.isnan(col)
+                else:
+                    mask &= OPERATORS[op](col, value)  # NaN -> False
+        return mask
+
+    def screen(self, filters=(), sort_by=None, top=None, ascending=False, fields=None):
+        """Simboli che soddisfano i filtri, opzionalmente i primi N per sort_by"""
+        with self._lock:
+            rows = np.nonzero(self.mask(filters))[0]
+            if sort_by is not None:
+                key = self._numeric[sort_by][rows]
+                rows = rows[~np.isnan(key)]
+                key = key[~np.isnan(key)]
+                if not ascending:
+                    key = -key
+                if top is not None and top < len(rows):
+                    # Selezione parziale O(n), poi ordinamento dei soli primi N
+                    part = np.argpartition(key, top - 1)[:top]
+                    rows, key = rows[part], key[part]
+                rows = rows[np.argsort(key, kind="stable")]
+            elif top is not None:
+                rows = rows[:top]
+            return self._frame(rows, fields)
+
+    def _frame(self, rows, fields=None):
+        fields = fields or (self.category_fields + self.numeric_fields)
+        data = {}
+        for f in fields:
+            if f in self._numeric:
+                data[f] = self._numeric[f][rows]
+            else:
+                labels = np.array(list(self._vocab[f]) + [None], dtype=object)
+                data[f] = pd.Categorical(labels[self._codes[f][rows]])
+        return pd.DataFrame(data, index=pd.Index(self._symbols[rows], name="symbol"))
+
+    def to_frame(self):
+        """Intero snapshot come DataFrame"""
+        with self._lock:
+            return self._frame(np.arange(self._size))
@@ -0,0 +1,216 @@
+# Store condiviso tra processi su SQLite per la DataCache
+# Più worker del server (o più istanze Streamlit sulla stessa macchina) leggono e scrivono
+# lo stesso file; un lease per chiave fa sì che un solo processo scarichi un valore
+# mentre gli altri ne attendono la scrittura (single-flight tra processi).
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+LEASE_TTL = 30.0
+LEASE_POLL = 0.05
+PRUNE_TO = 0.9  # la eviction scende sotto questa frazione del limite
+# Ultimo accesso per l'LRU: aggiornato solo se più vecchio di ACCESS_RESOLUTION secondi,
+# e scritto in blocco al più ogni ACCESS_FLUSH secondi (niente UPDATE a ogni lettura)
+ACCESS_RESOLUTION = 60.0
+ACCESS_FLUSH = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed REAL NOT NULL,
+    nbytes INTEGER NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_symbol ON entries (symbol, endpoint);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+-- Totali correnti aggiornati dai trigger nella stessa transazione delle scritture
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    nbytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals SELECT 0, COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries;
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE totals SET entries = entries + 1, nbytes = nbytes + NEW.nbytes WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE totals SET entries = entries - 1, nbytes = nbytes - OLD.nbytes WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF nbytes ON entries BEGIN
+    UPDATE totals SET nbytes = nbytes - OLD.nbytes + NEW.nbytes WHERE id = 0;
+END;
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """Valori serializzati con pickle in un file SQLite (WAL), con eviction LRU per byte"""
+
+    def __init__(self, path, max_bytes=2 * 1024 * 1024 * 1024, lease_ttl=LEASE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.getpid()}"
+        self._local = threading.local()
+        self._accessed = {}  # chiave -> ultimo accesso non ancora scritto
+        self._flushed = time.time()
+        self._accessed_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        # Schema e totali iniziali in una transazione: due processi che aprono insieme
+        # un file esistente non contano due volte le stesse voci
+        conn.executescript(f"BEGIN IMMEDIATE;{_SCHEMA}COMMIT;")
+
+    def _conn(self):
+        # Una connessione per thread: sqlite3 non condivide le connessioni tra thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def read(self, key, now=None):
+        """Restituisce (trovato, valore, scadenza)"""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        row = conn.execute("SELECT expires_at, accessed, value FROM entries WHERE key = ?",
+                           (repr(key),)).fetchone()
+        if row is None:
+            return False, None, 0
+        expires_at, accessed, blob = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM entries WHERE key = ? AND expires_at <= ?", (repr(key), now))
+            return False, None, 0
+        try:
+            value = pickle.loads(blob)
+        except Exception:
+            conn.execute("DELETE FROM entries WHERE key = ?", (repr(key),))
+            return False, None, 0
+        if now - accessed >= ACCESS_RESOLUTION:
+            self._touch(repr(key), now)
+        return True, value, expires_at
+
+    def _touch(self, key, now):
+        with self._accessed_lock:
+            self._accessed[key] = now
+            if now - self._flushed < ACCESS_FLUSH:
+                return
+        self.flush_accessed()
+
+    def flush_accessed(self):
+        """Scrive in una sola transazione gli ultimi accessi accumulati dalle letture"""
+        with self._accessed_lock:
+            pending, self._accessed = self._accessed, {}
+            self._flushed = time.time()
+        if not pending:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("UPDATE entries SET accessed = MAX(accessed, ?) WHERE key = ?",
+                             [(when, key) for key, when in pending.items()])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def write(self, key, value, expires_at):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        conn = self._conn()
+        # Upsert e non INSERT OR REPLACE: la sostituzione di REPLACE non attiva i trigger di DELETE
+        conn.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "expires_at = excluded.expires_at, accessed = excluded.accessed, "
+            "nbytes = excluded.nbytes, value = excluded.value",
+            (repr(key), key[0], key[1], expires_at, time.time(), len(blob), sqlite3.Binary(blob)),
+        )
+        if self._total_bytes(conn) > self.max_bytes:
+            self._prune(conn)
+
+    def delete(self, symbol=None, endpoint=None):
+        """Rimuove le voci per simbolo e/o endpoint (tutte se entrambi None)"""
+        clauses, args = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            args.append(symbol)
+        if endpoint is not None:
+            clauses.append("endpoint = ?")
+            args.append(endpoint)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        self._conn().execute(f"DELETE FROM entries{where}", args)
+
+    @staticmethod
+    def _total_bytes(conn):
+        return conn.execute("SELECT nbytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def _prune(self, conn):
+        # Eviction LRU fino a PRUNE_TO del limite, così non si ripete a ogni scrittura
+        self.flush_accessed()
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        excess = self._total_bytes(conn) - self.max_bytes * PRUNE_TO
+        stale = []
+        # Scansione sull'indice di accessed, interrotta appena si è liberato abbastanza
+        cursor = conn.execute("SELECT key, nbytes FROM entries ORDER BY accessed")
+        for key, nbytes in cursor:
+            if excess <= 0:
+                break
+            stale.append((key,))
+            excess -= nbytes
+        cursor.close()
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    # --- Lease tra processi ---
+
+    def acquire_lease(self, key):
+        """True se questo processo ottiene il diritto di scaricare la chiave"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (repr(key), now))
+            cursor = conn.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)",
+                                  (repr(key), self.owner, now + self.lease_ttl))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def release_lease(self, key):
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (repr(key), self.owner))
+
+    def wait_for(self, key, timeout=None):
+        """Attende che un altro processo scriva la chiave o rilasci il lease"""
+        deadline = time.time() + (self.lease_ttl if timeout is None else timeout)
+        conn = self._conn()
+        while time.time() < deadline:
+            found, value, expires_at = self.read(key)
+            if found:
+                return True, value, expires_at
+            held = conn.execute("SELECT 1 FROM leases WHERE key = ? AND expires_at > ?",
+                                (repr(key), time.time())).fetchone()
+            if held is None:
+                break
+            time.sleep(LEASE_POLL)
+        return False, None, 0
+
+    def stats(self):
+        count, total = self._conn().execute(
+            "SELECT entries, nbytes FROM totals WHERE id = 0").fetchone()
+        return {"voci": count, "byte": total}
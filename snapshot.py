@@ -0,0 +1,395 @@
+# Snapshot giornaliero precalcolato per un universo di simboli
+# Un job senza interfaccia scarica info, storia, bilanci e dividendi su un pool limitato e
+# scrive una cartella per giorno con tabelle Parquet compresse (zstd) in formato colonnare.
+# L'app legge prima dallo snapshot (vedi DataCache(snapshot=...)), così il traffico del
+# mattino è servito dal disco locale invece che da Yahoo.
+#
+#   python snapshot.py --universe AAPL,MSFT,GOOG --root snapshots
+#   python snapshot.py --watchlist watchlist.csv --root snapshots --period 2y
+#   python guida.py snapshot --universe AAPL,MSFT   # stessa CLI dall'entry point dell'app
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date as Date
+
+import numpy as np
+import pandas as pd
+
+from batch import parse_symbols, parse_watchlist_file
+from providers import STATEMENTS, get_provider
+
+SNAPSHOT_WORKERS = 8
+SNAPSHOT_PERIOD = "1y"
+SNAPSHOT_MAX_AGE = 24 * 3600
+COMPRESSION = "zstd"
+MANIFEST = "manifest.json"
+
+_JSON_PREFIX = "json:"
+_PERIOD = re.compile(r"^(\d+)(d|wk|mo|y)$")
+_DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Giorni di calendario approssimativi per confrontare la copertura dei periodi
+_PERIOD_DAYS = {"d": 1.5, "wk": 7, "mo": 31, "y": 366}
+
+
+# --- Costruzione ---
+
+def _fetch_symbol(provider, symbol, period):
+    data = {"errors": []}
+    for name, call in (
+        ("info", lambda: provider.info(symbol)),
+        ("history", lambda: provider.history(symbol, period=period)),
+        ("dividends", lambda: provider.dividends(symbol)),
+    ):
+        try:
+            data[name] = call()
+        except Exception as e:
+            data["errors"].append((name, str(e)))
+    data["statements"] = {}
+    for name in STATEMENTS:
+        try:
+            data["statements"][name] = provider.statement(symbol, name)
+        except Exception as e:
+            data["errors"].append((name, str(e)))
+    return data
+
+
+def _info_table(infos):
+    frame = pd.DataFrame.from_records(
+        [{"symbol": symbol, **(info or {})} for symbol, info in infos.items()]
+    )
+    for column in frame.columns[1:]:
+        values = frame[column]
+        if values.dtype != object:
+            continue
+        kinds = {type(v) for v in values if v is not None and not (isinstance(v, float) and np.isnan(v))}
+        if kinds and kinds != {str}:
+            # Liste, dizionari o tipi misti: JSON per cella, la colonna resta una
+            frame[column] = [None if v is None or (isinstance(v, float) and np.isnan(v))
+                             else json.dumps(v, default=str) for v in values]
+            frame = frame.rename(columns={column: _JSON_PREFIX + column})
+    return frame
+
+
+def _history_table(histories):
+    frames = []
+    for symbol, hist in histories.items():
+        if hist is None or hist.empty:
+            continue
+        index = pd.DatetimeIndex(hist.index)
+        tz = str(index.tz) if index.tz is not None else ""
+        frame = hist.reset_index(drop=True)
+        frame.insert(0, "Date", index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC"))
+        frame.insert(0, "tz", tz)
+        frame.insert(0, "symbol", symbol)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=["symbol", "tz", "Date"])
+    table = pd.concat(frames, ignore_index=True)
+    table["symbol"] = table["symbol"].astype("category")
+    table["tz"] = table["tz"].astype("category")
+    return table
+
+
+def _statements_table(statements):
+    frames = []
+    for symbol, by_name in statements.items():
+        for name, frame in by_name.items():
+            if frame is None or frame.empty:
+                continue
+            values = frame.apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+            items, periods = values.shape
+            frames.append(pd.DataFrame({
+                "symbol": symbol,
+                "statement": name,
+                "item": np.repeat(frame.index.astype(str).to_numpy(), periods),
+                "period": np.tile(pd.to_datetime(frame.columns).to_numpy(), items),
+                "value": values.ravel(),
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["symbol", "statement", "item", "period", "value"])
+    table = pd.concat(frames, ignore_index=True)
+    for column in ("symbol", "statement", "item"):
+        table[column] = table[column].astype("category")
+    return table
+
+
+def _dividends_table(dividends):
+    frames = []
+    for symbol, series in dividends.items():
+        if series is None or series.empty:
+            continue
+        index = pd.DatetimeIndex(series.index)
+        frames.append(pd.DataFrame({
+            "symbol": symbol,
+            "tz": str(index.tz) if index.tz is not None else "",
+            "Date": index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC"),
+            "value": series.to_numpy(np.float64),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["symbol", "tz", "Date", "value"])
+    table = pd.concat(frames, ignore_index=True)
+    table["symbol"] = table["symbol"].astype("category")
+    return table
+
+
+def build_snapshot(symbols, root, provider=None, period=SNAPSHOT_PERIOD,
+                   max_workers=SNAPSHOT_WORKERS, day=None, progress=None):
+    """Scarica l'universo e scrive root/AAAA-MM-GG; restituisce il percorso dello snapshot.
+
+    La cartella del giorno viene sostituita in modo atomico a scrittura completata.
+    progress: callback opzionale (completati, totale, simbolo).
+    """
+    provider = provider or get_provider()
+    day = (day or Date.today()).isoformat()
+    started = time.time()
+    fetched = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot") as pool:
+        futures = {pool.submit(_fetch_symbol, provider, symbol, period): symbol for symbol in symbols}
+        for done, future in enumerate(as_completed(futures), 1):
+            symbol = futures[future]
+            fetched[symbol] = future.result()
+            if progress:
+                progress(done, len(futures), symbol)
+
+    symbols = [s for s in symbols if s in fetched]
+    tables = {
+        "info": _info_table({s: fetched[s].get("info") for s in symbols}),
+        "history": _history_table({s: fetched[s].get("history") for s in symbols}),
+        "statements": _statements_table({s: fetched[s]["statements"] for s in symbols}),
+        "dividends": _dividends_table({s: fetched[s].get("dividends") for s in symbols}),
+    }
+
+    os.makedirs(root, exist_ok=True)
+    target = os.path.join(root, day)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, table in tables.items():
+        table.to_parquet(os.path.join(tmp, f"{name}.parquet"), compression=COMPRESSION, index=False)
+    manifest = {
+        "day": day,
+        "created": time.time(),
+        "elapsed": round(time.time() - started, 2),
+        "period": period,
+        "symbols": symbols,
+        "errors": {s: fetched[s]["errors"] for s in symbols if fetched[s]["errors"]},
+    }
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    if os.path.isdir(target):
+        old = f"{target}.{os.getpid()}.old"
+        os.replace(target, old)
+        os.replace(tmp, target)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, target)
+    return target
+
+
+# --- Lettura ---
+
+def _period_days(period):
+    match = _PERIOD.match(period or "")
+    if not match:
+        return None
+    return int(match.group(1)) * _PERIOD_DAYS[match.group(2)]
+
+
+def _slice_period(hist, period):
+    # Come yfinance: "Nd" = ultime N sedute, altrimenti intervallo di calendario dall'ultima barra
+    count, unit = _PERIOD.match(period).groups()
+    count = int(count)
+    if unit == "d":
+        return hist.iloc[-count:]
+    offset = {"wk": pd.DateOffset(weeks=count), "mo": pd.DateOffset(months=count),
+              "y": pd.DateOffset(years=count)}[unit]
+    return hist[hist.index > hist.index[-1] - offset]
+
+
+class Snapshot:
+    """Snapshot di un giorno, con tabelle caricate al primo accesso"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.created = self.manifest["created"]
+        self.period = self.manifest["period"]
+        self.symbols = frozenset(self.manifest["symbols"])
+        # Endpoint falliti durante il job: non vanno serviti come tabelle vuote
+        self.failed = frozenset((symbol, name) for symbol, errors in self.manifest["errors"].items()
+                                for name, _ in errors)
+        self._tables = {}
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        with self._lock:
+            if name not in self._tables:
+                self._tables[name] = pd.read_parquet(os.path.join(self.path, f"{name}.parquet"))
+            return self._tables[name]
+
+    def _rows(self, name, symbol):
+        # Righe di un simbolo, con l'indice per simbolo costruito una volta per tabella
+        table = self.table(name)
+        with self._lock:
+            if name not in self._groups:
+                self._groups[name] = table.groupby("symbol", observed=True).indices
+            positions = self._groups[name].get(symbol)
+        return None if positions is None else table.iloc[positions]
+
+    def info(self, symbol):
+        rows = self._rows("info", symbol)
+        if rows is None:
+            return None
+        info = {}
+        for column, value in rows.iloc[0].items():
+            if column == "symbol" or value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            if column.startswith(_JSON_PREFIX):
+                info[column[len(_JSON_PREFIX):]] = json.loads(value)
+            else:
+                info[column] = value.item() if isinstance(value, np.generic) else value
+        info["symbol"] = symbol
+        return info
+
+    def history(self, symbol, period=None):
+        rows = self._rows("history", symbol)
+        if rows is None:
+            return None
+        tz = rows["tz"].iloc[0]
+        index = pd.DatetimeIndex(rows["Date"], name="Date")
+        index = index.tz_convert(tz) if tz else index.tz_convert(None)
+        hist = rows.drop(columns=["symbol", "tz", "Date"]).set_index(index)
+        if period is not None and period != self.period:
+            hist = _slice_period(hist, period)
+        return hist
+
+    def statement(self, symbol, name):
+        rows = self._rows("statements", symbol)
+        if rows is None:
+            return None
+        rows = rows[rows["statement"] == name]
+        if rows.empty:
+            return pd.DataFrame()
+        items = pd.unique(rows["item"].astype(str))
+        frame = rows.pivot_table(index="item", columns="period", values="value",
+                                 aggfunc="first", observed=True, dropna=False)
+        frame.index = frame.index.astype(str)
+        periods = sorted(frame.columns, reverse=True)
+        frame = frame.reindex(index=items, columns=periods)
+        frame.index.name = None
+        frame.columns.name = None
+        return frame
+
+    def dividends(self, symbol):
+        rows = self._rows("dividends", symbol)
+        if rows is None:
+            return pd.Series(dtype=np.float64, name="Dividends")
+        tz = rows["tz"].iloc[0]
+        index = pd.DatetimeIndex(rows["Date"], name="Date")
+        index = index.tz_convert(tz) if tz else index.tz_convert(None)
+        return pd.Series(rows["value"].to_numpy(), index=index, name="Dividends")
+
+    def read(self, key):
+        """Valore per una chiave di DataCache, oppure None se lo snapshot non la copre"""
+        symbol, endpoint, params = key
+        params = dict(params)
+        if symbol not in self.symbols or (symbol, endpoint) in self.failed:
+            return None
+        if endpoint == "info" and not params:
+            return self.info(symbol)
+        if endpoint == "history" and set(params) == {"period"}:
+            period = params["period"]
+            wanted, have = _period_days(period), _period_days(self.period)
+            if period == self.period or (wanted is not None and have is not None and wanted <= have):
+                return self.history(symbol, period)
+            return None
+        if endpoint in STATEMENTS and not params:
+            return self.statement(symbol, endpoint)
+        if endpoint == "dividends" and not params:
+            return self.dividends(symbol)
+        return None
+
+
+class SnapshotStore:
+    """Sorgente in sola lettura per DataCache: usa lo snapshot più recente sotto root"""
+
+    def __init__(self, root, max_age=SNAPSHOT_MAX_AGE, rescan=60.0):
+        self.root = root
+        self.max_age = max_age
+        self.rescan = rescan
+        self._current = None
+        self._scanned = 0.0
+        self._lock = threading.Lock()
+
+    def latest(self):
+        """Snapshot più recente (ricontrolla la cartella al massimo ogni `rescan` secondi)"""
+        now = time.time()
+        with self._lock:
+            if now - self._scanned < self.rescan:
+                return self._current
+            self._scanned = now
+            try:
+                days = sorted(d for d in os.listdir(self.root)
+                              if _DAY.match(d) and os.path.isfile(os.path.join(self.root, d, MANIFEST)))
+            except FileNotFoundError:
+                days = []
+            if not days:
+                self._current = None
+            elif self._current is None or os.path.basename(self._current.path) != days[-1]:
+                self._current = Snapshot(os.path.join(self.root, days[-1]))
+            return self._current
+
+    def read(self, key, now=None):
+        """Restituisce (trovato, valore, scadenza) come gli store di DataCache"""
+        now = time.time() if now is None else now
+        snapshot = self.latest()
+        if snapshot is None or now - snapshot.created > self.max_age:
+            return False, None, 0
+        try:
+            value = snapshot.read(key)
+        except Exception:
+            return False, None, 0
+        if value is None:
+            return False, None, 0
+        return True, value, snapshot.created + self.max_age
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot giornaliero dei dati per un universo di simboli")
+    parser.add_argument("--universe", default="", help="simboli separati da virgola o spazio")
+    parser.add_argument("--watchlist", help="file CSV/testo con i simboli")
+    parser.add_argument("--root", default=os.environ.get("GUIDA_SNAPSHOT_DIR", "snapshots"))
+    parser.add_argument("--period", default=SNAPSHOT_PERIOD, help="periodo della storia prezzi")
+    parser.add_argument("--workers", type=int, default=SNAPSHOT_WORKERS)
+    args = parser.parse_args(argv)
+
+    symbols = parse_symbols(args.universe)
+    if args.watchlist:
+        with open(args.watchlist, "rb") as f:
+            symbols += [s for s in parse_watchlist_file(f.read()) if s not in symbols]
+    if not symbols:
+        parser.error("nessun simbolo: usa --universe o --watchlist")
+
+    def progress(done, total, symbol):
+        print(f"[{done}/{total}] {symbol}", file=sys.stderr)
+
+    path = build_snapshot(symbols, args.root, period=args.period, max_workers=args.workers,
+                          progress=progress)
+    snapshot = Snapshot(path)
+    errors = snapshot.manifest["errors"]
+    print(f"Snapshot scritto in {path}: {len(snapshot.manifest['symbols'])} simboli, "
+          f"{len(errors)} con errori, {snapshot.manifest['elapsed']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
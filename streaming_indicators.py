@@ -0,0 +1,302 @@
+# Indicatori incrementali per i tick in tempo reale
+# Ogni oggetto mantiene il proprio stato e si aggiorna in O(1) per nuova barra.
+# I valori possono essere scalari oppure array NumPy (un elemento per simbolo).
+# Come in indicators.py, ogni colonna parte dal suo primo valore valido (titoli quotati più
+# tardi) e i NaN restano fuori dalle somme correnti: una finestra con NaN dà NaN.
+
+from collections import deque
+
+import numpy as np
+
+from indicators import DEFAULT_PARAMS, TRADING_DAYS
+
+NAN = float("nan")
+
+
+def _arr(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _zero_nan(x):
+    return np.where(np.isnan(x), 0.0, x)
+
+
+class _Indicator:
+    """Base comune: seed dalla storia, poi update() una barra alla volta"""
+
+    value = NAN
+
+    def seed(self, values):
+        """Inizializza lo stato scorrendo la storia una sola volta"""
+        for v in values:
+            self.update(v)
+        return self
+
+    @property
+    def ready(self):
+        return not np.all(np.isnan(self.value))
+
+
+class _Window:
+    """Finestra mobile con somme correnti di valori, quadrati e conteggio dei validi"""
+
+    def __init__(self, window, squares=False):
+        self.window = window
+        self.squares = squares
+        self._buffer = deque()
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.count = 0
+        self._updates = 0
+
+    def push(self, x):
+        valid = ~np.isnan(x)
+        clean = np.where(valid, x, 0.0)
+        self._buffer.append(x)
+        self.sum = self.sum + clean
+        self.count = self.count + valid
+        if self.squares:
+            self.sumsq = self.sumsq + clean * clean
+        if len(self._buffer) > self.window:
+            old = self._buffer.popleft()
+            old_clean = _zero_nan(old)
+            self.sum = self.sum - old_clean
+            self.count = self.count - ~np.isnan(old)
+            if self.squares:
+                self.sumsq = self.sumsq - old_clean * old_clean
+        self._updates += 1
+        if self._updates % self.window == 0:
+            # Ricalcolo periodico per evitare la deriva numerica delle somme
+            values = np.stack(self._buffer)
+            self.sum = np.nansum(values, axis=0)
+            if self.squares:
+                self.sumsq = np.nansum(values * values, axis=0)
+
+    @property
+    def full(self):
+        return np.equal(self.count, self.window)
+
+
+class SMA(_Indicator):
+    """Media mobile semplice con somma corrente"""
+
+    def __init__(self, window):
+        self.window = window
+        self._window = _Window(window)
+
+    def update(self, x):
+        w = self._window
+        w.push(_arr(x))
+        self.value = np.where(w.full, w.sum / self.window, NAN)[()]
+        return self.value
+
+
+class RollingStd(_Indicator):
+    """Deviazione standard mobile con somme correnti di valori e quadrati"""
+
+    def __init__(self, window, ddof=1):
+        self.window = window
+        self.ddof = ddof
+        self._window = _Window(window, squares=True)
+
+    def update(self, x):
+        w = self._window
+        w.push(_arr(x))
+        var = (w.sumsq - w.sum * w.sum / self.window) / (self.window - self.ddof)
+        self.value = np.where(w.full, np.sqrt(np.maximum(var, 0.0)), NAN)[()]
+        return self.value
+
+
+class EMA(_Indicator):
+    """Media mobile esponenziale (come indicators.ema), avviata al primo valore valido"""
+
+    def __init__(self, span=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+
+    def update(self, x):
+        x = _arr(x)
+        prev = _arr(self.value)
+        valid = ~np.isnan(x)
+        start = valid & np.isnan(prev)
+        step = valid & ~start
+        self.value = np.where(start, x, np.where(step, prev + self.alpha * (x - prev), prev))[()]
+        return self.value
+
+
+class RSI(_Indicator):
+    """RSI con medie semplici di guadagni e perdite (come compute_indicators e calculate_rsi)"""
+
+    def __init__(self, window=DEFAULT_PARAMS["rsi_window"]):
+        self.window = window
+        self._prev = NAN
+        self._gain = SMA(window)
+        self._loss = SMA(window)
+
+    def update(self, close):
+        close = _arr(close)
+        delta = close - self._prev
+        self._prev = close
+        avg_gain = self._gain.update(np.where(np.isnan(delta), NAN, np.maximum(delta, 0.0)))
+        avg_loss = self._loss.update(np.where(np.isnan(delta), NAN, np.maximum(-delta, 0.0)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.value = (100.0 - 100.0 / (1.0 + np.true_divide(avg_gain, avg_loss)))[()]
+        return self.value
+
+
+class WilderRSI(_Indicator):
+    """RSI con lisciatura di Wilder: media semplice sulle prime N variazioni, poi ricorsiva"""
+
+    def __init__(self, window=DEFAULT_PARAMS["rsi_window"]):
+        self.window = window
+        self._prev = NAN
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, close):
+        close = _arr(close)
+        delta = close - self._prev
+        # Le barre mancanti non toccano lo stato: si riparte dall'ultima chiusura valida
+        self._prev = np.where(np.isnan(close), self._prev, close)
+        valid = ~np.isnan(delta)
+        gain = np.where(valid, np.maximum(delta, 0.0), 0.0)
+        loss = np.where(valid, np.maximum(-delta, 0.0), 0.0)
+        n = self.window
+        warmup = valid & (self._count < n)
+        steady = valid & ~warmup
+        self._gain = np.where(warmup, self._gain + gain / n,
+                              np.where(steady, (self._gain * (n - 1) + gain) / n, self._gain))
+        self._loss = np.where(warmup, self._loss + loss / n,
+                              np.where(steady, (self._loss * (n - 1) + loss) / n, self._loss))
+        self._count = self._count + valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + np.true_divide(self._gain, self._loss))
+        self.value = np.where(self._count >= n, rsi, NAN)[()]
+        return self.value
+
+
+def _true_range(high, low, prev_close):
+    # Come indicators.true_range: senza chiusura precedente vale H-L, NaN se manca H-L
+    hl = high - low
+    gap = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    return np.where(np.isnan(hl), NAN, np.fmax(hl, gap))
+
+
+class ATR(_Indicator):
+    """Average True Range come media semplice del True Range (come compute_indicators)"""
+
+    def __init__(self, window=DEFAULT_PARAMS["atr_window"]):
+        self.window = window
+        self._prev_close = NAN
+        self._mean = SMA(window)
+
+    def update(self, bar):
+        high, low, close = (_arr(v) for v in bar)
+        tr = _true_range(high, low, self._prev_close)
+        self._prev_close = close
+        self.value = self._mean.update(tr)
+        return self.value
+
+
+class WilderATR(_Indicator):
+    """Average True Range con lisciatura di Wilder"""
+
+    def __init__(self, window=DEFAULT_PARAMS["atr_window"]):
+        self.window = window
+        self._prev_close = NAN
+        self._count = 0
+        self._atr = 0.0
+
+    def update(self, bar):
+        high, low, close = (_arr(v) for v in bar)
+        tr = _true_range(high, low, self._prev_close)
+        self._prev_close = np.where(np.isnan(close), self._prev_close, close)
+        valid = ~np.isnan(tr)
+        n = self.window
+        warmup = valid & (self._count < n)
+        steady = valid & ~warmup
+        self._atr = np.where(warmup, self._atr + np.where(valid, tr, 0.0) / n,
+                             np.where(steady, (self._atr * (n - 1) + tr) / n, self._atr))
+        self._count = self._count + valid
+        self.value = np.where(self._count >= n, self._atr, NAN)[()]
+        return self.value
+
+
+class MACD(_Indicator):
+    """MACD: EMA veloce - EMA lenta, con linea di segnale e istogramma"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+        self.signal = NAN
+        self.hist = NAN
+
+    def update(self, close):
+        self.value = self._fast.update(close) - self._slow.update(close)
+        self.signal = self._signal.update(self.value)
+        self.hist = self.value - self.signal
+        return self.value
+
+
+class ReturnsVolatility(_Indicator):
+    """Volatilità annualizzata dei rendimenti su finestra mobile"""
+
+    def __init__(self, window=DEFAULT_PARAMS["volatility_window"]):
+        self._std = RollingStd(window)
+        self._prev = None
+
+    def update(self, close):
+        close = _arr(close)
+        if self._prev is not None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ret = close / self._prev - 1.0
+            self.value = self._std.update(ret) * np.sqrt(TRADING_DAYS)
+        else:
+            self.value = np.full_like(close, NAN)[()]
+        self._prev = close
+        return self.value
+
+
+class StreamingIndicators:
+    """Insieme di indicatori aggiornati insieme a ogni nuova barra (stessi nomi di compute_indicators)"""
+
+    def __init__(self, params=None):
+        p = dict(DEFAULT_PARAMS)
+        p.update(params or {})
+        self.moving_averages = {f"MA_{w}": SMA(w) for w in p["ma_windows"]}
+        self.volatility = ReturnsVolatility(p["volatility_window"])
+        self.rsi = RSI(p["rsi_window"])
+        self.macd = MACD(*p["macd"])
+        self.atr = ATR(p["atr_window"])
+
+    def update(self, close, high=None, low=None):
+        """Aggiunge una barra e restituisce i valori correnti"""
+        out = {name: ma.update(close) for name, ma in self.moving_averages.items()}
+        out["volatility"] = self.volatility.update(close)
+        out["RSI"] = self.rsi.update(close)
+        out["MACD"] = self.macd.update(close)
+        out["MACD_signal"] = self.macd.signal
+        out["MACD_hist"] = self.macd.hist
+        if high is not None and low is not None:
+            out["ATR"] = self.atr.update((high, low, close))
+        return out
+
+    def seed(self, close, high=None, low=None):
+        """Inizializza da array storici (T,) o (T, N)"""
+        close = np.asarray(close, dtype=np.float64)
+        if high is None or low is None:
+            for c in close:
+                self.update(c)
+        else:
+            high = np.asarray(high, dtype=np.float64)
+            low = np.asarray(low, dtype=np.float64)
+            for c, h, lo in zip(close, high, low):
+                self.update(c, h, lo)
+        return self
+
+    @classmethod
+    def from_history(cls, hist, params=None):
+        """Crea e inizializza gli indicatori da un DataFrame di ticker.history()"""
+        return cls(params).seed(hist["Close"].to_numpy(), hist["High"].to_numpy(),
+                                hist["Low"].to_numpy())
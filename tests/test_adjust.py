@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import adjust
+from adjust import DIVIDEND, SPLIT, AdjustedPrices, adjustment_factors
+from price_store import PriceStore
+
+N = 300
+INDEX = pd.bdate_range("2023-01-02", periods=N, tz="America/New_York", name="Date").as_unit("ns")
+SPLITS = [(100, 2.0), (250, 3.0)]          # (barra, rapporto)
+DIVIDENDS = [(50, 1.0), (200, 0.3), (280, 0.08)]  # (barra, importo dell'epoca)
+
+
+def _raw():
+    rng = np.random.default_rng(3)
+    raw = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, N)))
+    for day, ratio in SPLITS:
+        raw[day:] /= ratio
+    return raw
+
+
+RAW = _raw()
+VOLUME = np.full(N, 1000.0)
+
+
+def _expected():
+    """Chiusure totalmente aggiustate e volumi attesi con tutte le operazioni note"""
+    later = np.array([np.prod([r for d, r in SPLITS if d > i] or [1.0]) for i in range(N)])
+    factor = np.ones(N)
+    for day, amount in DIVIDENDS:
+        factor[:day] *= 1 - amount / RAW[day - 1]
+    return RAW / later * factor, RAW / later, VOLUME * later
+
+
+class FakeYahoo:
+    """Prezzi e operazioni come li restituirebbe Yahoo alla fine della barra `day`"""
+
+    def __init__(self, day):
+        self.day = day
+
+    def _known(self):
+        return [(d, r) for d, r in SPLITS if d < self.day]
+
+    def fetch(self, symbol, interval, start=None, period=None):
+        prices, volume = RAW.copy(), VOLUME.copy()
+        for d, r in self._known():
+            prices[:d] /= r
+            volume[:d] *= r
+        frame = pd.DataFrame({"Open": prices, "High": prices, "Low": prices, "Close": prices,
+                              "Volume": volume}, index=INDEX).iloc[:self.day]
+        return frame if start is None else frame[frame.index >= start]
+
+    def splits(self, symbol):
+        return pd.Series({INDEX[d]: r for d, r in self._known()}, dtype=np.float64)
+
+    def dividends(self, symbol):
+        # Importi riscalati per gli split successivi già noti, come fa Yahoo
+        return pd.Series({INDEX[d]: a / np.prod([r for s, r in self._known() if s > d] or [1.0])
+                          for d, a in DIVIDENDS if d < self.day}, dtype=np.float64)
+
+
+def test_adjustment_factors_math():
+    ts = INDEX.asi8
+    close = np.array(RAW)
+    actions = [[int(INDEX[d].value), SPLIT, r] for d, r in SPLITS]
+    actions += [[int(INDEX[d].value), DIVIDEND, a] for d, a in DIVIDENDS]
+    # Barre salvate grezze: nessuno split ancora incluso (basis prima del primo split)
+    split, dividends, volume = adjustment_factors(ts, close, actions, basis=int(ts[0]))
+    full, split_only, volumes = _expected()
+    np.testing.assert_allclose(close * split, split_only, rtol=1e-12)
+    np.testing.assert_allclose(close * split * dividends, full, rtol=1e-12)
+    np.testing.assert_allclose(VOLUME * volume, volumes, rtol=1e-12)
+
+
+def test_adjustment_factors_without_actions():
+    split, dividends, volume = adjustment_factors(INDEX.asi8, RAW, [])
+    assert (split == 1).all() and (dividends == 1).all() and (volume == 1).all()
+
+
+@pytest.mark.parametrize("step", [1, 7, 40, 80])
+def test_incremental_refresh_matches_full_history(tmp_path, monkeypatch, step):
+    yahoo = FakeYahoo(220)
+    prices = AdjustedPrices(PriceStore(str(tmp_path), fetch=yahoo.fetch), provider=yahoo)
+    while True:
+        monkeypatch.setattr(adjust.time, "time_ns", lambda: int(INDEX[yahoo.day - 1].value) + 1)
+        prices.refresh("X")
+        if yahoo.day == N:
+            break
+        yahoo.day = min(N, yahoo.day + step)
+
+    full, split_only, volumes = _expected()
+    hist = prices.history("X", refresh=False)
+    np.testing.assert_allclose(hist["Close"].to_numpy(), full, rtol=1e-12)
+    np.testing.assert_allclose(hist["Volume"].to_numpy(), volumes, rtol=1e-12)
+    hist = prices.history("X", auto_adjust=False, refresh=False)
+    np.testing.assert_allclose(hist["Close"].to_numpy(), split_only, rtol=1e-12)
+    np.testing.assert_allclose(hist["Adj Close"].to_numpy(), full, rtol=1e-12)
+
+
+def test_history_bounds_and_manual_action(tmp_path, monkeypatch):
+    yahoo = FakeYahoo(N)
+    prices = AdjustedPrices(PriceStore(str(tmp_path), fetch=yahoo.fetch), provider=yahoo)
+    monkeypatch.setattr(adjust.time, "time_ns", lambda: int(INDEX[-1].value) + 1)
+    prices.refresh("X")
+    hist = prices.history("X", start="2023-06-01", end="2023-06-09", refresh=False)
+    assert [d.day for d in hist.index] == [1, 2, 5, 6, 7, 8, 9]
+    assert prices.sync("X", force=True) == 0
+    assert prices.add_action("X", "2023-06-05", DIVIDEND, 0.05) == 1
+    assert len(prices.table("X")["actions"]) == len(SPLITS) + len(DIVIDENDS) + 1
+    with pytest.raises(ValueError):
+        prices.add_action("X", "2023-06-05", "spinoff", 1.0)
+
+
+class CountingYahoo(FakeYahoo):
+    def __init__(self, day):
+        super().__init__(day)
+        self.calls = []
+
+    def fetch(self, symbol, interval, start=None, period=None):
+        self.calls.append("history")
+        return super().fetch(symbol, interval, start, period)
+
+    def splits(self, symbol):
+        self.calls.append("splits")
+        return super().splits(symbol)
+
+    def dividends(self, symbol):
+        self.calls.append("dividends")
+        return super().dividends(symbol)
+
+
+def test_history_reads_stay_local_while_fresh(tmp_path, monkeypatch):
+    import price_store
+
+    yahoo = CountingYahoo(200)
+    session = INDEX[yahoo.day - 1].tz_convert("UTC").timestamp()
+    now = [session + 3600]
+    monkeypatch.setattr(price_store.time, "time", lambda: now[0])
+    monkeypatch.setattr(adjust.time, "time", lambda: now[0])
+    monkeypatch.setattr(adjust.time, "time_ns", lambda: int(now[0] * 1e9))
+    prices = AdjustedPrices(PriceStore(str(tmp_path), fetch=yahoo.fetch), provider=yahoo)
+    prices.history("X")
+    assert yahoo.calls == ["history", "splits", "dividends"]
+    # Rerun nella stessa seduta: nessuna richiesta
+    for _ in range(3):
+        prices.history("X")
+    assert len(yahoo.calls) == 3
+    # Barra parziale più vecchia di refresh_age: si rilegge la coda, non le operazioni
+    now[0] += price_store.REFRESH_AGE + 1
+    prices.history("X")
+    assert yahoo.calls[3:] == ["history"]
+    # Nuova seduta: coda e operazioni
+    yahoo.day += 1
+    now[0] = INDEX[yahoo.day - 1].tz_convert("UTC").timestamp() + 3600
+    prices.history("X")
+    assert yahoo.calls[4:] == ["history", "splits", "dividends"]
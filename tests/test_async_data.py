@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from async_data import AsyncData, BackgroundLoop
+from bench import SyntheticProvider
+from data_cache import DataCache
+
+
+@pytest.fixture(scope="module")
+def background():
+    loop = BackgroundLoop(name="test-async")
+    yield loop
+    loop.stop()
+
+
+class SlowDiskCache(DataCache):
+    """Lettura lenta come un disco o uno store condiviso sotto carico"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.threads = set()
+
+    def get(self, symbol, endpoint, params=None):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super().get(symbol, endpoint, params)
+
+
+def test_cache_lookup_does_not_block_the_loop(background):
+    cache = SlowDiskCache(0.5)
+    cache.put("AAPL", "info", {"symbol": "AAPL"})
+    data = AsyncData(cache, SyntheticProvider(), loop=background)
+    slow = data.submit(data.info("AAPL"))
+    started = time.perf_counter()
+    background.run(asyncio.sleep(0), timeout=5)
+    assert time.perf_counter() - started < 0.3
+    assert slow.result(5) == {"symbol": "AAPL"}
+    assert "test-async" not in cache.threads
+
+
+def test_gather_returns_errors_in_place(background):
+    data = AsyncData(DataCache(), SyntheticProvider(), loop=background)
+    info, error, hist = data.fetch_many([("aapl", "info"), ("AAPL", "nope"),
+                                         ("MSFT", "history", {"period": "5d"})], timeout=5)
+    assert info["symbol"] == "AAPL"
+    assert isinstance(error, ValueError)
+    assert len(hist) == 260
+
+
+def test_async_and_sync_share_cache_keys(background):
+    cache = DataCache()
+    data = AsyncData(cache, SyntheticProvider(), loop=background)
+    hist = data.run(data.history("AAPL", period="1y"), timeout=5)
+    assert cache.get("AAPL", "history", {"period": "1y"}) == (True, hist)
+    assert cache.stats()["fetch"] == 1
@@ -0,0 +1,92 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from availability import INFO_PROBES, PROBES, check_availability, iter_probe_results, submit_probes
+
+
+class FakeTicker:
+    """Endpoint con ritardi configurabili; conta gli accessi a ciascuno"""
+
+    def __init__(self, delays=None, fail=(), block=None):
+        self.delays = delays or {}
+        self.fail = set(fail)
+        self.block = block
+        self.release = threading.Event()
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _hit(self, name, value):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if name == self.block:
+            self.release.wait(5)
+        time.sleep(self.delays.get(name, 0.0))
+        if name in self.fail:
+            raise ConnectionError(f"{name} non raggiungibile")
+        return value
+
+    def history(self, period):
+        return self._hit("history", pd.DataFrame({"Close": [1.0]}))
+
+    @property
+    def options(self):
+        return self._hit("options", ())
+
+    @property
+    def dividends(self):
+        return self._hit("dividends", pd.Series([0.5]))
+
+    @property
+    def balance_sheet(self):
+        return self._hit("balance_sheet", pd.DataFrame())
+
+    @property
+    def cashflow(self):
+        return self._hit("cashflow", pd.DataFrame({"x": [1]}))
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=8)
+    yield pool
+    pool.shutdown(wait=False)
+
+
+def test_report_in_probe_order_with_one_call_per_endpoint(executor):
+    ticker = FakeTicker(fail={"dividends"})
+    report = check_availability("AAPL", ticker, {"totalEsg": 20.1}, executor=executor)
+    assert [r.category for r in report.results] == [c for c, _ in PROBES + INFO_PROBES]
+    assert report.as_dict() == {"Dati Storici": True, "Opzioni": False, "Dividendi": False,
+                                "Bilanci": False, "Flussi Cassa": True, "Dati ESG": True}
+    assert report["Dividendi"].status == "⚠️" and "non raggiungibile" in report["Dividendi"].error
+    assert set(ticker.calls.values()) == {1}
+
+
+def test_hanging_probe_times_out_without_blocking_others(executor):
+    ticker = FakeTicker(block="options")
+    started = time.perf_counter()
+    results = list(iter_probe_results(submit_probes(ticker, executor), timeout=0.3))
+    ticker.release.set()
+    assert time.perf_counter() - started < 2
+    by_category = {r.category: r for r in results}
+    assert len(results) == len(PROBES)
+    assert by_category["Opzioni"].error == "timeout" and by_category["Opzioni"].elapsed >= 0.3
+    assert by_category["Dati Storici"].available and by_category["Dati Storici"].error is None
+
+
+def test_queued_probes_are_timed_from_their_start():
+    # Un solo worker: ogni probe attende in coda quelli prima di lui, ma nessuno supera il timeout
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        ticker = FakeTicker(delays={name: 0.15 for name in
+                                    ("history", "options", "dividends", "balance_sheet", "cashflow")})
+        results = list(iter_probe_results(submit_probes(ticker, pool), timeout=0.5))
+    finally:
+        pool.shutdown()
+    assert len(results) == len(PROBES)
+    assert not [r for r in results if r.error]
+    assert all(r.elapsed < 0.5 for r in results)
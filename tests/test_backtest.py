@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import METRICS, SignalContext, backtest, best, hold, metrics, positions, simulate, sweep
+from bench import SyntheticProvider
+
+CLOSE = np.array([100.0, 110.0, 99.0, 99.0, 108.9, 98.01])
+
+
+def test_hold_keeps_position_until_exit():
+    entries = np.array([0, 1, 0, 1, 0, 0, 1, 0], dtype=bool)[:, None]
+    exits = np.array([0, 0, 0, 0, 1, 0, 1, 0], dtype=bool)[:, None]
+    # L'uscita prevale sull'ingresso della stessa barra
+    assert hold(entries, exits)[:, 0].tolist() == [0, 1, 1, 1, 0, 0, 0, 0]
+
+
+def test_simulate_hand_computed():
+    position = np.array([1.0, 1.0, 0.0, 1.0, 1.0, 0.0])[:, None]
+    ctx = SignalContext(CLOSE)
+    strategy_returns, equity = simulate(position, ctx.returns, cost_bps=10)
+    # Rendimenti dell'asset: NaN, +10%, -10%, 0, +10%, -10%; la posizione di t vale per t+1
+    # e il costo del cambio deciso alla chiusura di t si paga sul rendimento di t+1
+    expected = [0.0, 0.10 - 0.001, -0.10, 0.0 - 0.001, 0.10 - 0.001, -0.10]
+    np.testing.assert_allclose(strategy_returns[:, 0], expected)
+    np.testing.assert_allclose(equity[:, 0], np.cumprod(1 + np.array(expected)))
+
+    result = metrics(strategy_returns, equity, position)
+    assert result["total_return"][0] == pytest.approx(np.prod(1 + np.array(expected)) - 1)
+    assert result["trades"][0] == 2
+    assert result["exposure"][0] == pytest.approx(4 / 6)
+    peak = np.maximum.accumulate(equity[:, 0])
+    assert result["max_drawdown"][0] == pytest.approx((equity[:, 0] / peak - 1).min())
+    r = np.array(expected)
+    assert result["sharpe"][0] == pytest.approx(r.mean() * 252 / (r.std(ddof=1) * np.sqrt(252)))
+
+
+def test_no_lookahead():
+    # Cambiare l'ultimo prezzo non deve cambiare i rendimenti fino alla barra precedente
+    close = SyntheticProvider(bars=260).history("AAPL", period="1y")["Close"].to_numpy()
+    _, equity = backtest(close, "ma_cross", fast=5, slow=20)
+    shocked = close.copy()
+    shocked[-1] *= 1.5
+    _, equity2 = backtest(shocked, "ma_cross", fast=5, slow=20)
+    np.testing.assert_allclose(equity[:-1], equity2[:-1])
+
+
+def test_strategies_match_pandas_rules():
+    close = pd.Series(SyntheticProvider(bars=260).history("AAPL", period="1y")["Close"].to_numpy())
+    ctx = SignalContext(close.to_numpy())
+    ma = positions(ctx, "ma_cross", fast=10, slow=30)[:, 0]
+    np.testing.assert_array_equal(ma, (close.rolling(10).mean() > close.rolling(30).mean()).astype(float))
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    expected = (macd > macd.ewm(span=9, adjust=False).mean()).astype(float)
+    np.testing.assert_array_equal(positions(ctx, "macd")[:, 0], expected)
+    with pytest.raises(ValueError):
+        positions(ctx, "nope")
+
+
+def test_sweep_in_process_and_pool_agree():
+    provider = SyntheticProvider(bars=260)
+    close = pd.DataFrame({s: provider.history(s, period="1y")["Close"] for s in ("AAPL", "MSFT")})
+    grid = {"fast": [5, 10], "slow": [20, 50]}
+    local = sweep(close, "ma_cross", grid, max_workers=1)
+    pooled = sweep(close, "ma_cross", grid, max_workers=2, chunk_size=1)
+    assert len(local) == 8 and list(local.columns) == ["fast", "slow", "symbol", *METRICS]
+    pd.testing.assert_frame_equal(local, pooled)
+    single, _ = backtest(close["MSFT"].to_numpy(), "ma_cross", fast=10, slow=50)
+    row = local[(local["fast"] == 10) & (local["slow"] == 50) & (local["symbol"] == "MSFT")].iloc[0]
+    assert row["sharpe"] == pytest.approx(single["sharpe"][0])
+    winners = best(local)
+    assert list(winners.index) == ["AAPL", "MSFT"]
+    assert winners.loc["AAPL", "sharpe"] == local[local["symbol"] == "AAPL"]["sharpe"].max()
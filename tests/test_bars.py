@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bars import Bars, load_intraday
+from bench import SyntheticProvider
+from data_cache import DataCache
+
+
+@pytest.fixture(scope="module")
+def hist():
+    return SyntheticProvider(bars=120).history("AAPL", period="1y")
+
+
+def test_float_bars_to_frame_is_zero_copy(hist):
+    bars = Bars.from_frame(hist, symbol="AAPL")
+    assert bars.prices.dtype == np.float32 and bars.volume.dtype == np.uint32
+    assert bars.nbytes == 28 * len(hist)
+    frame = bars.to_frame()
+    for name in frame:
+        assert np.shares_memory(frame[name].to_numpy(), bars.buffer), name
+    assert np.shares_memory(frame.index.asi8, bars.buffer)
+    # Con il fuso solo l'indice è nuovo
+    local = bars.to_frame(tz=True)
+    assert local.index.equals(hist.index)
+    assert np.shares_memory(local["Close"].to_numpy(), bars.buffer)
+    np.testing.assert_allclose(frame["Close"], hist["Close"], rtol=1e-7)
+    # Le fette restano viste sullo stesso buffer
+    assert np.shares_memory(bars[10:20].close, bars.buffer)
+
+
+def test_fixed_point_round_trip(hist):
+    frame = hist.copy()
+    frame.iloc[5, frame.columns.get_loc("High")] = np.nan
+    bars = Bars.from_frame(frame, scale=10_000)
+    assert bars.prices.dtype == np.int32
+    decoded = bars.to_frame(tz=True)
+    rounded = frame[["Open", "High", "Low", "Close"]].round(4)
+    rounded.index = rounded.index.as_unit("ns")
+    pd.testing.assert_frame_equal(decoded[["Open", "High", "Low", "Close"]], rounded,
+                                  check_names=False, check_freq=False, atol=1e-12, rtol=0)
+    assert np.isnan(bars.high[5])
+    np.testing.assert_array_equal(decoded["Volume"], frame["Volume"].round())
+
+
+def test_fixed_point_widens_to_int64():
+    ts = np.arange(3, dtype=np.int64) * 60_000_000_000
+    price = np.array([250_000.0, 250_001.5, 249_999.25])  # * 10000 supera int32
+    bars = Bars.from_arrays(ts, price, price, price, price, [1, 2, 5_000_000_000], scale=10_000)
+    assert bars.prices.dtype == np.int64 and bars.volume.dtype == np.uint64
+    np.testing.assert_array_equal(bars.close, price)
+
+
+def test_between_concat_and_save(tmp_path, hist):
+    bars = Bars.from_frame(hist, scale=100, symbol="AAPL")
+    day = hist.index[30]
+    window = bars.between(day, hist.index[39].strftime("%Y-%m-%d"))
+    assert len(window) == 10 and window.index()[0] == day
+    joined = Bars.concat([bars[:50], bars[50:50], bars[50:]])
+    np.testing.assert_array_equal(joined.prices, bars.prices)
+    assert joined.buffer is not bars.buffer
+
+    bars.save(str(tmp_path / "aapl"))
+    loaded = Bars.load(str(tmp_path / "aapl"))
+    assert isinstance(loaded.buffer, np.memmap)
+    assert loaded.index().equals(bars.index())
+    np.testing.assert_array_equal(loaded.to_frame().to_numpy(), bars.to_frame().to_numpy())
+    assert (loaded.symbol, loaded.scale, loaded.tz) == ("AAPL", 100, bars.tz)
+
+
+def test_load_intraday():
+    provider = SyntheticProvider(bars=390)
+    out = load_intraday(["aapl", "msft"], DataCache(), interval="1m", period="1d", provider=provider)
+    assert sorted(out) == ["AAPL", "MSFT"] and len(out["AAPL"]) == 390
+    uncached = load_intraday(["aapl"], None, interval="1m", period="1d", provider=provider)
+    np.testing.assert_array_equal(uncached["AAPL"].close, out["AAPL"].close)
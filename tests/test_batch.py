@@ -0,0 +1,75 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch import download_prices, parse_symbols, parse_watchlist_file
+from bench import SyntheticProvider
+from data_cache import CachedTicker, DataCache
+from portfolio import load_portfolio
+from snapshot import SnapshotStore, build_snapshot
+
+
+class DownloadProvider(SyntheticProvider):
+    """history() come ticker.history(), download() come yf.download (indice senza fuso)"""
+
+    def __init__(self, missing=()):
+        super().__init__(bars=60)
+        self.missing = set(missing)
+        self.downloads = []
+
+    def history(self, symbol, **params):
+        hist = super().history(symbol, **params)
+        hist["Dividends"] = 0.0
+        hist["Stock Splits"] = 0.0
+        return hist
+
+    def download(self, symbols, **params):
+        self.downloads.append(list(symbols))
+        frames = {}
+        for symbol in symbols:
+            if symbol in self.missing:
+                frames[symbol] = pd.DataFrame()
+                continue
+            hist = super().history(symbol, **params)
+            frames[symbol] = hist.set_index(hist.index.tz_localize(None))
+        return frames
+
+
+def test_parse_symbols():
+    assert parse_symbols(" aapl, msft;AAPL\n'goog' ") == ["AAPL", "MSFT", "GOOG"]
+    assert parse_watchlist_file(b"\xef\xbb\xbfName,Ticker\nApple,aapl\nMicrosoft,MSFT\n") == ["AAPL", "MSFT"]
+
+
+def test_download_prices_caches_only_successful_frames():
+    provider = DownloadProvider(missing={"BAD"})
+    cache = DataCache()
+    first = download_prices(["AAPL", "BAD"], cache, provider=provider)
+    assert len(first["AAPL"]) == 60 and first["BAD"].empty
+    download_prices(["AAPL", "BAD"], cache, provider=provider)
+    # AAPL dalla cache, BAD riprovato
+    assert provider.downloads == [["AAPL", "BAD"], ["BAD"]]
+
+
+def test_download_does_not_mix_with_ticker_history():
+    provider = DownloadProvider()
+    cache = DataCache()
+    hist = CachedTicker("AAPL", cache, provider).history(period="1y")
+    portfolio = load_portfolio(["AAPL", "MSFT"], cache, period="1y", provider=provider)
+    assert portfolio.symbols == ["AAPL", "MSFT"]
+    assert not np.isnan(portfolio.prices).any()
+    # ticker.history() continua a ricevere il proprio formato
+    again = CachedTicker("AAPL", cache, provider).history(period="1y")
+    assert again is hist and again.index.tz is not None and "Dividends" in again
+
+
+def test_download_does_not_mix_with_snapshot(tmp_path):
+    pytest.importorskip("pyarrow")
+    provider = DownloadProvider()
+    build_snapshot(["AAPL"], str(tmp_path), provider=provider, period="1y", day=datetime.date.today())
+    cache = DataCache(snapshot=SnapshotStore(str(tmp_path)))
+    assert cache.get("AAPL", "history", {"period": "1y"})[0]
+    portfolio = load_portfolio(["AAPL", "MSFT"], cache, period="1y", provider=provider)
+    assert provider.downloads == [["AAPL", "MSFT"]]
+    assert portfolio.prices.shape == (60, 2)
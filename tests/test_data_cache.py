@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+import data_cache
+from data_cache import DataCache
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(data_cache.time, "time", lambda: now[0])
+    cache = DataCache(ttl={"info": 10})
+    cache.put("aapl", "info", {"price": 1})
+    assert cache.get("AAPL", "info") == (True, {"price": 1})
+    now[0] += 11
+    assert cache.get("AAPL", "info") == (False, None)
+    assert cache.stats()["voci"] == 0
+
+
+def test_lru_eviction_by_bytes():
+    value = np.zeros(1000)
+    nbytes = data_cache.estimate_nbytes(value)
+    cache = DataCache(max_bytes=int(2.5 * nbytes))
+    cache.put("A", "info", value)
+    cache.put("B", "info", value)
+    cache.get("A", "info")  # A diventa la più recente
+    cache.put("C", "info", value)
+    assert cache.get("A", "info")[0]
+    assert not cache.get("B", "info")[0]
+    assert cache.get("C", "info")[0]
+    assert cache.stats()["byte"] <= cache.max_bytes
+
+
+def test_single_flight():
+    cache = DataCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "valore"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("X", "info", fetch)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 5
+    while cache.stats()["attese"] < 7 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == ["valore"] * 8
+
+
+def test_single_flight_error_is_shared():
+    cache = DataCache()
+
+    def fetch():
+        raise RuntimeError("rete")
+
+    for _ in range(2):
+        try:
+            cache.get_or_fetch("X", "info", fetch)
+        except RuntimeError:
+            pass
+    assert cache.stats()["errori"] == 2
+    assert not cache.get("X", "info")[0]
+
+
+def _disk_total(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if f.endswith(".pkl"))
+
+
+def test_disk_tier_tracks_bytes_and_prunes(tmp_path, monkeypatch):
+    cache = DataCache(max_bytes=1, disk_dir=str(tmp_path), disk_max_bytes=100_000)
+    scans = []
+    listdir = os.listdir
+    monkeypatch.setattr(data_cache.os, "listdir", lambda p: scans.append(p) or listdir(p))
+    for i in range(100):
+        cache.put(f"S{i}", "info", np.full(1000, i, dtype=np.float64))
+    assert _disk_total(tmp_path) <= cache.disk_max_bytes
+    assert cache._disk_bytes == _disk_total(tmp_path)
+    assert len(scans) < 100
+    # Le voci più recenti restano leggibili dal disco (la memoria non tiene nulla)
+    found, value = cache.get("S99", "info")
+    assert found and value[0] == 99
+    cache.invalidate("S99")
+    assert cache._disk_bytes == _disk_total(tmp_path)
+    assert not cache.get("S99", "info")[0]
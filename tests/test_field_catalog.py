@@ -0,0 +1,36 @@
+import ast
+import os
+
+from field_catalog import TABLES, find_field, get_field, get_table, tables_for_section
+
+
+def test_tables_are_well_formed():
+    for name, table in TABLES.items():
+        assert table.rows, name
+        assert all(len(row) == len(table.columns) for row in table.rows), name
+
+
+def test_every_table_used_by_the_guide_exists():
+    with open(os.path.join(os.path.dirname(__file__), "..", "guida.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    used = {node.args[0].value for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "get_table"}
+    assert used and used <= set(TABLES)
+
+
+def test_frames_are_built_once():
+    frame = get_table("data_fields")
+    assert get_table("data_fields") is frame
+    assert list(frame.columns) == list(TABLES["data_fields"].columns)
+    assert len(frame) == len(TABLES["data_fields"].rows)
+
+
+def test_lookups():
+    assert tables_for_section("💰 Ratios Finanziari") == ("valuation_ratios", "profitability_ratios",
+                                                          "liquidity_ratios")
+    assert tables_for_section("inesistente") == ()
+    assert get_field("data_fields", "symbol")["esempio"] == "AAPL"
+    # fiftyDayAverage è documentato sia nei dati di trading sia nell'analisi tecnica
+    assert {name for name, _ in find_field("fiftyDayAverage")} == {"technical_data", "ma_data"}
+    # Le tabelle senza colonna "campo" usano la prima colonna come chiave
+    assert get_field("periods_info", "1d")["descrizione"] == "1 giorno"
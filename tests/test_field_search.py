@@ -0,0 +1,71 @@
+from field_catalog import Table
+from field_search import (DESCRIPTION_WEIGHT, EXACT, FUZZY, KEY_WEIGHT, PREFIX, TEXT_WEIGHT, FieldIndex,
+                          search_fields, tokenize)
+
+TABLES = {
+    "info": Table(
+        section="Base",
+        columns=("campo", "descrizione", "note"),
+        rows=(
+            ("trailingPE", "Rapporto prezzo/utili", "Multiplo più usato"),
+            ("forwardPE", "Prezzo/utili stimato", None),
+            ("dividendYield", "Rendimento del dividendo", "Utile per il reddito"),
+            ("priceToBook", "Prezzo su valore contabile", "Confronto con il book value"),
+        ),
+    ),
+    "options": Table(
+        section="Opzioni",
+        columns=("campo", "descrizione"),
+        rows=(("impliedVolatility", "Volatilità implicita"),),
+    ),
+}
+
+
+def _names(results):
+    return [row["campo"] for _, _, row, _ in results]
+
+
+def test_tokenize_splits_camel_case_and_accents():
+    assert tokenize("trailingPE") == ["trailingpe", "trailing", "pe"]
+    assert tokenize("Volatilità implicita") == ["volatilita", "implicita"]
+    assert tokenize("priceToBook, P/E") == ["pricetobook", "price", "to", "book", "p", "e"]
+    assert tokenize(None) == []
+
+
+def test_field_name_outranks_description_and_text():
+    index = FieldIndex(TABLES)
+    results = index.search("book")
+    # priceToBook: nome del campo (peso pieno) prima del solo testo libero
+    assert _names(results) == ["priceToBook"]
+    assert results[0][3] == KEY_WEIGHT * EXACT
+    results = index.search("prezzo")
+    assert [r[3] for r in results] == [DESCRIPTION_WEIGHT * EXACT] * 3
+    # A parità di punteggio vale l'ordine del catalogo
+    assert _names(results) == ["trailingPE", "forwardPE", "priceToBook"]
+    assert index.search("multiplo")[0][3] == TEXT_WEIGHT * EXACT
+
+
+def test_exact_beats_prefix_beats_fuzzy():
+    index = FieldIndex(TABLES)
+    assert index.search("pe")[0][3] == KEY_WEIGHT * EXACT
+    prefix = index.search("divid")
+    assert _names(prefix) == ["dividendYield"] and prefix[0][3] == KEY_WEIGHT * PREFIX
+    fuzzy = index.search("implicta")  # una lettera mancante
+    assert _names(fuzzy) == ["impliedVolatility"] and fuzzy[0][3] == DESCRIPTION_WEIGHT * FUZZY
+    assert index.search("volatlità")[0][1] == "Opzioni"
+
+
+def test_all_terms_must_match_and_scores_add_up():
+    index = FieldIndex(TABLES)
+    results = index.search("prezzo utili")
+    assert _names(results) == ["trailingPE", "forwardPE"]
+    assert results[0][3] == 2 * DESCRIPTION_WEIGHT
+    assert index.search("prezzo dividendo") == []
+    assert index.search("  ,; ") == []
+    assert len(index.search("p", limit=2)) <= 2
+
+
+def test_search_over_the_guide_catalog():
+    results = search_fields("dividend yield")
+    assert results and results[0][2]["campo"] == "dividendYield"
+    assert search_fields("volatilita")
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import SyntheticProvider
+from data_cache import DataCache
+from fundamentals import FundamentalsPanel, load_fundamentals
+
+QUARTERS = pd.to_datetime(["2024-03-31", "2023-12-31", "2023-09-30", "2023-06-30",
+                           "2023-03-31", "2022-12-31"])
+
+
+class QuarterlyProvider(SyntheticProvider):
+    """Sei trimestri, come restituisce tipicamente Yahoo; ricavi +10% anno su anno"""
+
+    def statement(self, symbol, name):
+        revenue = np.array([110.0, 105.0, 104.0, 102.0, 100.0, 95.0])
+        if name == "quarterly_financials":
+            return pd.DataFrame([revenue, revenue * 0.2, revenue * 0.3],
+                                index=["Total Revenue", "Net Income", "Gross Profit"], columns=QUARTERS)
+        if name == "quarterly_cashflow":
+            return pd.DataFrame([revenue * 0.25, -revenue * 0.05],
+                                index=["Operating Cash Flow", "Capital Expenditure"], columns=QUARTERS)
+        if name == "quarterly_balance_sheet":
+            return pd.DataFrame([[50.0] * 6, [25.0] * 6, [400.0] * 6],
+                                index=["Current Assets", "Current Liabilities", "Stockholders Equity"],
+                                columns=QUARTERS)
+        return super().statement(symbol, name)
+
+
+def test_quarterly_growth_with_default_periods():
+    panel = load_fundamentals(["AAPL"], DataCache(), frequency="quarterly", provider=QuarterlyProvider())
+    frame = panel.ratios_frame()
+    assert frame.loc["AAPL", "revenueGrowth"] == pytest.approx(0.10)
+    assert frame.loc["AAPL", "earningsGrowth"] == pytest.approx(0.10)
+    assert frame.loc["AAPL", "fcfGrowth"] == pytest.approx(0.10)
+    assert frame.loc["AAPL", "periodEnd"] == QUARTERS[0]
+    # Secondo trimestre: base 2022-12-31
+    assert panel.compute_ratios()["revenueGrowth"][0, 1] == pytest.approx(105 / 95 - 1)
+
+
+def test_periods_cover_the_growth_lag():
+    statements = {"X": [QuarterlyProvider().statement("X", "quarterly_financials")]}
+    panel = FundamentalsPanel.from_statements(statements, periods=2, frequency="quarterly")
+    assert panel.values.shape[1] == 5
+    assert panel.compute_ratios()["revenueGrowth"][0, 0] == pytest.approx(0.10)
+
+
+def test_annual_ratios():
+    panel = load_fundamentals(["AAPL", "MSFT"], DataCache(), provider=SyntheticProvider())
+    ratios = panel.compute_ratios()
+    revenue = panel.item("Total Revenue")
+    np.testing.assert_allclose(ratios["revenueGrowth"][:, :3], revenue[:, :3] / revenue[:, 1:] - 1)
+    assert np.isnan(ratios["revenueGrowth"][:, 3]).all()
+    fcf = panel.item("Operating Cash Flow") - np.abs(panel.item("Capital Expenditure"))
+    np.testing.assert_allclose(ratios["fcfMargin"], fcf / revenue)
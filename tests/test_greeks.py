@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+import pytest
+
+from greeks import bs_greeks, bs_price, implied_volatility, norm_cdf
+
+S, R, Q = 100.0, 0.03, 0.01
+STRIKES = np.linspace(50.0, 200.0, 61)
+TIMES = np.array([7 / 365, 0.25, 1.0])[:, None]
+
+
+def _intrinsic(K, T, is_call):
+    forward_gap = S * np.exp(-Q * T) - K * np.exp(-R * T)
+    return np.maximum(forward_gap if is_call else -forward_gap, 0.0)
+
+
+def test_norm_cdf_double_precision():
+    x = np.linspace(-37.0, 8.0, 20001)
+    expected = np.array([0.5 * math.erfc(-v / math.sqrt(2.0)) for v in x])
+    np.testing.assert_allclose(norm_cdf(x), expected, rtol=1e-14, atol=1e-300)
+    assert norm_cdf(np.inf) == 1.0 and norm_cdf(-np.inf) == 0.0 and np.isnan(norm_cdf(np.nan))
+
+
+def test_reference_price():
+    # Hull: S=K=100, T=1, r=5%, sigma=20%
+    assert bs_price(100, 100, 1.0, 0.05, 0.2) == pytest.approx(10.450583572185565, rel=1e-12)
+    assert bs_price(100, 100, 1.0, 0.05, 0.2, is_call=False) == pytest.approx(5.573526022256971, rel=1e-12)
+
+
+def test_put_call_parity():
+    call = bs_price(S, STRIKES, TIMES, R, 0.3, True, Q)
+    put = bs_price(S, STRIKES, TIMES, R, 0.3, False, Q)
+    np.testing.assert_allclose(call - put, S * np.exp(-Q * TIMES) - STRIKES * np.exp(-R * TIMES),
+                               atol=1e-11)
+
+
+@pytest.mark.parametrize("sigma", [0.1, 0.2, 0.5, 1.0])
+@pytest.mark.parametrize("is_call", [True, False])
+def test_implied_volatility_round_trip(sigma, is_call):
+    price = bs_price(S, STRIKES, TIMES, R, sigma, is_call, Q)
+    iv = implied_volatility(price, S, STRIKES, TIMES, R, is_call, Q)
+    # Serve un minimo di valore temporale perché la volatilità sia identificabile
+    known = price - _intrinsic(STRIKES, TIMES, is_call) > 1e-6
+    assert known.sum() > 20
+    np.testing.assert_allclose(iv[known], sigma, atol=1e-8)
+
+
+def test_implied_volatility_bounds_and_scalars():
+    assert implied_volatility(10.450583572185565, 100, 100, 1.0, 0.05) == pytest.approx(0.2, abs=1e-10)
+    assert np.shape(implied_volatility(10.45, 100, 100, 1.0, 0.05)) == ()
+    # Sotto il valore intrinseco, sopra il sottostante o mancante: NaN
+    iv = implied_volatility([1.0, 101.0, np.nan, 0.0], 100, 90, 0.5)
+    assert np.isnan(iv).all()
+
+
+def test_greeks_match_finite_differences():
+    K, T, sigma = np.array([80.0, 100.0, 120.0]), 0.5, 0.25
+    for is_call in (True, False):
+        g = bs_greeks(S, K, T, R, sigma, is_call, Q)
+
+        def price(s=S, t=T, r=R, v=sigma):
+            return bs_price(s, K, t, r, v, is_call, Q)
+
+        h = 1e-4  # differenze centrali: errore O(h^2) ben sotto le tolleranze
+        np.testing.assert_allclose(g["delta"], (price(s=S + h) - price(s=S - h)) / (2 * h), rtol=1e-6)
+        np.testing.assert_allclose(g["gamma"], (price(s=S + 0.1) - 2 * price() + price(s=S - 0.1)) / 0.01,
+                                   rtol=1e-4)
+        np.testing.assert_allclose(g["vega"], (price(v=sigma + h) - price(v=sigma - h)) / (2 * h) / 100,
+                                   rtol=1e-6)
+        np.testing.assert_allclose(g["rho"], (price(r=R + h) - price(r=R - h)) / (2 * h) / 100, rtol=1e-6)
+        np.testing.assert_allclose(g["theta"], -(price(t=T + h) - price(t=T - h)) / (2 * h) / 365,
+                                   rtol=1e-6)
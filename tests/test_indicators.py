@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import SyntheticProvider
+from indicators import (bollinger_bands, compute_indicators, ema, indicators_frame, indicators_panel,
+                        rolling_max, rolling_mean, rolling_std, rsi, true_range)
+
+
+@pytest.fixture(scope="module")
+def hist():
+    return SyntheticProvider(bars=260).history("AAPL", period="1y")
+
+
+@pytest.fixture(scope="module")
+def closes():
+    # Secondo titolo quotato più tardi e con un buco: i NaN non devono contaminare il resto
+    provider = SyntheticProvider(bars=260)
+    frame = pd.DataFrame({s: provider.history(s, period="1y")["Close"] for s in ("AAPL", "MSFT")})
+    frame.iloc[:40, 1] = np.nan
+    frame.iloc[100, 1] = np.nan
+    return frame
+
+
+def test_rolling_matches_pandas(closes):
+    values = closes.to_numpy()
+    for window in (1, 5, 20, 200):
+        np.testing.assert_allclose(rolling_mean(values, window), closes.rolling(window).mean(), rtol=1e-10)
+        np.testing.assert_allclose(rolling_std(values, window), closes.rolling(window).std(), rtol=1e-8)
+        np.testing.assert_allclose(rolling_max(values, window), closes.rolling(window).max())
+    np.testing.assert_allclose(rolling_std(values, 20, ddof=0), closes.rolling(20).std(ddof=0), rtol=1e-8)
+    # Finestra più lunga della serie: tutto NaN
+    assert np.isnan(rolling_mean(values, 300)).all()
+
+
+def test_std_is_stable_on_large_prices():
+    x = 1e6 + np.sin(np.arange(500.0))
+    np.testing.assert_allclose(rolling_std(x, 30), pd.Series(x).rolling(30).std(), rtol=1e-7)
+
+
+def test_ema_matches_pandas(closes):
+    for span in (3, 12, 26):
+        # Un buco non fa decadere i pesi: equivale a ignore_na=True
+        expected = closes.ewm(span=span, adjust=False, ignore_na=True).mean()
+        np.testing.assert_allclose(ema(closes.to_numpy(), span), expected, rtol=1e-10)
+
+
+def test_rsi_and_bollinger_match_pandas(hist):
+    close = hist["Close"]
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta).clip(lower=0).rolling(14).mean()
+    np.testing.assert_allclose(rsi(close.to_numpy()), 100 - 100 / (1 + gain / loss), rtol=1e-8)
+
+    mid, upper, lower = bollinger_bands(close.to_numpy(), 20, 2.0)
+    std = close.rolling(20).std(ddof=0)
+    np.testing.assert_allclose(mid, close.rolling(20).mean(), rtol=1e-10)
+    np.testing.assert_allclose(upper, close.rolling(20).mean() + 2 * std, rtol=1e-8)
+    np.testing.assert_allclose(lower, close.rolling(20).mean() - 2 * std, rtol=1e-8)
+
+
+def test_stochastic_atr_and_macd(hist):
+    out = indicators_frame(hist)
+    high, low, close = hist["High"], hist["Low"], hist["Close"]
+    lowest, highest = low.rolling(14).min(), high.rolling(14).max()
+    stoch_k = (close - lowest) / (highest - lowest) * 100
+    np.testing.assert_allclose(out["STOCH_K"], stoch_k, rtol=1e-10)
+    np.testing.assert_allclose(out["STOCH_D"], stoch_k.rolling(3).mean(), rtol=1e-8)
+
+    prev = close.shift()
+    tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    np.testing.assert_allclose(true_range(high, low, close)[:, 0], tr, rtol=1e-12)
+    np.testing.assert_allclose(out["ATR"], tr.rolling(14).mean(), rtol=1e-8)
+
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(out["MACD"], macd, rtol=1e-8)
+    np.testing.assert_allclose(out["MACD_signal"], macd.ewm(span=9, adjust=False).mean(), rtol=1e-8)
+    vol = close.pct_change().rolling(30).std() * np.sqrt(252)
+    np.testing.assert_allclose(out["volatility"], vol, rtol=1e-8)
+
+
+def test_panel_equals_per_symbol(closes):
+    panel = indicators_panel(closes)
+    for symbol in closes:
+        single = compute_indicators(closes[symbol].to_numpy())
+        for name in ("MA_20", "RSI", "MACD", "BB_upper", "volatility"):
+            np.testing.assert_allclose(panel[name][symbol], single[name], rtol=1e-10, err_msg=name)
+    assert list(panel["MA_50"].columns) == ["AAPL", "MSFT"]
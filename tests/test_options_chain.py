@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from bench import SyntheticProvider
+from data_cache import DataCache
+from options_chain import KEY_COLUMNS, calls_puts, load_chains
+
+
+class FlakyChains(SyntheticProvider):
+    """Una scadenza in errore per AAPL e nessuna scadenza leggibile per BAD"""
+
+    def options(self, symbol):
+        if symbol == "BAD":
+            raise ConnectionError("scadenze non disponibili")
+        return super().options(symbol)
+
+    def option_chain(self, symbol, date=None):
+        if symbol == "AAPL" and date == "2024-07-12":
+            raise ConnectionError("timeout")
+        chain = super().option_chain(symbol, date)
+        chain.calls["volume"] = chain.calls["volume"].where(chain.calls.index % 7 != 0)  # NaN come Yahoo
+        chain.calls["contractSize"] = "REGULAR"
+        return chain
+
+
+def test_compact_dtypes_and_index():
+    table = load_chains(["aapl", "MSFT"], provider=SyntheticProvider())
+    assert list(table.index.names) == KEY_COLUMNS
+    assert table.index.is_monotonic_increasing and table.index.is_unique
+    assert table["bid"].dtype == np.float32 and table["impliedVolatility"].dtype == np.float32
+    assert table["volume"].dtype == "UInt32" and table["openInterest"].dtype == "UInt32"
+    assert table["inTheMoney"].dtype == "boolean"
+    assert isinstance(table.index.get_level_values("symbol").dtype, pd.CategoricalDtype)
+    assert list(table.index.get_level_values("type").categories) == ["call", "put"]
+    # 2 simboli x 8 scadenze x 40 strike x (call + put)
+    assert len(table) == 2 * 8 * 40 * 2 and table.attrs["errors"] == []
+
+
+def test_values_survive_compaction():
+    provider = SyntheticProvider()
+    raw = provider.option_chain("AAPL", "2024-07-05").calls
+    calls, puts = calls_puts(load_chains("AAPL", provider=provider, expirations=["2024-07-05"]), "aapl")
+    assert len(calls) == len(puts) == len(raw)
+    np.testing.assert_allclose(calls["bid"].to_numpy(np.float64), raw["bid"], rtol=1e-6)
+    np.testing.assert_array_equal(calls["volume"].to_numpy(np.int64), raw["volume"].round())
+    assert calls.index.get_level_values("expiry").unique().tolist() == [pd.Timestamp("2024-07-05")]
+
+
+def test_errors_are_collected_not_raised():
+    table = load_chains(["AAPL", "BAD"], cache=DataCache(), provider=FlakyChains())
+    errors = sorted(table.attrs["errors"], key=lambda e: e[0])
+    assert [(s, e) for s, e, _ in errors] == [("AAPL", "2024-07-12"), ("BAD", None)]
+    assert table.index.get_level_values("expiry").nunique() == 7
+    # Volumi mancanti restano <NA>, senza diventare float
+    assert table["volume"].dtype == "UInt32" and table["volume"].isna().any()
+    assert isinstance(table["contractSize"].dtype, pd.CategoricalDtype)
+
+
+def test_empty_result_keeps_the_key_index():
+    table = load_chains(["BAD"], provider=FlakyChains())
+    assert table.empty and list(table.index.names) == KEY_COLUMNS
+    assert table.attrs["errors"][0][0] == "BAD"
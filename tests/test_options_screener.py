@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import SyntheticProvider
+from options_chain import load_chains
+from options_screener import ChainScreener
+
+SPOT = {"AAPL": 100.0, "MSFT": 80.0}
+
+
+@pytest.fixture(scope="module")
+def table():
+    return load_chains(["AAPL", "MSFT"], provider=SyntheticProvider())
+
+
+@pytest.fixture(scope="module")
+def frame(table):
+    frame = table.reset_index()
+    frame["moneyness"] = frame["strike"] / frame["symbol"].astype(str).map(SPOT)
+    frame["iv_rank"] = frame.groupby("symbol", observed=True)["impliedVolatility"].rank(pct=True) * 100
+    return frame
+
+
+def _expected(table, mask):
+    return table.iloc[np.flatnonzero(mask.to_numpy())]
+
+
+@pytest.mark.parametrize("filters", [
+    {"moneyness": (0.95, 1.05)},
+    {"moneyness": (0.9, None), "min_volume": 1000, "option_type": "put"},
+    {"strike": (60, 90), "min_open_interest": 5000, "symbol": "msft"},
+    {"iv_rank": (80, None), "expiry": "2024-07-19"},
+    {"min_volume": 4000, "iv_rank": (None, 50), "moneyness": (1.0, 1.2)},
+])
+def test_query_matches_boolean_mask(table, frame, filters):
+    screener = ChainScreener(table, spot=SPOT)
+    mask = pd.Series(True, index=frame.index)
+    for name, column in (("moneyness", "moneyness"), ("strike", "strike"), ("iv_rank", "iv_rank")):
+        if name in filters:
+            low, high = filters[name]
+            if low is not None:
+                mask &= frame[column] >= low
+            if high is not None:
+                mask &= frame[column] <= high
+    if "min_volume" in filters:
+        mask &= frame["volume"].fillna(0).astype(float) >= filters["min_volume"]
+    if "min_open_interest" in filters:
+        mask &= frame["openInterest"].fillna(0).astype(float) >= filters["min_open_interest"]
+    if "option_type" in filters:
+        mask &= frame["type"] == filters["option_type"]
+    if "expiry" in filters:
+        mask &= frame["expiry"] == pd.Timestamp(filters["expiry"])
+    if "symbol" in filters:
+        mask &= frame["symbol"] == filters["symbol"].upper()
+    out = screener.query(**filters)
+    assert len(out) > 0
+    pd.testing.assert_frame_equal(out, _expected(table, mask))
+
+
+def test_shortcuts_and_missing_index(table):
+    screener = ChainScreener(table, spot=100.0)
+    near = screener.near_money(0.05, option_type="call")
+    assert ((near.index.get_level_values("strike") >= 95) & (near.index.get_level_values("strike") <= 105)).all()
+    liquid = screener.liquid(min_volume=2500)
+    assert (liquid["volume"].astype(float) >= 2500).all()
+    assert len(screener.query()) == len(table)
+    with pytest.raises(ValueError):
+        ChainScreener(table).query(moneyness=(0.9, 1.1))  # senza spot non c'è moneyness
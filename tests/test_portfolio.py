@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench import SyntheticProvider
+from portfolio import (Portfolio, RollingCovariance, beta, correlation, covariance, historical_cvar,
+                       historical_var, portfolio_returns, portfolio_volatility, rolling_covariance)
+
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "NEW"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    # Rendimenti con buchi sparsi e un titolo quotato da metà periodo
+    provider = SyntheticProvider(bars=260)
+    prices = pd.DataFrame({s: provider.history(s, period="1y")["Close"] for s in SYMBOLS})
+    prices.iloc[:130, 3] = np.nan
+    prices.iloc[[20, 21, 90], 1] = np.nan
+    return prices.pct_change(fill_method=None)
+
+
+def test_covariance_and_correlation_match_pandas(frame):
+    r = frame.to_numpy()
+    np.testing.assert_allclose(covariance(r), frame.cov(), rtol=1e-9)
+    np.testing.assert_allclose(correlation(r), frame.corr(), rtol=1e-9)
+    np.testing.assert_allclose(covariance(r, min_periods=200), frame.cov(min_periods=200), rtol=1e-9)
+
+
+def test_rolling_covariance_matches_windows(frame):
+    r = frame.to_numpy()
+    window = 40
+    seen = 0
+    for t, cov in rolling_covariance(r, window, step=7):
+        expected = frame.iloc[t + 1 - window:t + 1].cov(min_periods=window)
+        np.testing.assert_allclose(cov, expected, rtol=1e-8, atol=1e-16)
+        seen += 1
+    assert seen == len(range(window - 1, len(r), 7))
+
+    # Risincronizzazione periodica e aggiornamento dopo from_returns
+    rolling = RollingCovariance(4, window, min_periods=10, resync=25)
+    for row in r:
+        rolling.update(row)
+    np.testing.assert_allclose(rolling.correlation(), frame.iloc[-window:].corr(min_periods=10),
+                               rtol=1e-8)
+    warm = RollingCovariance.from_returns(r[:-5], window, min_periods=10)
+    for row in r[-5:]:
+        warm.update(row)
+    np.testing.assert_allclose(warm.covariance(), rolling.covariance(), rtol=1e-8, atol=1e-16)
+
+
+def test_portfolio_volatility(frame):
+    cov = frame.cov().to_numpy()
+    w = np.array([0.5, 0.3, 0.2, 0.0])
+    assert portfolio_volatility(w, cov, annualize=False) == pytest.approx(np.sqrt(w @ cov @ w))
+    batch = portfolio_volatility(np.vstack([w, w[::-1]]), cov)
+    assert batch.shape == (2,) and batch[0] == pytest.approx(np.sqrt(w @ cov @ w * 252))
+
+
+def test_portfolio_volatility_unknown_pair_is_nan():
+    # Due titoli senza date comuni: la loro covarianza è ignota, non zero
+    r = np.array([[0.01, np.nan], [0.02, np.nan], [-0.01, np.nan],
+                  [np.nan, 0.03], [np.nan, -0.02], [np.nan, 0.01]])
+    cov = covariance(r)
+    assert np.isnan(cov[0, 1])
+    assert np.isnan(portfolio_volatility([0.5, 0.5], cov))
+    assert portfolio_volatility([1.0, 0.0], cov) == pytest.approx(np.sqrt(cov[0, 0] * 252))
+
+
+def test_portfolio_returns_redistribute_missing_weights():
+    r = np.array([[0.01, 0.03], [0.02, np.nan], [np.nan, np.nan]])
+    out = portfolio_returns(r, np.array([0.5, 0.5]))
+    np.testing.assert_allclose(out[:2], [0.02, 0.02])
+    assert np.isnan(out[2])
+
+
+def test_beta_and_tail_risk(frame):
+    bench = frame["AAPL"]
+    b = beta(frame.to_numpy(), bench.to_numpy())
+    expected = [frame[s].cov(bench) / bench[frame[s].notna()].var() for s in SYMBOLS]
+    np.testing.assert_allclose(b, expected, rtol=1e-9)
+    rolling = beta(frame.to_numpy(), bench.to_numpy(), window=30)
+    i = 200
+    window = frame.iloc[i - 29:i + 1]
+    assert rolling[i, 1] == pytest.approx(window["MSFT"].cov(window["AAPL"]) / window["AAPL"].var())
+
+    var = historical_var(frame.to_numpy())
+    np.testing.assert_allclose(var, -frame.quantile(0.05), rtol=1e-12)
+    cvar = historical_cvar(frame.to_numpy())
+    aapl = frame["AAPL"].dropna()
+    assert cvar[0] == pytest.approx(-aapl[aapl <= -var[0]].mean())
+    assert (cvar >= var).all()
+
+
+def test_portfolio_report(frame):
+    prices = (1 + frame.fillna(0)).cumprod() * 100
+    prices.iloc[:130, 3] = np.nan
+    portfolio = Portfolio(prices)
+    report = portfolio.risk_report(weights={"AAPL": 0.6, "MSFT": 0.4}, benchmark=prices["GOOG"])
+    assert list(report.index) == SYMBOLS + ["PORTAFOGLIO"]
+    assert report.loc["AAPL", "volatility"] == pytest.approx(frame["AAPL"].std() * np.sqrt(252), rel=1e-9)
+    assert report.loc["GOOG", "beta"] == pytest.approx(1.0)
+    assert np.isfinite(report.loc["PORTAFOGLIO"]).all()
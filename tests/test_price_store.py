@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PRICE_COLUMNS, PriceStore, initial_period, to_utc_ns
+
+
+def _bars(start, periods, base=100.0, tz="America/New_York"):
+    index = pd.bdate_range(start, periods=periods, tz=tz, name="Date")
+    close = base + np.arange(periods, dtype=np.float64)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(periods, 1000.0)}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path), fetch=None)
+
+
+def test_append_load_round_trip(store):
+    hist = _bars("2024-01-02", 10)
+    assert store.append("aapl", "1d", hist) == 10
+    loaded = store.load("AAPL", "1d")
+    pd.testing.assert_frame_equal(loaded[list(PRICE_COLUMNS)], hist, check_freq=False, check_index_type=False)
+    assert str(loaded.index.tz) == "America/New_York"
+
+
+def test_tail_append_replaces_last_bar(store):
+    store.append("X", "1d", _bars("2024-01-02", 5))
+    tail = _bars("2024-01-08", 3, base=500.0)  # prima barra = ultima salvata
+    store.append("X", "1d", tail)
+    loaded = store.load("X", "1d")
+    assert len(loaded) == 7
+    assert loaded["Close"].iloc[4] == 500.0
+    assert loaded["Close"].iloc[:4].tolist() == [100.0, 101.0, 102.0, 103.0]
+
+
+def test_mid_range_chunk_is_merged(store):
+    store.append("X", "1d", _bars("2024-01-02", 10))
+    view = store.columns("X", "1d")["Close"]
+    before = np.array(view)
+    store.append("X", "1d", _bars("2024-01-04", 3, base=900.0))
+    loaded = store.load("X", "1d")
+    # Le barre successive al blocco non vanno perse
+    assert len(loaded) == 10
+    assert loaded["Close"].iloc[2:5].tolist() == [900.0, 901.0, 902.0]
+    assert loaded["Close"].iloc[5:].tolist() == before[5:].tolist()
+    # La vista già aperta resta valida con i dati precedenti
+    np.testing.assert_array_equal(view, before)
+
+
+def test_older_chunk_is_prepended(store):
+    store.append("X", "1d", _bars("2024-02-01", 5))
+    store.append("X", "1d", _bars("2024-01-02", 3, base=50.0))
+    loaded = store.load("X", "1d")
+    assert len(loaded) == 8
+    assert loaded.index.is_monotonic_increasing
+
+
+def test_date_only_bounds_in_exchange_time(store):
+    store.append("X", "1d", _bars("2024-01-02", 10))
+    loaded = store.load("X", "1d", start="2024-01-03", end="2024-01-05")
+    assert [d.day for d in loaded.index] == [3, 4, 5]
+
+
+def test_to_utc_ns_end_of_day():
+    start = to_utc_ns("2024-03-10", "America/New_York")
+    end = to_utc_ns("2024-03-10", "America/New_York", end=True)
+    # Giorno del cambio d'ora: 23 ore
+    assert end - start == 23 * 3600 * 10**9 - 1
+    assert to_utc_ns("2024-03-10 12:00", "America/New_York", end=True) == \
+        pd.Timestamp("2024-03-10 16:00", tz="UTC").value
+
+
+def test_initial_period_by_interval():
+    assert initial_period("1m") == "7d"
+    assert initial_period("5m") == "60d"
+    assert initial_period("90m") == "60d"
+    assert initial_period("1d") == "5y"
+
+
+def test_refresh_fetches_only_missing_tail(tmp_path):
+    calls = []
+    full = _bars("2024-01-02", 10)
+
+    def fetch(symbol, interval, start=None, period=None):
+        calls.append((start, period))
+        return full if start is None else full[full.index >= start]
+
+    store = PriceStore(str(tmp_path), fetch=fetch)
+    assert store.refresh("X", "1m") == 10
+    assert calls[0] == (None, "7d")
+    store.refresh("X", "1m")
+    assert calls[1][0] == full.index[-1]
+    assert store.count("X", "1m") == 10
+
+
+def test_history_skips_network_while_tail_is_fresh(tmp_path, monkeypatch):
+    import price_store
+
+    calls = []
+    full = _bars("2024-01-02", 10)
+    last = full.index[-1].tz_convert("UTC").timestamp()
+
+    def fetch(symbol, interval, start=None, period=None):
+        calls.append(start)
+        return full if start is None else full[full.index >= start]
+
+    now = [last + 3600]  # durante la seduta dell'ultima barra
+    monkeypatch.setattr(price_store.time, "time", lambda: now[0])
+    store = PriceStore(str(tmp_path), fetch=fetch)
+    store.history("X")
+    store.history("X")
+    assert len(calls) == 1
+    # Barra parziale: riletta solo dopo refresh_age
+    now[0] += price_store.REFRESH_AGE + 1
+    assert store.stale("X")
+    store.history("X")
+    assert len(calls) == 2
+    # Nuova seduta: si riscarica subito, poi di nuovo solo dopo refresh_age
+    now[0] = last + 86400 + 1
+    assert store.stale("X")
+    store.history("X")
+    now[0] += 10
+    assert not store.stale("X")
+    store.history("X")
+    assert len(calls) == 3
+    assert store.history("X", refresh=False).shape[0] == 10
@@ -0,0 +1,81 @@
+import time
+
+import pandas as pd
+import pytest
+
+from bench import SyntheticProvider
+from providers import (FixtureMissing, FixtureProvider, RecordingProvider, ScheduledProvider,
+                       YFinanceProvider, fixture_path, provider_from_env)
+from scheduler import RequestScheduler
+
+
+def test_record_then_replay(tmp_path):
+    live = SyntheticProvider(bars=30)
+    recorder = RecordingProvider(live, str(tmp_path))
+    hist = recorder.history("aapl", period="1mo")
+    info = recorder.info("AAPL")
+    recorder.statement("AAPL", "financials")
+    recorder.download(["AAPL", "MSFT"], period="1mo")
+
+    replay = FixtureProvider(str(tmp_path))
+    pd.testing.assert_frame_equal(replay.history("AAPL", period="1mo"), hist)
+    assert replay.info("aapl") == info
+    assert not replay.statement("AAPL", "financials").empty
+    frames = replay.download(["AAPL", "MSFT", "GOOG"], period="1mo")
+    assert len(frames["MSFT"]) == 30 and frames["GOOG"].empty
+    # Parametri diversi, fixture diversa
+    with pytest.raises(FixtureMissing):
+        replay.history("AAPL", period="1y")
+    with pytest.raises(FixtureMissing):
+        replay.options("AAPL")
+
+
+def test_fixture_path_ignores_param_order(tmp_path):
+    a = fixture_path(str(tmp_path), " aapl", "history", {"period": "1y", "interval": "1d"})
+    b = fixture_path(str(tmp_path), "AAPL", "history", {"interval": "1d", "period": "1y"})
+    assert a == b and a.startswith(str(tmp_path / "AAPL"))
+    assert fixture_path(str(tmp_path), "AAPL", "info").endswith("info.pkl")
+
+
+def test_fixture_latency_per_endpoint(tmp_path):
+    RecordingProvider(SyntheticProvider(), str(tmp_path)).info("AAPL")
+    provider = FixtureProvider(str(tmp_path), latency=0.0, endpoint_latency={"info": 0.2})
+    started = time.perf_counter()
+    provider.info("AAPL")
+    assert time.perf_counter() - started >= 0.2
+
+
+def test_provider_from_env(tmp_path):
+    fixtures = provider_from_env({"GUIDA_FIXTURES_DIR": str(tmp_path), "GUIDA_FIXTURES_LATENCY": "0.5"})
+    assert isinstance(fixtures, FixtureProvider) and fixtures.latency == 0.5
+    live = provider_from_env({"GUIDA_RATE_LIMIT": "2"})
+    assert isinstance(live, ScheduledProvider) and isinstance(live.inner, YFinanceProvider)
+    assert live.scheduler.bucket.rate == 2.0
+    recording = provider_from_env({"GUIDA_RECORD_DIR": str(tmp_path)})
+    assert isinstance(recording, RecordingProvider) and isinstance(recording.inner, ScheduledProvider)
+
+
+def test_scheduled_provider_routes_every_call():
+    scheduler = RequestScheduler(rate=1000, burst=1000)
+    costs = []
+    acquire = scheduler.bucket.acquire
+    scheduler.bucket.acquire = lambda cost=1.0: costs.append(cost) or acquire(cost)
+    provider = ScheduledProvider(SyntheticProvider(bars=20), scheduler)
+    assert len(provider.history(" aapl", period="1mo")) == 20
+    provider.info("AAPL")
+    frames = provider.download(["AAPL", "MSFT", "GOOG"], period="1mo")
+    assert sorted(frames) == ["AAPL", "GOOG", "MSFT"]
+    # Il download batch consuma un token per simbolo
+    assert costs == [1.0, 1.0, 3]
+    assert scheduler.stats()["richieste"] == 3
+
+
+def test_default_download_isolates_failures():
+    class Partial(SyntheticProvider):
+        def history(self, symbol, **params):
+            if symbol == "BAD":
+                raise ValueError("simbolo inesistente")
+            return super().history(symbol, **params)
+
+    frames = Partial(bars=10).download(["AAPL", "BAD"], period="1mo")
+    assert len(frames["AAPL"]) == 10 and frames["BAD"].empty
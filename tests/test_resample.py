@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bars import Bars
+from resample import DEFAULT_TIMEFRAMES, MultiTimeframe, aggregate, resample_frame
+
+TZ = "America/New_York"
+
+
+def _minutes(start="2024-03-04", end="2024-03-22", scale=None):
+    """Barre da 1 minuto delle sedute 9:30-16:00, a cavallo del cambio d'ora del 10 marzo"""
+    days = pd.bdate_range(start, end)
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f"{day:%Y-%m-%d} 09:30", periods=390, freq="min", tz=TZ).as_unit("ns").asi8
+        for day in days
+    ])).tz_localize("UTC").tz_convert(TZ)
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 5e-4, len(index))))
+    spread = np.abs(rng.normal(0, 0.05, len(index)))
+    frame = pd.DataFrame({"Open": close + rng.normal(0, 0.02, len(index)), "High": close + spread,
+                          "Low": close - spread, "Close": close,
+                          "Volume": rng.integers(100, 10_000, len(index)).astype(float)}, index=index)
+    return Bars.from_frame(frame, scale=scale, symbol="AAPL"), frame
+
+
+def _assert_same(a, b):
+    np.testing.assert_array_equal(a.ts, b.ts)
+    np.testing.assert_array_equal(a.prices, b.prices)
+    np.testing.assert_array_equal(a.volume, b.volume)
+
+
+@pytest.mark.parametrize("timeframe", ["5m", "1h", "1d", "1wk"])
+def test_aggregate_matches_pandas_resample(timeframe):
+    bars, frame = _minutes()
+    rule = {"5m": "5min", "1h": "60min", "1d": "1D", "1wk": "W-MON"}[timeframe]
+    kwargs = {"label": "left", "closed": "left"} if timeframe == "1wk" else {}
+    expected = frame.astype(np.float32).resample(rule, **kwargs).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}).dropna()
+    out = aggregate(bars, timeframe).to_frame(tz=True)
+    assert out.index.equals(expected.index.as_unit("ns").rename("Datetime"))
+    np.testing.assert_array_equal(out[["Open", "High", "Low", "Close"]],
+                                  expected[["Open", "High", "Low", "Close"]])
+    np.testing.assert_array_equal(out["Volume"], expected["Volume"])
+
+
+@pytest.mark.parametrize("scale", [None, 10_000])
+def test_incremental_updates_match_full_aggregation(scale):
+    bars, _ = _minutes(scale=scale)
+    n = len(bars)
+    multi = MultiTimeframe(bars[:1000])
+    # Blocchi irregolari, alcuni dentro lo stesso bucket, e una correzione dell'ultima ora
+    cuts = [1000, 1001, 1077, 2500, 2500 + 390 * 3, n - 60]
+    for a, b in zip(cuts, cuts[1:] + [n]):
+        multi.update(bars[a:b])
+    corrected = Bars.concat([bars[n - 60:]])
+    corrected.prices[3, -1] = corrected.prices[3, -2]
+    multi.update(corrected)
+    full = Bars.concat([bars[:n - 60], corrected])
+    _assert_same(multi.bars(), full)
+    for tf in DEFAULT_TIMEFRAMES:
+        _assert_same(multi.bars(tf), aggregate(full, tf))
+    # 15m da 5m, 1wk da 1d: la catena di sorgenti annidate
+    assert multi.sources == {"5m": None, "15m": "5m", "1h": "15m", "1d": "1h", "1wk": "1d"}
+
+
+def test_update_reports_recomputed_tail_only():
+    bars, _ = _minutes()
+    multi = MultiTimeframe(bars[:-1])
+    changed = multi.update(bars[-1:])
+    assert changed == {"5m": 1, "15m": 1, "1h": 1, "1d": 1, "1wk": 1}
+
+
+def test_offset_and_missing_bars():
+    bars, frame = _minutes(end="2024-03-05")
+    # Ore allineate all'apertura: 9:30, 10:30, ... come le barre 1h di Yahoo
+    hourly = aggregate(bars, "1h", offset="30min")
+    assert hourly.index(tz=True)[0] == pd.Timestamp("2024-03-04 09:30", tz=TZ) and len(hourly) == 14
+    frame.iloc[3:5, frame.columns.get_loc("Close")] = np.nan
+    frame.iloc[0, frame.columns.get_loc("High")] = np.nan
+    five = resample_frame(frame, "5m")
+    # Le barre senza chiusura non entrano nel bucket; un massimo mancante è ignorato
+    first = frame.iloc[[0, 1, 2]]
+    assert five["Close"].iloc[0] == np.float32(first["Close"].iloc[-1])
+    assert five["High"].iloc[0] == np.float32(first["High"].max())
+    assert five["Volume"].iloc[0] == first["Volume"].sum()
@@ -0,0 +1,207 @@
+import math
+import threading
+
+import pytest
+
+import scheduler
+from scheduler import AdaptiveLimiter, RequestScheduler, TokenBucket, is_throttled, is_transient
+
+
+class FakeClock:
+    """Orologio virtuale: sleep avanza il tempo invece di attendere"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        # Come un orologio reale, avanza sempre (anche per attese sotto la risoluzione)
+        self.now = max(self.now + seconds, math.nextafter(self.now, math.inf))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(scheduler.time, "sleep", clock.sleep)
+    return clock
+
+
+class RateLimited(Exception):
+    def __init__(self):
+        super().__init__("Too Many Requests. Rate limited. Try after a while.")
+
+
+def test_error_classification():
+    assert is_throttled(RateLimited()) and is_transient(RateLimited())
+    assert is_transient(TimeoutError()) and is_transient(ConnectionError())
+    assert not is_transient(ValueError("simbolo inesistente"))
+
+
+def test_token_bucket_rate_after_burst(clock):
+    bucket = TokenBucket(rate=4.0, capacity=8)
+    start = clock.now
+    for _ in range(8):
+        bucket.acquire()
+    assert clock.now == start  # il burst non attende
+    for _ in range(20):
+        bucket.acquire()
+    assert clock.now - start == pytest.approx(20 / 4.0)
+
+
+def test_token_bucket_pause_and_debt(clock):
+    bucket = TokenBucket(rate=2.0, capacity=4)
+    bucket.pause(5.0)
+    start = clock.now
+    bucket.acquire()
+    assert clock.now - start == pytest.approx(5.0 + 0.5)
+    # Alla ripresa nessuna raffica: i token ripartono da zero a fine pausa
+    bucket.pause(5.0)
+    start = clock.now
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.now - start == pytest.approx(5.0 + 4 / 2.0)
+    # Un costo oltre la capacità passa con il bucket pieno e lascia un debito
+    clock.now += 10
+    bucket.acquire(cost=10)
+    start = clock.now
+    bucket.acquire()
+    assert clock.now - start == pytest.approx((6 + 1) / 2.0)
+
+
+def test_aimd_limits():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=6)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release("ok")
+    assert 4.9 < limiter.limit < 5.0  # circa +1 per finestra di successi
+    limiter.acquire()
+    limiter.release("throttled")
+    halved = limiter.limit
+    assert 2.45 < halved < 2.5
+    limiter.acquire()
+    limiter.release("neutral")
+    assert limiter.limit == halved
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release("throttled")
+    assert limiter.limit == 1
+    for _ in range(200):
+        limiter.acquire()
+        limiter.release("ok")
+    assert limiter.limit == 6
+
+
+def test_retry_backs_off_and_halves_concurrency(clock):
+    sched = RequestScheduler(rate=100, burst=100, concurrency=8, cooldown=5.0, seed=1)
+    calls = []
+
+    def flaky():
+        calls.append(clock.now)
+        if len(calls) < 3:
+            raise RateLimited()
+        return "ok"
+
+    assert sched.call("k", flaky) == "ok"
+    assert len(calls) == 3
+    assert sched.limiter.limit < 8 * 0.5 * 0.5 + 1
+    # Ogni throttling sospende il bucket per il cooldown, più il backoff con jitter
+    assert calls[1] - calls[0] >= 5.0 and calls[2] - calls[1] >= 5.0
+    # Full jitter entro base * 2^tentativo, con tetto backoff_max
+    for attempt in range(1, 10):
+        ceiling = min(sched.backoff_max, sched.backoff_base * 2 ** attempt)
+        assert all(0 <= sched._backoff(attempt) <= ceiling for _ in range(50))
+    stats = sched.stats()
+    assert stats["throttled"] == 2 and stats["retry"] == 2 and stats["richieste"] == 3
+
+
+def test_application_errors_are_not_retried(clock):
+    sched = RequestScheduler(concurrency=4)
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise ValueError("simbolo inesistente")
+
+    with pytest.raises(ValueError):
+        sched.call("k", missing)
+    assert calls == [1]
+    assert sched.limiter.limit == 4
+    assert sched.stats()["errori"] == 1
+
+
+def test_retries_give_up_after_limit(clock):
+    sched = RequestScheduler(retries=2)
+    calls = []
+
+    def down():
+        calls.append(1)
+        raise TimeoutError("read timed out")
+
+    with pytest.raises(TimeoutError):
+        sched.call("k", down)
+    assert len(calls) == 3
+
+
+def test_identical_requests_coalesce():
+    sched = RequestScheduler(rate=1000, burst=1000)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"symbol": "AAPL"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(sched.call(("AAPL", "info"), slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(sched.call(("AAPL", "info"), slow)))
+                 for _ in range(5)]
+    for t in followers:
+        t.start()
+    while sched.stats()["coalescenti"] < 5:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+    assert calls == [1]
+    assert len(results) == 6 and all(r is results[0] for r in results)
+    # Finita la richiesta, la chiave si può rieseguire
+    assert sched.call(("AAPL", "info"), lambda: "nuovo") == "nuovo"
+
+
+def test_coalesced_callers_share_the_error():
+    sched = RequestScheduler(rate=1000, burst=1000)
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("simbolo inesistente")
+
+    errors = []
+
+    def call():
+        try:
+            sched.call("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    while sched.stats()["coalescenti"] < 1:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert len(errors) == 2 and errors[0] is errors[1]
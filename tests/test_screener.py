@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from bench import SyntheticProvider
+from data_cache import DataCache
+from screener import NUMERIC_FIELDS, InfoSnapshot
+
+INFOS = {
+    "AAA": {"sector": "Technology", "trailingPE": 20.0, "returnOnEquity": 0.30,
+            "currentPrice": 95.0, "fiftyTwoWeekLow": 90.0, "fiftyTwoWeekHigh": 150.0},
+    "BBB": {"sector": "Healthcare", "trailingPE": 15.0, "returnOnEquity": 0.10,
+            "currentPrice": 140.0, "fiftyTwoWeekLow": 80.0, "fiftyTwoWeekHigh": 145.0},
+    "CCC": {"sector": "Energy", "trailingPE": 8.0, "returnOnEquity": 0.20,
+            "currentPrice": 50.0, "fiftyTwoWeekLow": 45.0, "fiftyTwoWeekHigh": 70.0},
+    "DDD": {"sector": "Technology", "trailingPE": "Infinity", "returnOnEquity": None},
+}
+
+
+@pytest.fixture
+def snapshot():
+    snap = InfoSnapshot(capacity=2)  # cresce durante il caricamento
+    for symbol, info in INFOS.items():
+        snap.update(symbol, info)
+    return snap
+
+
+def test_numeric_fields_are_info_keys():
+    assert "fiftyTwoWeekLow" in NUMERIC_FIELDS and "fiftyTwoWeekHigh" in NUMERIC_FIELDS
+    assert not [f for f in NUMERIC_FIELDS if f[0].isdigit()]
+
+
+def test_filter_on_52_week_bounds(snapshot):
+    out = snapshot.screen([("fiftyTwoWeekLow", ">=", 50)], fields=["fiftyTwoWeekLow"])
+    assert list(out.index) == ["AAA", "BBB"]
+    near_high = snapshot.mask([("fiftyTwoWeekHigh", "<", 146)])
+    assert snapshot.symbols[near_high].tolist() == ["BBB", "CCC"]
+
+
+def test_compound_filters_and_top_n(snapshot):
+    out = snapshot.screen([("trailingPE", "<", 25), ("sector", "in", ["Technology", "Energy"])],
+                          sort_by="returnOnEquity", top=1)
+    assert list(out.index) == ["AAA"]
+    out = snapshot.screen([("sector", "!=", "Technology")], sort_by="trailingPE", ascending=True)
+    assert list(out.index) == ["CCC", "BBB"]
+    # NaN e valori non numerici non superano nessun filtro
+    assert "DDD" not in snapshot.screen([("returnOnEquity", ">", -1)]).index
+    assert snapshot.column("trailingPE")[3] == np.inf
+
+
+def test_update_replaces_row(snapshot):
+    snapshot.update("aaa", {"sector": "Energy", "trailingPE": 30.0})
+    assert len(snapshot) == 4
+    assert snapshot.column("sector")[0] == "Energy"
+    assert np.isnan(snapshot.column("returnOnEquity")[0])
+
+
+def test_refresh_fetches_only_stale_symbols():
+    snap = InfoSnapshot()
+    cache = DataCache()
+    assert snap.refresh(["AAPL", "MSFT"], cache, provider=SyntheticProvider()) == []
+    assert snap.stale(["AAPL", "MSFT", "GOOG"]) == ["GOOG"]
+    assert snap.stale(["AAPL"], max_age=10, now=snap._fetched_at[0] + 11) == ["AAPL"]
+    assert len(snap.screen()) == 2
@@ -0,0 +1,120 @@
+import multiprocessing
+import sqlite3
+
+import shared_store
+from data_cache import DataCache
+from shared_store import SQLiteStore
+
+
+def _key(symbol, endpoint="info"):
+    return (symbol, endpoint, ())
+
+
+def _sum(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries").fetchone()
+
+
+def test_totals_follow_writes_replacements_and_deletes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    store = SQLiteStore(path)
+    store.write(_key("A"), "x" * 100, 1e12)
+    store.write(_key("B"), "y" * 300, 1e12)
+    store.write(_key("A"), "z" * 50, 1e12)  # sostituzione: il totale scende
+    store.delete("B")
+    count, total = _sum(path)
+    assert store.stats() == {"voci": count, "byte": total} and count == 1
+    # Un secondo processo (o un riavvio) non ricalcola né raddoppia i totali
+    assert SQLiteStore(path).stats() == store.stats()
+
+
+def test_expired_read_updates_totals(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.db"))
+    store.write(_key("A"), "x" * 100, 10.0)
+    assert store.read(_key("A"), now=20.0) == (False, None, 0)
+    assert store.stats() == {"voci": 0, "byte": 0}
+
+
+def test_prune_evicts_least_recently_used_below_limit(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shared_store.time, "time", lambda: now[0])
+    store = SQLiteStore(str(tmp_path / "cache.db"), max_bytes=10_000)
+    for i in range(8):
+        now[0] += 100
+        store.write(_key(f"S{i}"), b"x" * 1000, 1e12)
+    now[0] += 100
+    assert store.read(_key("S0"))[0]  # S0 torna il più recente
+    store.flush_accessed()
+    now[0] += 100
+    store.write(_key("S8"), b"x" * 2500, 1e12)
+    assert store.stats()["byte"] <= 10_000 * shared_store.PRUNE_TO
+    assert store.read(_key("S0"))[0]
+    assert not store.read(_key("S1"))[0]
+    assert store.read(_key("S8"))[0]
+
+
+def test_reads_batch_access_updates(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    now = [1000.0]
+    monkeypatch.setattr(shared_store.time, "time", lambda: now[0])
+    store = SQLiteStore(path)
+    store.write(_key("A"), 1, 1e12)
+    store.write(_key("B"), 2, 1e12)
+
+    def accessed(symbol):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT accessed FROM entries WHERE symbol = ?", (symbol,)).fetchone()[0]
+
+    # Entro ACCESS_RESOLUTION nessuna scrittura
+    now[0] += 1
+    store.read(_key("A"))
+    assert accessed("A") == 1000.0 and not store._accessed
+    # Oltre: il primo accesso dopo una pausa si scrive subito, i successivi si accumulano
+    now[0] += shared_store.ACCESS_RESOLUTION
+    store.read(_key("A"))
+    assert accessed("A") == now[0]
+    first = now[0]
+    now[0] += 1
+    store.read(_key("B"))
+    assert accessed("B") == 1000.0 and list(store._accessed) == [repr(_key("B"))]
+    now[0] += shared_store.ACCESS_FLUSH
+    store.read(_key("B"))  # su disco B è ancora a 1000: l'accesso si registra di nuovo
+    assert accessed("B") == now[0] and accessed("A") == first
+
+def _write_many(path, start):
+    store = SQLiteStore(path)
+    for i in range(start, start + 50):
+        store.write(_key(f"S{i}"), "v" * (i + 1), 1e12)
+
+
+def test_totals_stay_exact_across_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteStore(path)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_many, args=(path, start)) for start in (0, 25, 50)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert all(p.exitcode == 0 for p in procs)
+    count, total = _sum(path)
+    assert count == 100
+    assert SQLiteStore(path).stats() == {"voci": count, "byte": total}
+
+
+def test_lease_single_flight(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.db"), lease_ttl=5.0)
+    other = SQLiteStore(str(tmp_path / "cache.db"))
+    other.owner = "altro"
+    assert store.acquire_lease(_key("A"))
+    assert not other.acquire_lease(_key("A"))
+    store.write(_key("A"), "valore", 1e12)
+    assert other.wait_for(_key("A"), timeout=1)[:2] == (True, "valore")
+    store.release_lease(_key("A"))
+    assert other.acquire_lease(_key("A"))
+
+
+def test_data_cache_reads_other_process_values(tmp_path):
+    path = str(tmp_path / "cache.db")
+    DataCache(shared_path=path).put("AAPL", "info", {"symbol": "AAPL"})
+    assert DataCache(shared_path=path).get("AAPL", "info") == (True, {"symbol": "AAPL"})
@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+
+from bench import SyntheticProvider
+from data_cache import DataCache, make_key
+from snapshot import SnapshotStore, build_snapshot
+
+pytest.importorskip("pyarrow")
+
+
+class FlakyProvider(SyntheticProvider):
+    """Provider sintetico in cui i dividendi di MSFT falliscono"""
+
+    def dividends(self, symbol):
+        if symbol == "MSFT":
+            raise RuntimeError("timeout")
+        return super().dividends(symbol)
+
+
+@pytest.fixture
+def store(tmp_path):
+    build_snapshot(["AAPL", "MSFT"], str(tmp_path), provider=FlakyProvider(bars=60), max_workers=2,
+                   day=datetime.date.today())
+    return SnapshotStore(str(tmp_path))
+
+
+def test_snapshot_serves_covered_keys(store):
+    found, hist, _ = store.read(make_key("AAPL", "history", {"period": "1y"}))
+    assert found and len(hist) == 60
+    found, info, _ = store.read(make_key("MSFT", "info"))
+    assert found and info["symbol"] == "MSFT"
+
+
+def test_failed_endpoint_is_a_miss(store):
+    assert store.read(make_key("AAPL", "dividends"))[0]
+    assert store.read(make_key("MSFT", "dividends")) == (False, None, 0)
+
+
+def test_unknown_symbol_and_params_are_misses(store):
+    assert not store.read(make_key("GOOG", "info"))[0]
+    assert not store.read(make_key("AAPL", "history", {"period": "1y", "interval": "1h"}))[0]
+    assert not store.read(make_key("AAPL", "history", {"period": "5y"}))[0]
+
+
+def test_cache_falls_back_to_network_for_failed_endpoint(store):
+    cache = DataCache(snapshot=store)
+    fetched = []
+    value = cache.get_or_fetch("MSFT", "dividends", lambda: fetched.append(1) or "rete")
+    assert value == "rete" and fetched == [1]
+    cache.get_or_fetch("AAPL", "dividends", lambda: fetched.append(2))
+    assert fetched == [1]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from indicators import compute_indicators
+from streaming_indicators import EMA, SMA, StreamingIndicators, WilderATR, WilderRSI
+
+COMPARED = ("MA_20", "MA_50", "MA_200", "volatility", "RSI", "MACD", "MACD_signal", "MACD_hist", "ATR")
+
+
+@pytest.fixture
+def prices():
+    # Tre simboli: storia completa, quotato dopo 120 barre, buco di 5 barre a metà
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (400, 3)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, close.shape))
+    low = close * (1 - rng.uniform(0, 0.02, close.shape))
+    for x in (close, high, low):
+        x[:120, 1] = np.nan
+        x[250:255, 2] = np.nan
+    return close, high, low
+
+
+def test_streaming_matches_compute_indicators(prices):
+    close, high, low = prices
+    expected = compute_indicators(close, high, low)
+    stream = StreamingIndicators()
+    rows = [stream.update(c, h, lo) for c, h, lo in zip(close, high, low)]
+    for name in COMPARED:
+        got = np.vstack([r[name] for r in rows])
+        np.testing.assert_allclose(got, expected[name], rtol=1e-9, atol=1e-9, equal_nan=True,
+                                   err_msg=name)
+
+
+def test_late_listing_becomes_finite(prices):
+    close, high, low = prices
+    stream = StreamingIndicators().seed(close, high, low)
+    last = stream.update(close[-1] * 1.01, high[-1] * 1.01, low[-1] * 1.01)
+    for name in COMPARED:
+        assert np.isfinite(last[name][:2]).all(), name
+
+
+def test_sma_drops_nan_from_running_sum():
+    sma = SMA(3)
+    values = [np.nan, 1.0, 2.0, 3.0, 4.0]
+    out = [sma.update(v) for v in values]
+    assert np.isnan(out[:3]).all()
+    assert out[3] == pytest.approx(2.0)
+    assert out[4] == pytest.approx(3.0)
+
+
+def test_ema_starts_at_first_finite_value():
+    ema = EMA(alpha=0.5).seed(np.array([[np.nan, 1.0], [2.0, 3.0], [4.0, np.nan]]))
+    np.testing.assert_allclose(ema.value, [3.0, 2.0])
+
+
+def test_wilder_indicators_skip_leading_nan():
+    close = np.concatenate([[np.nan] * 5, np.linspace(100, 120, 40)])
+    rsi = WilderRSI(14).seed(close)
+    atr = WilderATR(14).seed(zip(close + 1, close - 1, close))
+    assert rsi.value == pytest.approx(100.0)
+    assert np.isfinite(atr.value)